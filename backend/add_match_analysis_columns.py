@@ -0,0 +1,32 @@
+from app import create_app
+from app.extensions import db
+from sqlalchemy import text
+
+app = create_app('development')
+
+# Stored job-detail analysis on job_matches, and the change timestamps that decide freshness
+COLUMNS = [
+    ('job_matches', 'analysis', 'TEXT'),
+    ('job_matches', 'analysis_calculated', 'TIMESTAMP'),
+    ('students', 'profile_updated_at', 'TIMESTAMP'),
+    ('jobs', 'updated_at', 'TIMESTAMP'),
+]
+
+with app.app_context():
+    print("--- Adding match analysis columns ---")
+    with db.engine.connect() as conn:
+        for table, column, col_type in COLUMNS:
+            try:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {col_type}"))
+                conn.commit()
+                print(f"Added '{table}.{column}'.")
+            except Exception as e:
+                conn.rollback()
+                print(f"Error adding '{table}.{column}': {e}")
+
+        # Existing rows count as changed now, so nothing stored before this is trusted
+        conn.execute(text("UPDATE students SET profile_updated_at = NOW() WHERE profile_updated_at IS NULL"))
+        conn.execute(text("UPDATE jobs SET updated_at = NOW() WHERE updated_at IS NULL"))
+        conn.commit()
+
+    print("Migration Complete.")
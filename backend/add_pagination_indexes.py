@@ -0,0 +1,25 @@
+from app import create_app
+from app.extensions import db
+from sqlalchemy import text
+
+app = create_app('development')
+
+# Indexes behind keyset pagination in GET /jobs (cursor = sort key + job id)
+INDEXES = {
+    'idx_job_posted': "CREATE INDEX IF NOT EXISTS idx_job_posted ON jobs (posted_at, id)",
+    'idx_match_student_score': "CREATE INDEX IF NOT EXISTS idx_match_student_score ON job_matches (student_id, score, job_id)",
+}
+
+with app.app_context():
+    print("--- Adding pagination indexes ---")
+    with db.engine.connect() as conn:
+        for name, statement in INDEXES.items():
+            try:
+                conn.execute(text(statement))
+                conn.commit()
+                print(f"Created '{name}'.")
+            except Exception as e:
+                conn.rollback()
+                print(f"Error creating '{name}': {e}")
+
+    print("Migration Complete.")
@@ -6,6 +6,7 @@ from app.celery_utils import init_celery
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.config['CONFIG_NAME'] = config_name # Lets worker processes rebuild the same app
 
     # Initialize extensions
     db.init_app(app)
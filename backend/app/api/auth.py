@@ -1,10 +1,21 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity,  current_user
+from typing import Optional
+from flask import Blueprint, g, request, jsonify
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from sqlalchemy.orm import joinedload
+from werkzeug.local import LocalProxy
 from app.models import User, Student
 from app.extensions import db, jwt
+from app.services import match_tracking
+from app.services.data_versions import student_key, versions
+from app.services.student_cache import student_cache
 
 auth_bp = Blueprint('auth', __name__)
 
+def _access_token(user, student):
+    # The student's id rides in the token, so API calls don't look it up
+    claims = {'student_id': student.id} if student else None
+    return create_access_token(identity=str(user.id), additional_claims=claims)
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -14,7 +25,7 @@ def login():
     user = User.query.filter_by(email=email).first()
 
     if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id))
+        access_token = _access_token(user, Student.query.filter_by(user_id=user.id).first())
         return jsonify(access_token=access_token, user_id=user.id, email=user.email), 200
 
     return jsonify({"msg": "Bad username or password"}), 401
@@ -38,9 +49,11 @@ def register():
     # Create Student (Basic)
     student = Student(user_id=new_user.id, first_name=data.get('firstName', 'New'), last_name=data.get('lastName', 'User'))
     db.session.add(student)
+    db.session.flush() # Get ID
+    match_tracking.mark_student_changed(student.id)
     db.session.commit()
     
-    access_token = create_access_token(identity=str(new_user.id))
+    access_token = _access_token(new_user, student)
     return jsonify(access_token=access_token, message="User created successfully"), 201
 
 @auth_bp.route('/me', methods=['GET'])
@@ -58,8 +71,54 @@ def me():
         "last_name": student.last_name if student else None
     })
 
-# Helper for other routes to look up user
+def _per_request(name, load):
+    # Memoized against the decoded token, which flask-jwt-extended replaces on every request
+    # (g alone can outlive a request when an app context is pushed by hand, as in tests)
+    claims = get_jwt()
+    memo = g.get('_identity_memo')
+    if memo is None or memo[0] is not claims:
+        memo = g._identity_memo = (claims, {})
+    if name not in memo[1]:
+        memo[1][name] = load()
+    return memo[1][name]
+
+def current_student_id() -> Optional[int]:
+    """The caller's student id, from the token. Tokens issued before the claim existed look it up once per request."""
+    student_id = get_jwt().get('student_id')
+    if student_id is None:
+        student_id = _per_request('student_id', lambda: db.session.query(Student.id).filter_by(user_id=get_jwt_identity()).scalar())
+    return student_id
+
+def current_student(cached: bool = True) -> Optional[Student]:
+    """
+    The caller's Student with preferences loaded. Served from the student cache while its
+    data version is current; cached=False always reads the row (for views that write back).
+    """
+    return _per_request('student' if cached else 'student:db', lambda: _load_student(cached))
+
+def _load_student(cached):
+    student_id = current_student_id()
+    if student_id is None:
+        return None
+    cache = student_cache() if cached else None
+    if cache is not None:
+        # Read before the row, so an entry is never labelled newer than what it holds
+        version, = versions(student_key(student_id))
+        student = cache.get(student_id, version)
+        if student is not None:
+            return student
+
+    student = db.session.get(Student, student_id, options=[joinedload(Student.preferences)], populate_existing=True)
+    if student is not None and cache is not None:
+        cache.put(student, version)
+    return student
+
+# Tokens of deleted users are still rejected (an existence check on the primary key), but
+# the User row itself only loads when something uses current_user; routes get the student
+# through current_student() / current_student_id()
 @jwt.user_lookup_loader
 def user_lookup_callback(_jwt_header, jwt_data):
     identity = jwt_data["sub"]
-    return User.query.filter_by(id=identity).one_or_none()
+    if not db.session.query(User.query.filter_by(id=identity).exists()).scalar():
+        return None
+    return LocalProxy(lambda: _per_request('user', lambda: User.query.filter_by(id=identity).one()))
@@ -1,34 +1,67 @@
-from flask import jsonify, request, current_app
+from flask import Response, jsonify, request, current_app
 import requests
 from app.api import api_bp
 from app.extensions import db
-from app.models import Job, Student, Timetable, ScheduleSlot, Application, JobMatch
-from app.services.matching import MatchingEngine
+from app.models import Job, JobShift, Student, Timetable, ScheduleSlot, Application, JobMatch
 from app.services.scheduler import ScheduleAnalyzer
-from .schemas import JobSchema, ApplicationSchema, ScheduleSlotSchema
+from app.services import match_tracking
+from app.services.title_index import role_filter
+from app.services.schedule_filter import exclude_impossible
+from app.services.planner import plan_for_student, PLANNER_MIN_SCORE
+from app.services.pagination import keyset_page, InvalidCursor
+from app.services.data_versions import JOBS, bump, student_key
+from app.services.response_cache import conditional
+from app.services.match_analysis import job_analysis
+from app.services.student_counters import counts_for
+from .schemas import JobSchema, JobShiftSchema, ApplicationSchema, ScheduleSlotSchema
+from .serializers import DASHBOARD_FIELDS, DESCRIPTION_MODES, DETAIL_FIELDS, JobRows, dumps, job_rows, jobs_response, parse_fields, splice
 from datetime import datetime
 
-from flask_jwt_extended import jwt_required, current_user
+from flask_jwt_extended import jwt_required
+from .auth import current_student, current_student_id
 
-# Helper replaced by current_user.student_profile via JWT
 from app.tasks import scrape_jobs_task, calculate_matches_task
 
+def _dump_jobs(jobs, scores):
+    """
+    Serialize Job objects through JobSchema with their match scores ({job_id: score}).
+    Shifts for all of them come from one IN query instead of walking each job's
+    dynamic `shifts` relationship. (The /jobs listing uses the faster serializers.JobRows.)
+    """
+    shifts_by_job = {}
+    if jobs:
+        shifts = JobShift.query.filter(JobShift.job_id.in_([job.id for job in jobs])).order_by(JobShift.id).all()
+        for shift in shifts:
+            shifts_by_job.setdefault(shift.job_id, []).append(shift)
+
+    job_schema = JobSchema(exclude=('shifts',))
+    shift_schema = JobShiftSchema(many=True)
+    results = []
+    for job in jobs:
+        job_dump = job_schema.dump(job)
+        job_dump['shifts'] = shift_schema.dump(shifts_by_job.get(job.id, []))
+        if scores.get(job.id) is not None:
+            job_dump['match_score'] = scores[job.id]
+        results.append(job_dump)
+    return results
+
 @api_bp.route('/jobs', methods=['GET'])
 @jwt_required()
 def get_jobs():
-    student = current_user.student_profile
-    if not student:
+    student_id = current_student_id()
+    if student_id is None:
         return jsonify({"error": "No student profile found"}), 404
 
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 100, type=int) # Increased default from 20 to 100 for "See All" feel
+    # Unchanged since the student's last load (no rematch, ingest or profile edit) -> 304,
+    # answered from the token's student id without loading the student
+    return conditional('jobs', student_id, (JOBS, student_key(student_id)), lambda: _job_feed(current_student()))
 
-    # Base Query
+def _feed_query(student, columns, salary_min=None):
+    """Active jobs the student can work, outer-joined with their JobMatch, selecting `columns`."""
+    # Base Query (the student's match score comes back as a column of the same query)
     query = Job.query.filter_by(is_active=True)
 
     # Filtering
-    salary_min = request.args.get('salary_min', type=float)
     if salary_min:
         query = query.filter(Job.salary_min >= salary_min)
         
@@ -36,17 +69,13 @@ def get_jobs():
     if student.preferences and student.preferences.preferred_roles:
         roles = [r.strip() for r in student.preferences.preferred_roles.split(',') if r.strip()]
         if roles:
-            from sqlalchemy import or_
-            # Construct a flexible OR filter: Title OR Description must contain one of the keywords
             # For strictness, per user feedback, we MUST only check Title. 
             # Description often contains "barista coffee available" which causes false positives for "Director" roles.
-            role_filters = []
-            for role in roles:
-                role_filters.append(Job.title.ilike(f"%{role}%"))
-                # role_filters.append(Job.description.ilike(f"%{role}%")) # REMOVED for strictness
-            
-            if role_filters:
-                query = query.filter(or_(*role_filters))
+            # Candidates come from the job_title_grams index rather than a LIKE scan of every job.
+            query = query.filter(role_filter(Job, roles))
+
+    # Hide jobs the student can't work: most of their shifts overlap classes (checked in SQL)
+    query = query.filter(exclude_impossible(Job, student.id))
 
     # Strict Location Filtering REMOVED -> Handled by Matching Score (Distance Penalty)
     # This allows "Nearby" jobs to appear (with lower scores) instead of being hidden.
@@ -54,104 +83,130 @@ def get_jobs():
     #    ...
 
     # Sorting (integration with JobMatch)
-    # Join with JobMatch to sort by score
-    query = query.outerjoin(JobMatch, (JobMatch.job_id == Job.id) & (JobMatch.student_id == student.id))
-    
+    # Join with JobMatch to sort by score. Rows are plain tuples of `columns`
+    # (for listings: ids, versions and scores; the job fields come from the fragment cache)
+    return query.outerjoin(JobMatch, (JobMatch.job_id == Job.id) & (JobMatch.student_id == student.id)) \
+        .with_entities(*columns)
+
+def _job_feed(student):
+    # Pagination: keyset by default (?cursor= from the previous page's next_cursor);
+    # ?page= keeps the old OFFSET pagination with total/pages for existing clients
+    page = request.args.get('page', type=int)
+    cursor = request.args.get('cursor')
+    per_page = request.args.get('per_page', 100, type=int) # Increased default from 20 to 100 for "See All" feel
+
+    # Projection: ?fields=title,salary_min,... and ?description=full|truncated|none.
+    # Cards only need a few columns, and descriptions are most of a page's bytes.
+    description = request.args.get('description', 'full')
+    if description not in DESCRIPTION_MODES:
+        return jsonify({"error": f"description must be one of: {', '.join(DESCRIPTION_MODES)}"}), 400
+    try:
+        projection = job_rows(parse_fields(request.args.get('fields')), description)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = _feed_query(student, projection.columns, request.args.get('salary_min', type=float))
+
     sort_by = request.args.get('sort_by', 'match_score')
-    if sort_by == 'match_score':
-        query = query.order_by(JobMatch.score.desc().nullslast())
-    elif sort_by == 'posted_at':
-        query = query.order_by(Job.posted_at.desc())
-    
-    paginated = query.paginate(page=page, per_page=per_page)
-    
-    # Serialize
-    # We want to include match score in the output
-    results = []
-    job_schema = JobSchema()
-    
-    for job in paginated.items:
-        job_dump = job_schema.dump(job)
-        
-        # Attach match info manually since it's on the joined table/not in Job model direct
-        match = JobMatch.query.filter_by(student_id=student.id, job_id=job.id).first()
-        if match:
-             job_dump['match_score'] = match.score
-        
-        results.append(job_dump)
+    if page is not None:
+        if sort_by == 'match_score':
+            query = query.order_by(JobMatch.score.desc().nullslast(), Job.id.desc())
+        elif sort_by == 'posted_at':
+            query = query.order_by(Job.posted_at.desc(), Job.id.desc())
 
-    return jsonify({
-        'jobs': results,
-        'total': paginated.total,
-        'pages': paginated.pages,
-        'current_page': page
-    })
+        paginated = query.paginate(page=page, per_page=per_page)
+
+        return jobs_response(projection.encode(paginated.items), {
+            'total': paginated.total,
+            'pages': paginated.pages,
+            'current_page': page
+        })
+
+    # Keyset: rows after the cursor's (sort key, job id), no OFFSET and no COUNT(*)
+    if sort_by == 'posted_at':
+        column, key = Job.posted_at, lambda row: (row[JobRows.POSTED_AT], row[JobRows.ID])
+    else:
+        sort_by, column, key = 'match_score', JobMatch.score, lambda row: (row[JobRows.SCORE], row[JobRows.ID])
+
+    # The count is the slow part on big tables, so it's only run on request
+    total = query.order_by(None).count() if request.args.get('include_total') == 'true' else None
+    try:
+        rows, next_cursor = keyset_page(query, column, Job.id, key, sort_by, max(per_page, 1), cursor)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    meta = {'next_cursor': next_cursor}
+    if total is not None:
+        meta['total'] = total
+    return jobs_response(projection.encode(rows), meta)
 
 @api_bp.route('/jobs/<int:job_id>', methods=['GET'])
 @jwt_required()
 def get_job_detail(job_id):
-    student = current_user.student_profile
+    # The analysis is written back, so not from the student cache
+    student = current_student(cached=False)
     job = Job.query.get_or_404(job_id)
     
-    # Calculate fresh match analysis on the fly
-    # Matcher Setup
-    matcher = MatchingEngine()
-    
-    # Safe timetable access
-    timetable_slots = []
-    if student.timetable and student.timetable.slots:
-        timetable_slots = [{"day": s.day_of_week, "start": s.start_time, "end": s.end_time} for s in student.timetable.slots]
-    
-    # Skills parsing (CSV to set)
-    student_skills = set()
-    if student.skills:
-        student_skills = set([s.strip().lower() for s in student.skills.split(',')])
-
-    student_profile = {
-        "location": {"lat": student.latitude or 51.5, "lng": student.longitude or -0.1},
-        "timetable": timetable_slots,
-        "min_salary": student.preferences.min_salary if student.preferences else 0, # Safeguard preferences too
-        "skills": student_skills,
-        "preferences": {}
-    }
-    
-    job_data = {
-         "location": {"lat": job.latitude or 51.5, "lng": job.longitude or -0.1},
-         "shifts": [{"day": s.day_of_week, "start": s.start_time, "end": s.end_time} for s in job.shifts],
-         "salary_min": job.salary_min or 0,
-         "salary_max": job.salary_max or 0,
-         "salary_type": job.salary_type, # Pass salary type
-         "skills": set(), # Helper for now, or parse job.description
-         "title": job.title,
-         "description": job.description # Important for keyword matching
-    }
+    # Stored analysis while neither the profile nor the job changed since it was computed;
+    # otherwise recomputed (same compiled profiles as the rematch) and stored
+    match_result = job_analysis(student, job)
 
-    match_result = matcher.calculate_match(student_profile, job_data)
-    
-    schema = JobSchema()
-    result = schema.dump(job)
-    result['match_analysis'] = match_result # Add full analysis
-    
-    return jsonify(result)
+    # Cached job fragment (same fields as JobSchema) plus the full analysis
+    fragment = job_rows(DETAIL_FIELDS).fragment(job)
+    return Response(splice(fragment, [b'"match_analysis":' + dumps(match_result)]), mimetype='application/json')
+
+@api_bp.route('/jobs/plan', methods=['GET'])
+@jwt_required()
+def plan_jobs():
+    """
+    Best set of compatible jobs that fits the student's weekly hours limit and timetable.
+    Optional: hours (plan for fewer hours; required without a limit), min_score.
+    """
+    student = current_student()
+    if not student:
+        return jsonify({"error": "No student profile found"}), 404
+
+    hours = request.args.get('hours', type=float)
+    if hours is None and not student.weekly_hours_limit:
+        return jsonify({"error": "Set a weekly hours limit or pass hours to plan for"}), 400
+
+    plan = plan_for_student(
+        student,
+        hours=hours,
+        min_score=request.args.get('min_score', PLANNER_MIN_SCORE, type=float)
+    )
+
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_(plan['job_ids'])).all()} if plan['job_ids'] else {}
+    results = _dump_jobs([jobs[job_id] for job_id in plan['job_ids']], plan['scores'])
+
+    return jsonify({
+        'jobs': results,
+        'weekly_hours_limit': student.weekly_hours_limit,
+        'logged_hours': plan['logged_hours'],
+        'planned_hours': round(plan['total_minutes'] / 60, 2),
+        'total_score': plan['total_score'],
+        'optimal': plan['optimal']
+    })
 
 @api_bp.route('/jobs/<int:job_id>/save', methods=['POST'])
 @jwt_required()
 def save_job(job_id):
-    student = current_user.student_profile
-    app = Application.query.filter_by(student_id=student.id, job_id=job_id).first()
+    student_id = current_student_id()
+    app = Application.query.filter_by(student_id=student_id, job_id=job_id).first()
     if not app:
-        app = Application(student_id=student.id, job_id=job_id, status='Saved')
+        app = Application(student_id=student_id, job_id=job_id, status='Saved')
         db.session.add(app)
     else:
         app.status = 'Saved'
     
+    bump(student_key(student_id))
     db.session.commit()
     return jsonify({"message": "Job saved"}), 201
 
 @api_bp.route('/schedule', methods=['GET', 'PUT'])
 @jwt_required()
 def handle_schedule():
-    student = current_user.student_profile
+    student = current_student()
     timetable = student.timetable
     if not timetable and request.method == 'PUT':
         # Create default timetable if missing
@@ -187,13 +242,14 @@ def handle_schedule():
             )
             db.session.add(new_slot)
         
+        match_tracking.mark_student_changed(student.id)
         db.session.commit()
         return jsonify({"message": "Schedule updated"}), 200
 
 @api_bp.route('/applications', methods=['POST'])
 @jwt_required()
 def apply_for_job():
-    student = current_user.student_profile
+    student_id = current_student_id()
     data = request.json
     job_id = data.get('job_id')
     
@@ -201,21 +257,23 @@ def apply_for_job():
          return jsonify({"error": "Job ID is required"}), 400
 
     # Check for existing
-    existing_app = Application.query.filter_by(student_id=student.id, job_id=job_id).first()
+    existing_app = Application.query.filter_by(student_id=student_id, job_id=job_id).first()
     
     if existing_app:
         if existing_app.status == 'Saved':
              # Upgrade to Applied
              existing_app.status = 'Applied'
              existing_app.applied_at = datetime.utcnow()
+             bump(student_key(student_id))
              db.session.commit()
              return jsonify({"message": "Application submitted successfully"}), 200
         else:
              return jsonify({"message": "Already applied for this job"}), 400
     
     # Create new
-    new_app = Application(student_id=student.id, job_id=job_id, status='Applied')
+    new_app = Application(student_id=student_id, job_id=job_id, status='Applied')
     db.session.add(new_app)
+    bump(student_key(student_id))
     db.session.commit()
     
     return jsonify({"message": "Application submitted successfully"}), 201
@@ -223,47 +281,87 @@ def apply_for_job():
 @api_bp.route('/applications', methods=['GET'])
 @jwt_required()
 def get_applications():
-    student = current_user.student_profile
-    apps = Application.query.filter_by(student_id=student.id).order_by(Application.applied_at.desc()).all()
+    student_id = current_student_id()
+    # Job title/company come from the same query rather than one lazy load per application
+    apps = db.session.query(
+        Application.id, Application.job_id, Application.status, Application.applied_at, Job.title, Job.company_name
+    ).join(Job, Job.id == Application.job_id) \
+        .filter(Application.student_id == student_id).order_by(Application.applied_at.desc()).all()
     
     # Custom dump
     results = []
-    for app in apps:
+    for app_id, job_id, status, applied_at, title, company in apps:
         results.append({
-            "id": app.id,
-            "job_id": app.job_id,
-            "status": app.status,
-            "applied_at": app.applied_at,
-            "job_title": app.job.title,
-            "company": app.job.company_name
+            "id": app_id,
+            "job_id": job_id,
+            "status": status,
+            "applied_at": applied_at,
+            "job_title": title,
+            "company": company
         })
     return jsonify(results)
 
 @api_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_stats():
-    student = current_user.student_profile
-    
-    # Calculate stats
-    total_apps = Application.query.filter_by(student_id=student.id).count()
-    saved_jobs = Application.query.filter_by(student_id=student.id, status='Saved').count()
-    
-    # Matches count (mock logic: match score > 80)
-    # Ideally efficient query, here using simple count for prototype
-    matches_count = JobMatch.query.filter_by(student_id=student.id).filter(JobMatch.score >= 80).count()
+    student_id = current_student_id()
+    return conditional('stats', student_id, (student_key(student_id),), lambda: _stats(current_student()))
 
-    return jsonify({
-        "matches": matches_count,
-        "applications": total_apps,
+def _stats(student):
+    return jsonify(_stats_counts(student))
+
+def _stats_counts(student):
+    """Dashboard counters: one primary-key read of the maintained student_counters row."""
+    counts = counts_for(student.id)
+    return {
+        "matches": counts['strong_matches'], # Match score >= 80
+        "applications": counts['applications'],
         "interviews": 0, # Placeholder
-        "saved": saved_jobs,
+        "saved": counts['saved'],
         "student_name": student.first_name
+    }
+
+@api_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """
+    Everything the landing page shows, in one request: top matches (as /jobs with the card
+    fields), recent applications and stats. Optional: limit (matches, default 3), applications (default 5).
+    """
+    student_id = current_student_id()
+    if student_id is None:
+        return jsonify({"error": "No student profile found"}), 404
+    return conditional('dashboard', student_id, (JOBS, student_key(student_id)), lambda: _dashboard(current_student()))
+
+def _dashboard(student):
+    limit = max(request.args.get('limit', 3, type=int), 1)
+    app_limit = max(request.args.get('applications', 5, type=int), 0)
+
+    projection = job_rows(DASHBOARD_FIELDS, 'none')
+    rows, _ = keyset_page(
+        _feed_query(student, projection.columns), JobMatch.score, Job.id,
+        lambda row: (row[JobRows.SCORE], row[JobRows.ID]), 'match_score', limit
+    )
+
+    apps = db.session.query(
+        Application.id, Application.job_id, Application.status, Application.applied_at, Job.title, Job.company_name
+    ).join(Job, Job.id == Application.job_id) \
+        .filter(Application.student_id == student.id) \
+        .order_by(Application.applied_at.desc()).limit(app_limit).all()
+
+    return jobs_response(projection.encode(rows), {
+        'applications': [
+            {"id": app_id, "job_id": job_id, "status": status, "applied_at": applied_at,
+             "job_title": title, "company": company}
+            for app_id, job_id, status, applied_at, title, company in apps
+        ],
+        'stats': _stats_counts(student)
     })
 
 @api_bp.route('/preferences', methods=['GET', 'PUT'])
 @jwt_required()
 def handle_preferences():
-    student = current_user.student_profile
+    student = current_student()
     prefs = student.preferences
     
     if not prefs:
@@ -312,6 +410,7 @@ def handle_preferences():
             
                 prefs.preferred_locations = locs
             
+        match_tracking.mark_student_changed(student.id)
         db.session.commit()
         
         # Trigger update in background via Threading + Eager execution
@@ -336,7 +435,7 @@ def handle_preferences():
 @api_bp.route('/profile', methods=['GET', 'PUT'])
 @jwt_required()
 def handle_profile():
-    student = current_user.student_profile
+    student = current_student()
     
     if request.method == 'GET':
         return jsonify({
@@ -371,5 +470,6 @@ def handle_profile():
             except Exception as e:
                 print(f"Geocoding failed: {e}")
 
+        match_tracking.mark_student_changed(student.id)
         db.session.commit()
         return jsonify({"message": "Profile updated successfully"}), 200
@@ -0,0 +1,194 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+from flask import Response, current_app
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Job, JobMatch, JobShift
+from app.services.response_cache import ResponseCache
+
+# JobSchema's column fields, selected straight from the jobs table
+JOB_COLUMNS = {
+    'id': Job.id,
+    'title': Job.title,
+    'company_name': Job.company_name,
+    'description': Job.description,
+    'salary_min': Job.salary_min,
+    'salary_max': Job.salary_max,
+    'currency': Job.currency,
+    'salary_type': Job.salary_type,
+    'location': Job.location,
+    'latitude': Job.latitude,
+    'longitude': Job.longitude,
+    'source': Job.source,
+    'external_url': Job.external_url,
+    'posted_at': Job.posted_at,
+    'is_active': Job.is_active,
+}
+# Per-student fields, added to the cached job fragment for each response
+STUDENT_FIELDS = ('match_score', 'match_breakdown')
+EXTRA_FIELDS = ('shifts',) + STUDENT_FIELDS
+
+# Same fields JobSchema dumps for a listing, and for the detail view (which adds match_analysis)
+DEFAULT_FIELDS = tuple(JOB_COLUMNS) + ('shifts', 'match_score')
+DETAIL_FIELDS = tuple(JOB_COLUMNS) + ('shifts',)
+# What JobCard shows (frontend JOB_CARD_FIELDS), for /dashboard
+DASHBOARD_FIELDS = ('id', 'title', 'company_name', 'location', 'salary_min', 'salary_max', 'salary_type',
+                    'posted_at', 'match_score', 'match_breakdown')
+
+DESCRIPTION_MODES = ('full', 'truncated', 'none')
+DESCRIPTION_PREVIEW = 200
+
+SHIFT_COLUMNS = (JobShift.job_id, JobShift.id, JobShift.day_of_week, JobShift.start_time, JobShift.end_time, JobShift.is_flexible)
+
+def parse_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """?fields=title,salary_min,... -> field names (id always included). Raises ValueError for unknown names."""
+    if not value:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in JOB_COLUMNS and f not in EXTRA_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields if 'id' in fields else ('id',) + fields
+
+_fragments = None
+
+def fragment_cache() -> Optional[ResponseCache]:
+    """Process-wide cache of encoded job fragments, or None when FRAGMENT_CACHE_SIZE is 0."""
+    global _fragments
+    size = current_app.config.get('FRAGMENT_CACHE_SIZE') or 0
+    if not size:
+        return None
+    if _fragments is None or _fragments.size != size:
+        _fragments = ResponseCache(size)
+    return _fragments
+
+class JobRows:
+    """
+    Precompiled projection for job listings.
+    The listing query selects only (Job.id, JobMatch.score, Job.posted_at, Job.updated_at)
+    and, if asked for, the match breakdown. The job's own fields are pre-encoded JSON fragments
+    cached by (projection, job id, updated_at), so a job is encoded once per change rather
+    than once per viewer; misses are loaded with one IN query. Per-student fields are appended
+    to each fragment. Build through job_rows() so each projection is compiled once.
+    """
+    ID, SCORE, POSTED_AT, UPDATED_AT, BREAKDOWN = 0, 1, 2, 3, 4
+
+    def __init__(self, fields: Tuple[str, ...], description: str = 'full'):
+        if description == 'none':
+            fields = tuple(f for f in fields if f != 'description')
+        self.key = (fields, description)
+        self.truncate = description == 'truncated'
+        self.with_shifts = 'shifts' in fields
+        self.with_score = 'match_score' in fields
+        self.with_breakdown = 'match_breakdown' in fields
+
+        # Listing query: keyset key, fragment version and per-student columns
+        self.columns = [Job.id, JobMatch.score, Job.posted_at, Job.updated_at]
+        if self.with_breakdown:
+            self.columns.append(JobMatch.breakdown)
+
+        # Fragment query, for jobs not in the cache
+        self.job_fields = [name for name in fields if name in JOB_COLUMNS]
+        self.job_columns = [Job.id, Job.updated_at]
+        for name in self.job_fields:
+            if name == 'description' and self.truncate:
+                # One character past the preview tells us whether to add an ellipsis
+                self.job_columns.append(func.substr(Job.description, 1, DESCRIPTION_PREVIEW + 1))
+            else:
+                self.job_columns.append(JOB_COLUMNS[name])
+
+    def encode(self, rows: List[tuple]) -> List[bytes]:
+        """One encoded JSON object per listing row."""
+        fragments = self._fragments({row[self.ID]: row[self.UPDATED_AT] for row in rows})
+        return [self._with_student_fields(fragments[row[self.ID]], row) for row in rows]
+
+    def fragment(self, job: Job) -> bytes:
+        """Encoded fragment for a loaded Job (the detail view), through the same cache."""
+        cache = fragment_cache()
+        key = (self.key, job.id, job.updated_at)
+        fragment = cache.get(key) if cache is not None else None
+        if fragment is None:
+            values = [getattr(job, name) for name in self.job_fields]
+            shifts = self._shifts([job.id]).get(job.id, []) if self.with_shifts else None
+            fragment = self._encode(values, shifts)
+            if cache is not None:
+                cache.put(key, fragment)
+        return fragment
+
+    def _fragments(self, versions: Dict[int, object]) -> Dict[int, bytes]:
+        cache = fragment_cache()
+        found = {}
+        if cache is not None:
+            for job_id, updated_at in versions.items():
+                fragment = cache.get((self.key, job_id, updated_at))
+                if fragment is not None:
+                    found[job_id] = fragment
+
+        missing = [job_id for job_id in versions if job_id not in found]
+        if not missing:
+            return found
+
+        rows = db.session.query(*self.job_columns).filter(Job.id.in_(missing)).all()
+        shifts = self._shifts(missing) if self.with_shifts else {}
+        for row in rows:
+            job_id, updated_at = row[0], row[1]
+            found[job_id] = self._encode(row[2:], shifts.get(job_id, []) if self.with_shifts else None)
+            if cache is not None:
+                cache.put((self.key, job_id, updated_at), found[job_id])
+        return found
+
+    def _encode(self, values, shifts) -> bytes:
+        item = dict(zip(self.job_fields, values))
+        if self.truncate and item.get('description') and len(item['description']) > DESCRIPTION_PREVIEW:
+            item['description'] = item['description'][:DESCRIPTION_PREVIEW].rstrip() + '…'
+        if shifts is not None:
+            item['shifts'] = shifts
+        return dumps(item)
+
+    def _with_student_fields(self, fragment: bytes, row) -> bytes:
+        extra = []
+        if self.with_score and row[self.SCORE] is not None:
+            extra.append(b'"match_score":' + dumps(row[self.SCORE]))
+        if self.with_breakdown and row[self.BREAKDOWN]:
+            # Stored as JSON text already
+            extra.append(b'"match_breakdown":' + row[self.BREAKDOWN].encode())
+        return splice(fragment, extra)
+
+    @staticmethod
+    def _shifts(job_ids: Iterable[int]) -> Dict[int, List[Dict]]:
+        """JobShiftSchema-shaped shifts for all the given jobs, from one IN query."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        by_job = {}
+        rows = db.session.query(*SHIFT_COLUMNS).filter(JobShift.job_id.in_(job_ids)).order_by(JobShift.id).all()
+        for job_id, shift_id, day, start, end, flexible in rows:
+            by_job.setdefault(job_id, []).append({
+                'id': shift_id, 'day_of_week': day, 'start_time': start, 'end_time': end, 'is_flexible': flexible
+            })
+        return by_job
+
+@lru_cache(maxsize=64)
+def job_rows(fields: Tuple[str, ...] = DEFAULT_FIELDS, description: str = 'full') -> JobRows:
+    return JobRows(fields, description)
+
+def _default(value):
+    # orjson covers datetimes and times natively; Decimals etc. fall back to float
+    return float(value)
+
+def dumps(value) -> bytes:
+    """orjson with datetimes as ISO 8601, same as JobSchema."""
+    return orjson.dumps(value, default=_default)
+
+def splice(fragment: bytes, members: List[bytes]) -> bytes:
+    """Add encoded '"key":value' members to an encoded JSON object."""
+    if not members:
+        return fragment
+    joined = b','.join(members)
+    return fragment[:-1] + (b',' if fragment != b'{}' else b'') + joined + b'}'
+
+def jobs_response(fragments: List[bytes], meta: Dict) -> Response:
+    """{"jobs": [...fragments], **meta} without decoding the fragments again."""
+    body = b'{"jobs":[' + b','.join(fragments) + b']}'
+    return Response(splice(body, [dumps(meta)[1:-1]] if meta else []), mimetype='application/json')
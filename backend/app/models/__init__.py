@@ -1,7 +1,8 @@
 from .user import User
 from .student import Student, StudentPreferences
 from .timetable import Timetable, ScheduleSlot
-from .job import Job, JobShift
+from .job import Job, JobShift, JobTitleGram
 from .application import Application
-from .match import JobMatch
-from .compliance import WorkLog
+from .match import JobMatch, MatchChange, DataVersion
+from .compliance import WorkLog, WeeklyHours
+from .counters import StudentCounters, STRONG_MATCH_SCORE
@@ -1,5 +1,6 @@
 from app.extensions import db
-from datetime import datetime
+from datetime import datetime, timedelta
+from .upsert import upsert
 
 class WorkLog(db.Model):
     __tablename__ = 'work_logs'
@@ -22,3 +23,52 @@ class WorkLog(db.Model):
 
     def __repr__(self):
         return f'<WorkLog Student:{self.student_id} Week:{self.week_start_date} Hours:{self.hours_worked}>'
+
+class WeeklyHours(db.Model):
+    """
+    Materialized SUM(work_logs.hours_worked) per student and week.
+    Kept current by the WorkLog listeners below; read it through services/hours_ledger.py.
+    """
+    __tablename__ = 'weekly_hours'
+
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    week_start_date = db.Column(db.Date, primary_key=True) # Monday of the week
+    total_hours = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<WeeklyHours Student:{self.student_id} Week:{self.week_start_date} Hours:{self.total_hours}>'
+
+def _add_hours(connection, student_id, week_start_date, delta):
+    """total_hours += delta for one (student, week), creating the row if needed."""
+    if not delta or student_id is None or week_start_date is None:
+        return
+    # Key by the Monday even if a log was filed under another day of the week
+    week_start_date -= timedelta(days=week_start_date.weekday())
+    table = WeeklyHours.__table__
+    upsert(connection, table, {
+        'student_id': student_id, 'week_start_date': week_start_date, 'total_hours': delta, 'updated_at': datetime.utcnow()
+    }, ['student_id', 'week_start_date'], lambda excluded: {
+        'total_hours': table.c.total_hours + excluded.total_hours, 'updated_at': excluded.updated_at
+    })
+
+@db.event.listens_for(WorkLog, 'after_insert')
+def _ledger_insert(mapper, connection, target):
+    _add_hours(connection, target.student_id, target.week_start_date, target.hours_worked or 0.0)
+
+@db.event.listens_for(WorkLog, 'before_update')
+def _ledger_update(mapper, connection, target):
+    # Read the stored row: the old values aren't in attribute history if the log was expired
+    table = WorkLog.__table__
+    old = connection.execute(
+        db.select(table.c.student_id, table.c.week_start_date, table.c.hours_worked).where(table.c.id == target.id)
+    ).first()
+    new = (target.student_id, target.week_start_date, target.hours_worked)
+    if old is None or tuple(old) == new:
+        return
+    _add_hours(connection, old.student_id, old.week_start_date, -(old.hours_worked or 0.0))
+    _add_hours(connection, target.student_id, target.week_start_date, target.hours_worked or 0.0)
+
+@db.event.listens_for(WorkLog, 'after_delete')
+def _ledger_delete(mapper, connection, target):
+    _add_hours(connection, target.student_id, target.week_start_date, -(target.hours_worked or 0.0))
@@ -0,0 +1,96 @@
+from app.extensions import db
+from datetime import datetime
+from .application import Application
+from .match import JobMatch
+from .upsert import upsert
+
+# A match counts towards /stats "matches" from this score
+STRONG_MATCH_SCORE = 80
+
+class StudentCounters(db.Model):
+    """
+    Per-student /stats counts, so the endpoint is one primary-key read.
+    Application and ORM JobMatch writes adjust them through the listeners below;
+    MatchWriter recounts matches for the students in each batch it writes.
+    services/student_counters.reconcile() corrects any drift (e.g. bulk SQL).
+    """
+    __tablename__ = 'student_counters'
+
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    saved = db.Column(db.Integer, nullable=False, default=0)
+    strong_matches = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StudentCounters Student:{self.student_id} Apps:{self.applications} Matches:{self.strong_matches}>'
+
+def add_counts(connection, student_id, applications=0, saved=0, strong_matches=0):
+    """Add deltas to one student's counters, creating the row if needed."""
+    if student_id is None or not (applications or saved or strong_matches):
+        return
+    table = StudentCounters.__table__
+    upsert(connection, table, [{
+        'student_id': student_id, 'applications': applications, 'saved': saved,
+        'strong_matches': strong_matches, 'updated_at': datetime.utcnow()
+    }], ['student_id'], lambda excluded: {
+        'applications': table.c.applications + excluded.applications,
+        'saved': table.c.saved + excluded.saved,
+        'strong_matches': table.c.strong_matches + excluded.strong_matches,
+        'updated_at': excluded.updated_at
+    })
+
+def set_counts(connection, counts, columns=('applications', 'saved', 'strong_matches')):
+    """Overwrite `columns` for {student_id: {column: value}}, creating rows if needed."""
+    if not counts:
+        return
+    now = datetime.utcnow()
+    upsert(connection, StudentCounters.__table__, [
+        {'student_id': student_id, 'updated_at': now, **{c: values.get(c, 0) for c in columns}}
+        for student_id, values in sorted(counts.items())
+    ], ['student_id'], lambda excluded: {**{c: excluded[c] for c in columns}, 'updated_at': excluded.updated_at})
+
+def _is_saved(status):
+    return 1 if status == 'Saved' else 0
+
+def _is_strong(score):
+    return 1 if score is not None and score >= STRONG_MATCH_SCORE else 0
+
+@db.event.listens_for(Application, 'after_insert')
+def _application_insert(mapper, connection, target):
+    add_counts(connection, target.student_id, applications=1, saved=_is_saved(target.status))
+
+@db.event.listens_for(Application, 'before_update')
+def _application_update(mapper, connection, target):
+    # Read the stored row: the old values aren't in attribute history if the row was expired
+    table = Application.__table__
+    old = connection.execute(
+        db.select(table.c.student_id, table.c.status).where(table.c.id == target.id)
+    ).first()
+    if old is None or (old.student_id, old.status) == (target.student_id, target.status):
+        return
+    add_counts(connection, old.student_id, applications=-1, saved=-_is_saved(old.status))
+    add_counts(connection, target.student_id, applications=1, saved=_is_saved(target.status))
+
+@db.event.listens_for(Application, 'after_delete')
+def _application_delete(mapper, connection, target):
+    add_counts(connection, target.student_id, applications=-1, saved=-_is_saved(target.status))
+
+@db.event.listens_for(JobMatch, 'after_insert')
+def _match_insert(mapper, connection, target):
+    add_counts(connection, target.student_id, strong_matches=_is_strong(target.score))
+
+@db.event.listens_for(JobMatch, 'before_update')
+def _match_update(mapper, connection, target):
+    table = JobMatch.__table__
+    old = connection.execute(
+        db.select(table.c.student_id, table.c.score).where(table.c.id == target.id)
+    ).first()
+    if old is None or (old.student_id, _is_strong(old.score)) == (target.student_id, _is_strong(target.score)):
+        return
+    add_counts(connection, old.student_id, strong_matches=-_is_strong(old.score))
+    add_counts(connection, target.student_id, strong_matches=_is_strong(target.score))
+
+@db.event.listens_for(JobMatch, 'after_delete')
+def _match_delete(mapper, connection, target):
+    add_counts(connection, target.student_id, strong_matches=-_is_strong(target.score))
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.services.scheduler import week_minutes
 from datetime import datetime
 
 class Job(db.Model):
@@ -31,16 +32,19 @@ class Job(db.Model):
     posted_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime)
     is_active = db.Column(db.Boolean, default=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     __table_args__ = (
         db.Index('idx_job_location', 'location'),
         db.Index('idx_job_salary', 'salary_min'),
         db.Index('idx_job_active', 'is_active'),
+        db.Index('idx_job_posted', 'posted_at', 'id'), # Keyset pages by posted_at
     )
 
     # Relationships
     shifts = db.relationship('JobShift', backref='job', lazy='dynamic', cascade='all, delete-orphan')
     applications = db.relationship('Application', backref='job', lazy='dynamic')
+    title_grams = db.relationship('JobTitleGram', lazy='dynamic', cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Job {self.title} @ {self.company_name}>'
@@ -56,3 +60,36 @@ class JobShift(db.Model):
     
     # Flexible shifts?
     is_flexible = db.Column(db.Boolean, default=False)
+
+    # Derived from day_of_week/start_time/end_time on write (see _sync_week_minutes),
+    # so schedule clashes can be found in SQL (services/schedule_filter.py)
+    start_minute_of_week = db.Column(db.Integer, index=True)
+    end_minute_of_week = db.Column(db.Integer, index=True)
+
+class JobTitleGram(db.Model):
+    __tablename__ = 'job_title_grams'
+
+    # Inverted index: lower-cased title trigram -> job. Maintained on every job insert and
+    # title change (see _sync_title_grams) so role filters don't need a LIKE scan over jobs.
+    gram = db.Column(db.String(3), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+
+@db.event.listens_for(JobShift, 'before_insert')
+@db.event.listens_for(JobShift, 'before_update')
+def _sync_week_minutes(mapper, connection, target):
+    target.start_minute_of_week, target.end_minute_of_week = week_minutes(
+        target.day_of_week, target.start_time, target.end_time
+    )
+
+@db.event.listens_for(Job, 'after_insert')
+@db.event.listens_for(Job, 'after_update')
+def _sync_title_grams(mapper, connection, target):
+    if not db.inspect(target).attrs.title.history.has_changes():
+        return
+    # Imported here: services/title_index imports the models
+    from app.services.title_index import title_grams
+    table = JobTitleGram.__table__
+    connection.execute(table.delete().where(table.c.job_id == target.id))
+    grams = title_grams(target.title)
+    if grams:
+        connection.execute(table.insert(), [{'gram': gram, 'job_id': target.id} for gram in sorted(grams)])
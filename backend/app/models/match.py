@@ -17,12 +17,43 @@ class JobMatch(db.Model):
     breakdown = db.Column(db.Text) 
     
     last_calculated = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Full calculate_match result (JSON) for the job detail view, written on first view.
+    # The rematch only stores scores, so this has its own timestamp (see services/match_analysis.py)
+    analysis = db.Column(db.Text)
+    analysis_calculated = db.Column(db.DateTime)
     
     # Ensure one match record per student-job pair
     __table_args__ = (
         db.UniqueConstraint('student_id', 'job_id', name='uq_student_job_match'),
         db.Index('idx_match_score', 'score'), # Index for fast sorting by score
+        db.Index('idx_match_student_score', 'student_id', 'score', 'job_id'), # Keyset pages of one student's matches
     )
 
     def __repr__(self):
         return f'<JobMatch Student:{self.student_id} Job:{self.job_id} Score:{self.score}>'
+
+class MatchChange(db.Model):
+    __tablename__ = 'match_changes'
+
+    # Append-only change log consumed by the incremental rematch.
+    # Rows are deleted once a rematch has covered them (see services/match_tracking.py)
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(16), nullable=False) # 'job' or 'student'
+    entity_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MatchChange {self.entity_type}:{self.entity_id}>'
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+
+    # Counters bumped whenever the data behind a cached response changes (see services/data_versions.py):
+    # 'jobs' for the job table, 'student:<id>' for one student's matches, applications and profile
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DataVersion {self.key}={self.version}>'
@@ -21,6 +21,8 @@ class Student(db.Model):
     longitude = db.Column(db.Float)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Last change to anything matching reads (profile, preferences, timetable); set by match_tracking
+    profile_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
     timetable = db.relationship('Timetable', backref='student', uselist=False, lazy=True)
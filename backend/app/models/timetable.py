@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.services.scheduler import week_minutes
 
 class Timetable(db.Model):
     __tablename__ = 'timetables'
@@ -23,3 +24,14 @@ class ScheduleSlot(db.Model):
     
     # Required for conflict detection: buffer time for commute (optional per slot)
     commute_buffer_mins = db.Column(db.Integer, default=30)
+
+    # Derived from day_of_week/start_time/end_time on write (see _sync_week_minutes)
+    start_minute_of_week = db.Column(db.Integer, index=True)
+    end_minute_of_week = db.Column(db.Integer, index=True)
+
+@db.event.listens_for(ScheduleSlot, 'before_insert')
+@db.event.listens_for(ScheduleSlot, 'before_update')
+def _sync_week_minutes(mapper, connection, target):
+    target.start_minute_of_week, target.end_minute_of_week = week_minutes(
+        target.day_of_week, target.start_time, target.end_time
+    )
@@ -0,0 +1,20 @@
+from typing import Callable, Dict, List, Sequence, Union
+from sqlalchemy.dialects import postgresql, sqlite
+
+def upsert(executor, table, rows: Union[Dict, List[Dict]], index_elements: Sequence[str], set_: Callable):
+    """
+    INSERT rows ... ON CONFLICT (index_elements) DO UPDATE, on PostgreSQL or SQLite.
+    `executor` is a Connection (mapper listeners) or a Session; `set_` gets the statement's
+    `excluded` row and returns the SET clause.
+    """
+    bind = executor.get_bind() if hasattr(executor, 'get_bind') else executor
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on the '{dialect}' dialect")
+
+    stmt = insert(table).values(rows)
+    executor.execute(stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_(stmt.excluded)))
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from app.models import Job, JobShift
 from app.extensions import db
+from app.services import data_versions, match_tracking
 from .normalization import normalize_job_data, is_duplicate_job
 import logging
 
@@ -79,5 +80,10 @@ class BaseScraper(ABC):
             new_shift = JobShift(job_id=job.id, **shift)
             db.session.add(new_shift)
 
+        # Queue the new job for the incremental rematch (the title index updates on flush)
+        match_tracking.mark_job_changed(job.id)
+
     def commit(self):
+        if self.jobs_saved:
+            data_versions.bump(data_versions.JOBS)
         db.session.commit()
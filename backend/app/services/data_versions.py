@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Tuple
+from app.extensions import db
+from app.models import DataVersion
+from app.models.upsert import upsert
+
+JOBS = 'jobs'
+
+def student_key(student_id: int) -> str:
+    return f'student:{student_id}'
+
+def bump(*keys: str, session=None):
+    """Increment the given version counters, creating them if needed. Caller commits."""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    now = datetime.utcnow()
+    table = DataVersion.__table__
+    upsert(session or db.session, table, [{'key': key, 'version': 1, 'updated_at': now} for key in keys], ['key'],
+           lambda excluded: {'version': table.c.version + 1, 'updated_at': excluded.updated_at})
+
+def versions(*keys: str) -> Tuple[int, ...]:
+    """Current value of each counter (0 if never bumped), in one query."""
+    rows = dict(db.session.query(DataVersion.key, DataVersion.version).filter(DataVersion.key.in_(keys)).all())
+    return tuple(rows.get(key, 0) for key in keys)
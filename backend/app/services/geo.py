@@ -0,0 +1,79 @@
+import math
+from typing import Optional, Tuple
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+# Door-to-door speed used to turn max_commute_time (minutes) into a radius.
+# Students mostly bus/train/cycle, so this is well under driving speed.
+COMMUTE_MPH = 15
+
+# Grid cell size for GridIndex (~17 miles north-south)
+GRID_CELL_DEG = 0.25
+
+def has_coordinates(lat, lng) -> bool:
+    """backfill_geo.py leaves 0 for 'not geocoded', so treat it like None."""
+    return bool(lat) and bool(lng)
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles. Any argument may be a NumPy array."""
+    lat1, lng1, lat2, lng2 = (np.radians(v) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def commute_radius_miles(max_commute_time) -> Optional[float]:
+    """Radius a student can reach within max_commute_time minutes, or None if unset."""
+    if not max_commute_time:
+        return None
+    return max_commute_time / 60 * COMMUTE_MPH
+
+def distance_score(miles, radius):
+    """100 on the doorstep, 70 at the edge of the commute radius, 0 beyond it."""
+    score = np.where(miles <= radius, np.rint(100 - 30 * np.asarray(miles) / radius), 0)
+    return score.astype(int) if isinstance(score, np.ndarray) and score.ndim else int(score)
+
+class GridIndex:
+    """
+    Fixed-size lat/lng buckets over a set of points (e.g. the active jobs of a rematch).
+    query_radius() only measures the points in cells overlapping the search box,
+    so most far-away jobs are never touched.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_deg: float = GRID_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.latitudes = np.asarray(latitudes, dtype=float)
+        self.longitudes = np.asarray(longitudes, dtype=float)
+
+        buckets = {}
+        valid = ~(np.isnan(self.latitudes) | np.isnan(self.longitudes))
+        for index in np.flatnonzero(valid):
+            buckets.setdefault(self._cell(self.latitudes[index], self.longitudes[index]), []).append(index)
+        self.buckets = {cell: np.array(indices) for cell, indices in buckets.items()}
+
+    def _cell(self, lat, lng) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def query_radius(self, lat, lng, miles) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, distances) of every point within `miles` of (lat, lng)."""
+        if not self.buckets:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        dlat = miles / MILES_PER_DEGREE_LAT
+        dlng = miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        lat_lo, lng_lo = self._cell(lat - dlat, lng - dlng)
+        lat_hi, lng_hi = self._cell(lat + dlat, lng + dlng)
+
+        found = [
+            self.buckets[(row, col)]
+            for row in range(lat_lo, lat_hi + 1)
+            for col in range(lng_lo, lng_hi + 1)
+            if (row, col) in self.buckets
+        ]
+        if not found:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        indices = np.concatenate(found)
+        distances = haversine_miles(lat, lng, self.latitudes[indices], self.longitudes[indices])
+        inside = distances <= miles
+        return indices[inside], distances[inside]
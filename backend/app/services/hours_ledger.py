@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+from app.extensions import db
+from app.models import WeeklyHours, WorkLog
+
+def week_start(day: date = None) -> date:
+    """Monday of the week containing `day` (today by default)."""
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+def hours_for_week(student_id: int, week: date = None) -> float:
+    """Hours logged by the student in the week containing `week` (one primary-key lookup)."""
+    row = db.session.get(WeeklyHours, (student_id, week_start(week)))
+    return row.total_hours if row else 0.0
+
+def rolling_hours(student_id: int, week: date = None, weeks: int = 4) -> float:
+    """Hours over the `weeks` weeks ending with the week containing `week`."""
+    last = week_start(week)
+    first = last - timedelta(weeks=weeks - 1)
+    total = db.session.query(db.func.sum(WeeklyHours.total_hours)).filter(
+        WeeklyHours.student_id == student_id,
+        WeeklyHours.week_start_date.between(first, last)
+    ).scalar()
+    return total or 0.0
+
+def remaining_hours(student, week: date = None) -> Optional[float]:
+    """weekly_hours_limit minus hours already logged that week (None if the student has no limit)."""
+    if not student.weekly_hours_limit:
+        return None
+    return max(0.0, student.weekly_hours_limit - hours_for_week(student.id, week))
+
+def is_over_limit(student, week: date = None) -> bool:
+    return bool(student.weekly_hours_limit) and hours_for_week(student.id, week) > student.weekly_hours_limit
+
+def hours_by_student(student_ids: Iterable[int], week: date = None) -> Dict[int, float]:
+    """hours_for_week for many students in one query (for batch matching)."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+    rows = db.session.query(WeeklyHours.student_id, WeeklyHours.total_hours).filter(
+        WeeklyHours.student_id.in_(student_ids),
+        WeeklyHours.week_start_date == week_start(week)
+    ).all()
+    return dict(rows)
+
+def rebuild():
+    """
+    Recompute the whole ledger from work_logs. The WorkLog listeners keep it current,
+    but bulk Query.update()/delete() on work_logs bypasses them - run this afterwards.
+    """
+    WeeklyHours.query.delete()
+    totals = {}
+    rows = db.session.query(
+        WorkLog.student_id, WorkLog.week_start_date, db.func.sum(WorkLog.hours_worked)
+    ).group_by(WorkLog.student_id, WorkLog.week_start_date).all()
+    for student_id, week, hours in rows:
+        key = (student_id, week_start(week))
+        totals[key] = totals.get(key, 0.0) + (hours or 0.0)
+
+    db.session.add_all([
+        WeeklyHours(student_id=student_id, week_start_date=week, total_hours=hours)
+        for (student_id, week), hours in totals.items()
+    ])
+    db.session.commit()
+    return len(totals)
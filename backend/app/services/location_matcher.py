@@ -1,4 +1,9 @@
 import json
+from functools import lru_cache
+from .geo import distance_score
+
+# Distinct (preference signature, job city) pairs kept by location_tier()
+LOCATION_CACHE_SIZE = 8192
 
 class CityLocationMatcher:
     """
@@ -54,7 +59,7 @@ class CityLocationMatcher:
              if isinstance(Raw_pref, str):
                  self.preferred_cities = [c.strip() for c in Raw_pref.split(',')] if Raw_pref else []
              else:
-                 self.preferred_cities = Raw_pref or []
+                 self.preferred_cities = list(Raw_pref or [])
                  
              self.open_to_other = prefs.get('open_to_other_cities', False)
         else:
@@ -77,6 +82,17 @@ class CityLocationMatcher:
         if self.primary_city and self.primary_city not in self.preferred_cities:
             self.preferred_cities.append(self.primary_city)
 
+        # Lower-cased once for _is_city_match
+        self._preferred_lower = tuple(c.lower() for c in self.preferred_cities if c)
+        self._primary_lower = (self.primary_city.lower(),) if self.primary_city else ()
+        region_info = self._get_region_info(self.primary_city)
+        self._nearby_lower = tuple(c.lower() for c in region_info['nearby']) if region_info else None
+
+    @property
+    def signature(self):
+        """Hashable key for everything that affects scoring (see location_tier)."""
+        return (self.primary_city, tuple(self.preferred_cities), bool(self.open_to_other))
+
     def calculate_location_score(self, job_data):
         """
         Calculate location match score (0-100) based on city
@@ -90,7 +106,12 @@ class CityLocationMatcher:
         # No, usually job_data['location']['name'] is "Oxford" or "Oxford, UK"
         # We need to clean it.
         job_city = job_city_raw.split(',')[0].strip() # "Birmingham, West Midlands" -> "Birmingham"
-        
+        return self.score_city(job_city, is_remote)
+
+    def score_city(self, job_city, is_remote=False):
+        """
+        Same as calculate_location_score, for a city that is already parsed.
+        """
         # PRIORITY 1: Remote jobs (always show, always high score)
         if is_remote:
             return {
@@ -102,11 +123,13 @@ class CityLocationMatcher:
                 'badge_color': 'purple'
             }
         
+        job_city_lower = job_city.lower() if job_city else ''
+
         # PRIORITY 2: Preferred cities (exact match)
         # Check against basic string match logic
-        if self._is_city_match(job_city, self.preferred_cities):
+        if self._is_city_match(job_city_lower, self._preferred_lower):
             # Is it the PRIMARY city?
-            if self._is_city_match(job_city, [self.primary_city]):
+            if self._is_city_match(job_city_lower, self._primary_lower):
                 return {
                     'score': 100,
                     'priority': 'highest',
@@ -128,11 +151,8 @@ class CityLocationMatcher:
         
         # PRIORITY 3: Nearby cities (commutable distance)
         # Get nearby for PRIMARY city
-        region_info = self._get_region_info(self.primary_city)
-        if region_info:
-            nearby_cities = region_info['nearby']
-            
-            if self._is_city_match(job_city, nearby_cities):
+        if self._nearby_lower is not None:
+            if self._is_city_match(job_city_lower, self._nearby_lower):
                 if self.open_to_other:
                     return {
                         'score': 70,
@@ -155,6 +175,9 @@ class CityLocationMatcher:
                     }
         
         # PRIORITY 5: Different region entirely
+        return self._score_other_region(job_city)
+
+    def _score_other_region(self, job_city):
         if self.open_to_other:
             return {
                 'score': 30,
@@ -177,12 +200,44 @@ class CityLocationMatcher:
                 'hidden_by_default': True,
                 'excluded': True
             }
+
+    def score_within_commute(self, job_city, base, miles, radius, explain=True):
+        """
+        Upgrade a city tier for a job that is within the student's commute radius.
+        Preferred/primary cities keep their tier; anything else scores on distance.
+        explain=False leaves out the reason text (score-only matching).
+        """
+        score = distance_score(miles, radius)
+        if score <= base['score']:
+            return base
+        if not explain:
+            return {'score': score, 'priority': 'medium', 'tier': 3, 'badge': 'COMMUTABLE', 'badge_color': 'green'}
+        return {
+            'score': score,
+            'priority': 'medium',
+            'tier': 3,
+            'reason': f'📍 {job_city} ({miles:.1f} miles, within your commute)',
+            'badge': 'COMMUTABLE',
+            'badge_color': 'green',
+            'distance_miles': round(float(miles), 1)
+        }
+
+    def score_beyond_commute(self, job_city, base):
+        """
+        Downgrade a job outside the commute radius that only matched as a 'nearby' city.
+        Remote and explicitly preferred cities are left alone.
+        """
+        if base['tier'] not in (3, 4):
+            return base
+        result = dict(self._score_other_region(job_city))
+        result['reason'] = f'📍 {job_city} (beyond your commute)'
+        return result
             
-    def _is_city_match(self, job_city, target_list):
-        if not job_city or not target_list: return False
-        job_city_lower = job_city.lower()
-        for target in target_list:
-            if target and target.lower() in job_city_lower:
+    def _is_city_match(self, job_city_lower, targets_lower):
+        """Substring match of already lower-cased city names."""
+        if not job_city_lower: return False
+        for target in targets_lower:
+            if target in job_city_lower:
                 return True
         return False
         
@@ -196,3 +251,41 @@ class CityLocationMatcher:
         # Check if city is listed as 'nearby' in another region? (Reverse lookup could be useful)
         # For now, simplistic.
         return None
+
+
+@lru_cache(maxsize=256)
+def matcher_for(signature):
+    """One CityLocationMatcher per preference signature (primary, preferred, open_to_other)."""
+    primary_city, preferred_cities, open_to_other = signature
+    return CityLocationMatcher({
+        'primary_city': primary_city,
+        'preferred_locations': list(preferred_cities),
+        'open_to_other_cities': open_to_other
+    })
+
+@lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def location_tier(signature, job_city, is_remote=False):
+    """
+    Memoized CityLocationMatcher.score_city.
+    Jobs share a small set of city strings, so most pairs are a cache hit.
+    The returned dict is shared between callers - do not mutate it.
+    """
+    return matcher_for(signature).score_city(job_city, is_remote)
+
+@lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def beyond_commute_tier(signature, job_city, is_remote=False):
+    """Memoized CityLocationMatcher.score_beyond_commute (shared dict, do not mutate)."""
+    return matcher_for(signature).score_beyond_commute(job_city, location_tier(signature, job_city, is_remote))
+
+def commute_tier(signature, job_city, is_remote=False, miles=None, radius=None, explain=True):
+    """
+    location_tier adjusted for the real distance to the job.
+    miles=None means the distance is unknown (no coordinates or no max_commute_time),
+    math.inf means "known to be outside the radius".
+    """
+    base = location_tier(signature, job_city, is_remote)
+    if miles is None or radius is None or is_remote:
+        return base
+    if miles <= radius:
+        return matcher_for(signature).score_within_commute(job_city, base, miles, radius, explain)
+    return beyond_commute_tier(signature, job_city, is_remote)
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+from typing import Dict
+from app.extensions import db
+from app.models import JobMatch
+from .data_versions import bump, student_key
+from .matching import MatchingEngine
+from .profiles import compile_job, compile_student
+
+def is_fresh(match: JobMatch, student, job) -> bool:
+    """The stored analysis was computed after the last change to either side."""
+    if not match.analysis or not match.analysis_calculated:
+        return False
+    changed = max(student.profile_updated_at or datetime.min, job.updated_at or datetime.min)
+    return match.analysis_calculated >= changed
+
+def job_analysis(student, job, engine: MatchingEngine = None) -> Dict:
+    """
+    calculate_match(explain=True) for the job detail view.
+    Served from the student's JobMatch row while fresh; otherwise recomputed and written
+    back, along with the score if it moved. Jobs without a stored match (out of range,
+    or not in the student's top K) are computed every time and not stored.
+    """
+    match = JobMatch.query.filter_by(student_id=student.id, job_id=job.id).first()
+    if match is not None and is_fresh(match, student, job):
+        return json.loads(match.analysis)
+
+    engine = engine or MatchingEngine()
+    result = engine.calculate_match(compile_student(student), compile_job(job), explain=True)
+    if match is None:
+        return result
+
+    if match.score != result['total_score']:
+        # The feed shows this score too, so it needs a new ETag
+        match.score = result['total_score']
+        match.breakdown = json.dumps(result['breakdown'])
+        match.last_calculated = datetime.utcnow()
+        bump(student_key(student.id))
+    match.analysis = json.dumps(result)
+    match.analysis_calculated = datetime.utcnow()
+    db.session.commit()
+    return result
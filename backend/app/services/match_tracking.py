@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Set, Tuple
+from app.extensions import db
+from app.models import MatchChange, Student
+from . import data_versions, student_cache
+
+JOB = 'job'
+STUDENT = 'student'
+
+def mark_job_changed(job_id: int):
+    """Record that a job was ingested or edited. Caller commits."""
+    db.session.add(MatchChange(entity_type=JOB, entity_id=job_id))
+
+def mark_student_changed(student_id: int):
+    """Record that a student's profile, preferences or timetable changed. Caller commits."""
+    db.session.add(MatchChange(entity_type=STUDENT, entity_id=student_id))
+    # Stored job-detail analyses from before now are stale
+    Student.query.filter_by(id=student_id).update({'profile_updated_at': datetime.utcnow()})
+    # Their filtered job feed and stats change right away, before any rematch
+    data_versions.bump(data_versions.student_key(student_id))
+    student_cache.evict(student_id)
+
+def pending_changes() -> Tuple[List[int], Set[int], Set[int]]:
+    """
+    Collapse the log into (change_ids, student_ids, job_ids). Pass change_ids to consume()
+    once the rematch is done; changes committed after this read are left for the next run.
+    """
+    rows = db.session.query(MatchChange.id, MatchChange.entity_type, MatchChange.entity_id).all()
+    change_ids = [change_id for change_id, _, _ in rows]
+    student_ids = {entity_id for _, entity_type, entity_id in rows if entity_type == STUDENT}
+    job_ids = {entity_id for _, entity_type, entity_id in rows if entity_type == JOB}
+    return change_ids, student_ids, job_ids
+
+def consume(change_ids: List[int], chunk_size: int = 500):
+    """
+    Drop exactly the log entries a completed rematch has covered. Not an id range: ids are
+    assigned at insert but rows become visible at commit, so a lower id can show up late.
+    """
+    for i in range(0, len(change_ids), chunk_size):
+        MatchChange.query.filter(MatchChange.id.in_(change_ids[i:i + chunk_size])).delete(synchronize_session=False)
+    db.session.commit()
@@ -0,0 +1,135 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Any
+
+from app.extensions import db
+from app.models import JobMatch
+from app.models.upsert import upsert
+from .data_versions import bump, student_key
+from .student_counters import recount_matches
+
+logger = logging.getLogger(__name__)
+
+class MatchWriter:
+    """
+    Buffers JobMatch results and writes them in batches with
+    INSERT ... ON CONFLICT (student_id, job_id) DO UPDATE (uq_student_job_match).
+    Works on PostgreSQL and SQLite (3.24+).
+
+    Usage:
+        with MatchWriter() as writer:
+            writer.add(student_id, job_id, score, breakdown)
+            writer.discard(student_id, dropped_job_ids)
+        writer.written, writer.failures
+    """
+
+    UPDATE_COLUMNS = ('score', 'breakdown', 'last_calculated')
+
+    def __init__(self, batch_size: int = 500, session=None):
+        self.batch_size = batch_size
+        self.session = session or db.session
+        self.buffer: Dict[tuple, Dict[str, Any]] = {}
+        # (student_id, [job_id, ...]) pairs whose JobMatch rows should be removed
+        self.discards: List[tuple] = []
+        self.written = 0
+        self.batches = 0
+        # One entry per failed row: {'student_id', 'job_id', 'error'}
+        self.failures: List[Dict[str, Any]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def add(self, student_id: int, job_id: int, score: float, breakdown: Any):
+        # Keyed by pair: Postgres rejects an upsert that touches the same row twice in one statement
+        self.buffer[(student_id, job_id)] = {
+            'student_id': student_id,
+            'job_id': job_id,
+            'score': score,
+            'breakdown': breakdown if isinstance(breakdown, str) else json.dumps(breakdown),
+            'last_calculated': datetime.utcnow()
+        }
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def discard(self, student_id: int, job_ids: List[int]):
+        """Delete a student's matches for these jobs (e.g. dropped out of the top K)."""
+        if job_ids:
+            self.discards.append((student_id, list(job_ids)))
+            if sum(len(ids) for _, ids in self.discards) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.buffer and not self.discards:
+            return
+        rows = list(self.buffer.values())
+        discards = self.discards
+        self.buffer = {}
+        self.discards = []
+        self.batches += 1
+
+        students = {row['student_id'] for row in rows} | {student_id for student_id, _ in discards}
+        try:
+            self._delete(discards)
+            if rows:
+                self._upsert(rows)
+            self._refresh_students(students)
+            self.session.commit()
+            self.written += len(rows)
+        except Exception as e:
+            self.session.rollback()
+            logger.warning(f"Match batch of {len(rows)} failed ({e}); retrying rows individually.")
+            self._delete_separately(discards)
+            self._write_individually(rows)
+            self._refresh_separately(students)
+
+    def _delete(self, discards):
+        for student_id, job_ids in discards:
+            self.session.query(JobMatch).filter(
+                JobMatch.student_id == student_id, JobMatch.job_id.in_(job_ids)
+            ).delete(synchronize_session=False)
+
+    def _delete_separately(self, discards):
+        if not discards:
+            return
+        try:
+            self._delete(discards)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error removing dropped matches: {e}")
+
+    def _refresh_students(self, students):
+        # Bulk statements skip the ORM listeners: recount /stats matches, and start a new
+        # match generation so the students' cached /jobs and /stats go stale
+        recount_matches(students, session=self.session)
+        bump(*[student_key(student_id) for student_id in students], session=self.session)
+
+    def _refresh_separately(self, students):
+        try:
+            self._refresh_students(students)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error refreshing match counters and versions: {e}")
+
+    def _write_individually(self, rows: List[Dict[str, Any]]):
+        # Isolate the bad rows so the rest of the batch still lands
+        for row in rows:
+            try:
+                self._upsert([row])
+                self.session.commit()
+                self.written += 1
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Error writing match student={row['student_id']} job={row['job_id']}: {e}")
+                self.failures.append({'student_id': row['student_id'], 'job_id': row['job_id'], 'error': str(e)})
+
+    def _upsert(self, rows: List[Dict[str, Any]]):
+        upsert(self.session, JobMatch.__table__, rows, ['student_id', 'job_id'],
+               lambda excluded: {col: excluded[col] for col in self.UPDATE_COLUMNS})
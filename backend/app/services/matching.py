@@ -1,6 +1,30 @@
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Union
 from .scheduler import ScheduleAnalyzer
+from .location_matcher import commute_tier
+from .geo import GridIndex, commute_radius_miles, distance_score, has_coordinates, haversine_miles
+from .skill_scanner import SkillScanner
+from .title_index import TitleIndex
+from .profiles import (
+    StudentProfile, JobFeatures, HOURS_PER_YEAR, as_student_profile, as_job_features
+)
+from functools import lru_cache
+import heapq
 import math
+import numpy as np
+
+def round_score(total):
+    """
+    Totals to one decimal, the same way for a float or an array. Python's round() and
+    np.round() disagree on some halves (72.45 -> 72.5 vs 72.4), so every scoring path
+    rounds here and a stored batch score always equals calculate_match's.
+    """
+    rounded = np.round(total, 1)
+    return float(rounded) if np.ndim(rounded) == 0 else rounded
+
+@lru_cache(maxsize=64)
+def _badge_meta(tier, badge, badge_color):
+    """Shared location_data for explain=False results (what the job list needs, no reason)."""
+    return {'tier': tier, 'badge': badge, 'badge_color': badge_color}
 
 class MatchingEngine:
     def __init__(self):
@@ -15,33 +39,34 @@ class MatchingEngine:
             'salary': 0.05
         }
 
-    def calculate_match(self, student_profile: Dict, job_data: Dict) -> Dict[str, Any]:
+    def calculate_match(self, student_profile: Union[StudentProfile, Dict], job_data: Union[JobFeatures, Dict],
+                        explain: bool = True) -> Dict[str, Any]:
         """
         Calculate comprehensive match score (0-100) and breakdown.
+        Accepts compiled StudentProfile/JobFeatures (see services/profiles.py) or legacy dicts.
+        explain=False is the score-only mode for batch runs: same numbers, but no schedule
+        messages, and location_data carries only tier/badge/badge_color (no reason).
         """
+        student = as_student_profile(student_profile)
+        job = as_job_features(job_data)
+
         # 1. Schedule Score (35%)
-        schedule_result = self.scheduler.analyze_fit(
-            student_profile.get('timetable', []), 
-            job_data.get('shifts', [])
-        )
-        schedule_score = schedule_result['score']
+        if explain:
+            schedule_result = self.scheduler.analyze_intervals(student.timetable, job.shifts, job.shift_pattern)
+            schedule_score = schedule_result['score']
+        else:
+            schedule_score = self.scheduler.score_intervals(student.timetable, job.shifts, job.shift_pattern)
 
         # 2. Location Score (TIERED SYSTEM)
-        # Initialize City Matcher with user preferences
-        from .location_matcher import CityLocationMatcher
-        loc_matcher = CityLocationMatcher(student_profile.get('preferences', {}))
-        
-        # Calculate Tiered Score
-        # We pass job_data because it contains 'is_remote' and raw 'location' dict
-        loc_result = loc_matcher.calculate_location_score(job_data)
+        # City tiers are memoized per (preference signature, job city), then adjusted for
+        # the real distance when both sides have coordinates and a max commute is set
+        loc_result = commute_tier(
+            student.location_signature, job.city, job.is_remote, self._job_distance(student, job),
+            student.commute_radius, explain
+        )
         
         location_score = loc_result['score']
-        location_meta = {
-            'tier': loc_result['tier'],
-            'badge': loc_result['badge'],
-            'badge_color': loc_result['badge_color'],
-            'reason': loc_result['reason']
-        }
+        location_meta = self._location_meta(loc_result, explain)
         
         if loc_result.get('excluded'):
              # If strictly excluded, force total score to 0? Or just penalty?
@@ -50,38 +75,20 @@ class MatchingEngine:
              pass
 
         # 3. Skills Score (20%)
-        skills_score = self._calculate_skills_score(
-            set(student_profile.get('skills', [])),
-            set(job_data.get('skills', [])), # Assuming pre-extracted or passed
-            job_data.get('description', '')
-        )
+        skills_score = self._job_skills_score(student.skills, job)
 
         # 4. Salary/Hours Score (10%)
-        salary_score = self._calculate_salary_score(
-            student_profile.get('min_salary', 0),
-            job_data.get('salary_min'),
-            job_data.get('salary_max'),
-            job_data.get('salary_type', 'hourly')
-        )
+        salary_score = self._hourly_salary_score(student.min_salary, job.salary_min, job.salary_max)
 
         # 5. Preferences Score (10%)
-        pref_score = self._calculate_preference_score(
-            student_profile.get('preferences', {}),
-            job_data
-        )
+        pref_score = self._role_score(student.roles, job.title)
 
         # Weighted Total
-        total_score = (
-            (schedule_score * self.WEIGHTS['schedule']) +
-            (location_score * self.WEIGHTS['location']) +
-            (skills_score * self.WEIGHTS['skills']) +
-            (salary_score * self.WEIGHTS['salary']) +
-            (pref_score * self.WEIGHTS['preferences'])
-        )
+        total_score = self._weighted_total(schedule_score, location_score, skills_score, salary_score, pref_score)
 
         # "Dealbreaker" Logic: If role preference is completely missed, punish the total score significantly.
         # This ensures users see "only" (or mostly) what they asked for.
-        if pref_score == 0 and student_profile.get('preferences', {}).get('roles'):
+        if pref_score == 0 and student.roles:
              total_score *= 0.1 # 90% penalty for role mismatch
 
         # Location Dealbreaker: If location is impossible (score 0), punish heavily too.
@@ -99,15 +106,335 @@ class MatchingEngine:
             "location_data": location_meta 
         }
 
+        if not explain:
+            return {"total_score": round_score(total_score), "breakdown": breakdown}
+
         return {
-            "total_score": round(total_score, 1),
+            "total_score": round_score(total_score),
             "breakdown": breakdown,
             "schedule_analysis": schedule_result['analysis']
         }
 
-    # Legacy method kept for backward compat if needed, or removed.
+    def score_batch(self, student_profile: Union[StudentProfile, Dict], jobs: List[Union[JobFeatures, Dict]],
+                    columns: Dict = None, candidates_only: bool = False, exclude=None,
+                    explain: bool = True) -> Dict[str, Any]:
+        """
+        Score one student against many jobs in a single pass.
+        Same shape as calculate_match, but every breakdown component (and the total)
+        is a NumPy array aligned with batch["indices"] (positions in `jobs`).
+        Use unpack_row() to get a single result.
+        candidates_only=True skips jobs that are out of commute range (see _cheap_components);
+        `exclude` (job positions) skips jobs already ruled out elsewhere, e.g. by schedule_filter.
+        explain=False is the score-only mode (see calculate_match); schedule_analysis is None.
+        """
+        student = as_student_profile(student_profile)
+        if columns is None:
+            columns = self.build_job_columns(jobs)
+
+        loc_results, location_scores, salary_scores, pref_scores, candidates = self._cheap_components(student, columns, explain)
+        if not candidates_only:
+            candidates = np.ones(len(columns['features']), dtype=bool)
+        if exclude:
+            candidates[list(exclude)] = False
+        if not candidates.all():
+            indices = np.flatnonzero(candidates)
+            loc_results = [loc_results[i] for i in indices]
+            location_scores, salary_scores, pref_scores = (
+                location_scores[indices], salary_scores[indices], pref_scores[indices]
+            )
+        else:
+            indices = np.arange(len(columns['features']))
+        features = [columns['features'][i] for i in indices]
+
+        if explain:
+            schedule_results = [
+                self.scheduler.analyze_intervals(student.timetable, job.shifts, job.shift_pattern) for job in features
+            ]
+            schedule_scores = np.array([r['score'] for r in schedule_results], dtype=float)
+        else:
+            schedule_scores = np.array([
+                self.scheduler.score_intervals(student.timetable, job.shifts, job.shift_pattern) for job in features
+            ], dtype=float)
+        skills_scores = np.array([
+            self._job_skills_score(student.skills, job) for job in features
+        ], dtype=float)
+
+        total = self._weighted_total(schedule_scores, location_scores, skills_scores, salary_scores, pref_scores)
+        total = self._apply_dealbreakers(student, total, location_scores, pref_scores)
+
+        return {
+            "indices": indices,
+            "total_score": round_score(total),
+            "breakdown": {
+                "schedule": schedule_scores,
+                "location": location_scores,
+                "skills": skills_scores,
+                "salary": salary_scores,
+                "preferences": pref_scores,
+                "location_data": [self._location_meta(r, explain) for r in loc_results]
+            },
+            "schedule_analysis": [r['analysis'] for r in schedule_results] if explain else None
+        }
+
+    def top_matches(self, student_profile: Union[StudentProfile, Dict], jobs: List[Union[JobFeatures, Dict]],
+                    columns: Dict = None, k: int = 100, threshold: float = None, floor: float = None,
+                    candidates_only: bool = False, exclude=None, explain: bool = True) -> List[tuple]:
+        """
+        Keep only a student's best `k` jobs plus any job scoring >= threshold.
+        Location, salary and preference are cheap (cached/vectorized), so they give an upper
+        bound on the total with schedule and skills at 100; jobs whose bound can't reach the
+        heap or the threshold are never fully scored.
+        `floor` is the score a job must beat to enter the top k (e.g. the student's current
+        k-th stored score when only some jobs are being rescored).
+        candidates_only=True never considers out-of-range jobs (see _cheap_components),
+        and jobs at the positions in `exclude` are never considered either.
+        Returns [(job_index, result)] with results in calculate_match format (see `explain` there).
+        """
+        student = as_student_profile(student_profile)
+        if columns is None:
+            columns = self.build_job_columns(jobs)
+        features = columns['features']
+
+        loc_results, location_scores, salary_scores, pref_scores, candidates = self._cheap_components(student, columns, explain)
+        upper = self._weighted_total(100.0, location_scores, 100.0, salary_scores, pref_scores)
+        # Rounded like the real totals below, so a job's bound is never under its score
+        upper = round_score(self._apply_dealbreakers(student, upper, location_scores, pref_scores))
+
+        order = np.argsort(-upper, kind='stable')
+        if candidates_only:
+            order = order[candidates[order]]
+        if exclude:
+            order = order[~np.isin(order, list(exclude))]
+
+        heap = [] # (total, index) min-heap of the best k so far
+        scored = {}
+        for index in order:
+            index = int(index)
+            entry_floor = heap[0][0] if len(heap) >= k else floor
+            if entry_floor is not None and upper[index] <= entry_floor and (threshold is None or upper[index] < threshold):
+                break # Sorted by bound, so nothing after this can qualify either
+
+            job = features[index]
+            if explain:
+                schedule_result = self.scheduler.analyze_intervals(student.timetable, job.shifts, job.shift_pattern)
+                schedule_score, analysis = schedule_result['score'], schedule_result['analysis']
+            else:
+                schedule_score, analysis = self.scheduler.score_intervals(student.timetable, job.shifts, job.shift_pattern), None
+            components = (
+                schedule_score,
+                int(location_scores[index]),
+                self._job_skills_score(student.skills, job),
+                int(salary_scores[index]),
+                int(pref_scores[index])
+            )
+            total = self._weighted_total(*components)
+            if student.roles and components[4] == 0:
+                total *= 0.1
+            if components[1] == 0:
+                total *= 0.1
+            total = round_score(total)
+            scored[index] = (total, components, analysis)
+
+            if floor is None or total > floor:
+                if len(heap) < k:
+                    heapq.heappush(heap, (total, index))
+                elif total > heap[0][0]:
+                    heapq.heapreplace(heap, (total, index))
+
+        kept = {index for _, index in heap}
+        if threshold is not None:
+            kept |= {index for index, (total, _, _) in scored.items() if total >= threshold}
+
+        results = []
+        for index in sorted(kept):
+            total, (schedule, location, skills, salary, preferences), analysis = scored[index]
+            result = {
+                "total_score": total,
+                "breakdown": {
+                    "schedule": schedule,
+                    "location": location,
+                    "skills": skills,
+                    "salary": salary,
+                    "preferences": preferences,
+                    "location_data": self._location_meta(loc_results[index], explain)
+                }
+            }
+            if explain:
+                result["schedule_analysis"] = analysis
+            results.append((index, result))
+        return results
+
+    def score_matrix(self, students: List[Dict], jobs: List[Dict]) -> Dict[str, Any]:
+        """
+        Score every student against every job.
+        Arrays are shaped (len(students), len(jobs)); job columns are built once.
+        """
+        columns = self.build_job_columns(jobs)
+        batches = [self.score_batch(student, jobs, columns) for student in students]
+        numeric = ['schedule', 'location', 'skills', 'salary', 'preferences']
+
+        def stack(rows):
+            return np.vstack(rows) if rows else np.empty((0, len(jobs)))
+
+        return {
+            "total_score": stack([b['total_score'] for b in batches]),
+            "breakdown": {
+                **{key: stack([b['breakdown'][key] for b in batches]) for key in numeric},
+                "location_data": [b['breakdown']['location_data'] for b in batches]
+            },
+            "schedule_analysis": [b['schedule_analysis'] for b in batches]
+        }
+
+    def unpack_row(self, batch: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """
+        Pull a single job out of a score_batch() result, in the calculate_match format.
+        `index` is a position in batch["indices"], not in the original job list.
+        """
+        breakdown = batch['breakdown']
+        row = {
+            "total_score": float(batch['total_score'][index]),
+            "breakdown": {
+                "schedule": int(breakdown['schedule'][index]),
+                "location": int(breakdown['location'][index]),
+                "skills": int(breakdown['skills'][index]),
+                "salary": int(breakdown['salary'][index]),
+                "preferences": int(breakdown['preferences'][index]),
+                "location_data": breakdown['location_data'][index]
+            }
+        }
+        if batch['schedule_analysis'] is not None:
+            row["schedule_analysis"] = batch['schedule_analysis'][index]
+        return row
+
+    def build_job_columns(self, jobs: List[Union[JobFeatures, Dict]]) -> Dict[str, Any]:
+        """
+        Extract the job-side inputs once so they can be reused for every student.
+        Salaries are hourly, with NaN standing in for "not given".
+        """
+        features = [as_job_features(job) for job in jobs]
+
+        def salary(value):
+            return value if value else np.nan
+
+        def coordinate(job, value):
+            return value if has_coordinates(job.latitude, job.longitude) else np.nan
+
+        latitudes = np.array([coordinate(job, job.latitude) for job in features], dtype=float)
+        longitudes = np.array([coordinate(job, job.longitude) for job in features], dtype=float)
+
+        return {
+            "features": features,
+            "salary_min": np.array([salary(job.salary_min) for job in features], dtype=float),
+            "salary_max": np.array([salary(job.salary_max) for job in features], dtype=float),
+            "titles": [job.title for job in features],
+            "title_index": TitleIndex([job.title for job in features]),
+            "has_coordinates": ~np.isnan(latitudes),
+            "geo_index": GridIndex(latitudes, longitudes),
+        }
+
+    def _cheap_components(self, student: StudentProfile, columns: Dict[str, Any], explain: bool = True):
+        """
+        Location (memoized tiers + distance), salary and preference columns for one student,
+        plus a mask of candidate jobs: everything except jobs known to be beyond the
+        student's commute radius that score 0 on location anyway.
+        """
+        signature = student.location_signature
+        radius = student.commute_radius
+        features = columns['features']
+        if radius is None:
+            loc_results = [commute_tier(signature, job.city, job.is_remote) for job in features]
+            distances = np.full(len(features), np.nan)
+        else:
+            # Radius lookup: only jobs in nearby grid cells get a distance, every other
+            # job with coordinates is known to be out of range
+            within, miles = columns['geo_index'].query_radius(student.latitude, student.longitude, radius)
+            distances = np.where(columns['has_coordinates'], math.inf, np.nan)
+            distances[within] = miles
+            loc_results = [
+                commute_tier(signature, job.city, job.is_remote, None if np.isnan(d) else float(d), radius, explain)
+                for job, d in zip(features, distances)
+            ]
+        location_scores = np.array([r['score'] for r in loc_results], dtype=float)
+        salary_scores = self._salary_scores(student.min_salary, columns)
+        pref_scores = self._preference_scores(student.roles, columns)
+        candidates = ~(np.isinf(distances) & (location_scores == 0))
+        return loc_results, location_scores, salary_scores, pref_scores, candidates
+
+    def _apply_dealbreakers(self, student: StudentProfile, total, location_scores, pref_scores):
+        # Same dealbreakers (and multiplication order) as calculate_match
+        if student.roles:
+            total = np.where(pref_scores == 0, total * 0.1, total)
+        return np.where(location_scores == 0, total * 0.1, total)
+
+    def index_skills(self, features: List[JobFeatures], skills) -> None:
+        """
+        Scan every job description once for the union of all students' skills.
+        Per-pair skill scoring then becomes a set intersection (see _job_skills_score).
+        """
+        scanner = SkillScanner(skills)
+        for job in features:
+            job.description_skills = scanner.scan(job.description)
+            job.skill_vocabulary = scanner.vocabulary
+
+    def _salary_scores(self, min_needed: float, columns: Dict[str, Any]) -> np.ndarray:
+        """Vectorized _hourly_salary_score."""
+        job_min = columns['salary_min']
+        if not min_needed:
+            return np.full(job_min.shape, 100.0)
+
+        scores = np.select(
+            [job_min >= min_needed, columns['salary_max'] >= min_needed, job_min >= min_needed * 0.9],
+            [100.0, 85.0, 60.0],
+            default=0.0
+        )
+        return np.where(np.isnan(job_min), 50.0, scores)
+
+    def _preference_scores(self, roles: tuple, columns: Dict[str, Any]) -> np.ndarray:
+        """Vectorized _role_score."""
+        titles = columns['titles']
+        if not roles:
+            return np.full(len(titles), 100.0)
+
+        # Resolve role -> matching job positions through the title index
+        hits = np.zeros(len(titles), dtype=bool)
+        for role in roles:
+            matched = columns['title_index'].lookup(role)
+            if matched:
+                hits[list(matched)] = True
+        return np.where(hits, 100.0, 0.0)
+
+    def _weighted_total(self, schedule, location, skills, salary, preferences):
+        # Keep the same summation order as calculate_match so floats agree
+        return (
+            (schedule * self.WEIGHTS['schedule']) +
+            (location * self.WEIGHTS['location']) +
+            (skills * self.WEIGHTS['skills']) +
+            (salary * self.WEIGHTS['salary']) +
+            (preferences * self.WEIGHTS['preferences'])
+        )
+
+    def _job_distance(self, student: StudentProfile, job: JobFeatures):
+        """Miles from the student to the job, or None when distance scoring doesn't apply."""
+        if student.commute_radius is None or not has_coordinates(job.latitude, job.longitude):
+            return None
+        return float(haversine_miles(student.latitude, student.longitude, job.latitude, job.longitude))
+
+    def _location_meta(self, loc_result: Dict, explain: bool = True) -> Dict[str, Any]:
+        if not explain:
+            return _badge_meta(loc_result['tier'], loc_result['badge'], loc_result['badge_color'])
+        return {
+            'tier': loc_result['tier'],
+            'badge': loc_result['badge'],
+            'badge_color': loc_result['badge_color'],
+            'reason': loc_result['reason']
+        }
+
+    # Legacy method kept for backward compat: pure distance score, no city tiers.
     def _calculate_location_score(self, user_loc: Dict, job_loc: Dict, max_commute: int = 45, preferred_locs: List[str] = None) -> int:
-         return 0 # Deprecated
+        if not has_coordinates(user_loc.get('lat'), user_loc.get('lng')) or not has_coordinates(job_loc.get('lat'), job_loc.get('lng')):
+            return 0
+        miles = haversine_miles(user_loc['lat'], user_loc['lng'], job_loc['lat'], job_loc['lng'])
+        return distance_score(miles, commute_radius_miles(max_commute))
 
     def _calculate_skills_score(self, user_skills: Set[str], job_skills: Set[str], description: str) -> int:
         """
@@ -117,7 +444,19 @@ class MatchingEngine:
         # Normalize inputs
         user_skills = {s.lower() for s in user_skills} if user_skills else set()
         job_skills = {s.lower() for s in job_skills} if job_skills else set()
-        
+        return self._skills_score(user_skills, job_skills, description.lower() if description else "")
+
+    def _job_skills_score(self, user_skills, job: JobFeatures) -> int:
+        # Use the pre-scanned description when it covers every skill this student has
+        if job.description_skills is not None and user_skills <= job.skill_vocabulary:
+            return self._skills_score(user_skills, job.skills, job.description, len(user_skills & job.description_skills))
+        return self._skills_score(user_skills, job.skills, job.description)
+
+    def _skills_score(self, user_skills, job_skills, desc_lower: str, found: int = None) -> int:
+        """
+        _calculate_skills_score on already lower-cased inputs.
+        `found` is the number of user skills in the description, if already known.
+        """
         # 1. Direct Skill Match (if job has explicit skills)
         if job_skills:
             if not user_skills: return 0
@@ -129,16 +468,16 @@ class MatchingEngine:
         # Check if any user skills appear in the description
         if not user_skills: return 100 # If user lists no skills, assume they are open? Or 50 neutral.
         
-        found = 0
-        desc_lower = description.lower() if description else ""
-        
-        # Common keywords to look for if user has generic skills
-        # This part can be expanded with NLP later.
-        
-        for skill in user_skills:
-            # Simple substring match - inaccurate but better than nothing for v1
-            if skill in desc_lower:
-                found += 1
+        if found is None:
+            found = 0
+            
+            # Common keywords to look for if user has generic skills
+            # This part can be expanded with NLP later.
+            
+            for skill in user_skills:
+                # Simple substring match - inaccurate but better than nothing for v1
+                if skill in desc_lower:
+                    found += 1
         
         if found > 0:
             # If we found matches, score relative to how many skills user has
@@ -159,10 +498,7 @@ class MatchingEngine:
         if not min_needed: return 100 # No requirement
         if not job_min: return 50 # Unknown salary
         
-        # Normalize Job Salary to Hourly
-        # Assumption: Yearly = 52 weeks * 37.5 hours = ~1950 hours
-        HOURS_PER_YEAR = 1950
-        
+        # Normalize Job Salary to Hourly (see HOURS_PER_YEAR)
         normalized_min = job_min
         if salary_type and salary_type.lower() == 'yearly':
             normalized_min = job_min / HOURS_PER_YEAR
@@ -170,7 +506,14 @@ class MatchingEngine:
         normalized_max = job_max
         if job_max and salary_type and salary_type.lower() == 'yearly':
             normalized_max = job_max / HOURS_PER_YEAR
-        
+
+        return self._hourly_salary_score(min_needed, normalized_min, normalized_max)
+
+    def _hourly_salary_score(self, min_needed: float, normalized_min: float, normalized_max: float) -> int:
+        """_calculate_salary_score on salaries already normalized to hourly."""
+        if not min_needed: return 100 # No requirement
+        if not normalized_min: return 50 # Unknown salary
+
         # Logic
         # 1. Base rate meets need
         if normalized_min >= min_needed: return 100
@@ -188,29 +531,16 @@ class MatchingEngine:
         """
         Simple keyword match for role/industry preferences.
         """
+        desired_roles = tuple(role.lower() for role in prefs.get('roles', []))
+        return self._role_score(desired_roles, (job.get('title') or '').lower())
+
+    def _role_score(self, roles: tuple, title: str) -> int:
+        """_calculate_preference_score on lower-cased roles and title."""
         score = 100
         
         # Role preference
-        desired_roles = prefs.get('roles', [])
-        if desired_roles:
-            title = job.get('title', '').lower()
-            matches = [role.lower() in title for role in desired_roles]
-            if not any(matches):
-                if 'barista' in title: # Only log if it should have matched!
-                     print(f"DEBUG PREF FAIL: Roles={desired_roles} vs Title='{title}'")
-                score = 0 # Strict mismatch
+        if roles and not any(role in title for role in roles):
+            score = 0 # Strict mismatch
                 
         # Industry/Type (placeholder logic)
         return max(0, score)
-
-    def _haversine_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate distance in miles."""
-        R = 3958.8 # Earth radius in miles
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlon / 2) * math.sin(dlon / 2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from sqlalchemy import and_, or_
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort_by: str, value: Any, row_id: int) -> str:
+    """Opaque next_cursor: the sort key and id of the last row on the page."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[Any, int]:
+    """(value, row_id) from encode_cursor. Raises InvalidCursor for tampered or mismatched cursors."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort_by == 'posted_at' and value is not None:
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if cursor_sort != sort_by or not isinstance(row_id, int):
+        raise InvalidCursor("Cursor does not belong to this ordering")
+    return value, row_id
+
+def keyset_order(column, id_column):
+    """ORDER BY for keyset pages: column descending (NULLs last), id descending as the tiebreaker."""
+    return column.desc().nullslast(), id_column.desc()
+
+def after_cursor(column, id_column, value, row_id):
+    """
+    WHERE clause for the rows that follow (value, row_id) in keyset_order.
+    NULL keys sort last, so they follow every non-NULL key.
+    """
+    if value is None:
+        return and_(column.is_(None), id_column < row_id)
+    return or_(
+        column < value,
+        and_(column == value, id_column < row_id),
+        column.is_(None)
+    )
+
+def keyset_page(query, column, id_column, key, sort_by: str, per_page: int, cursor: Optional[str] = None):
+    """
+    One page of `query` ordered by keyset_order.
+    Fetches per_page + 1 rows to know whether there is a next page, so no OFFSET or COUNT.
+    `key(row)` must return (value, row_id) for a row. Returns (rows, next_cursor or None).
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_by)
+        query = query.filter(after_cursor(column, id_column, value, row_id))
+
+    rows = query.order_by(*keyset_order(column, id_column)).limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(sort_by, *key(rows[-1]))
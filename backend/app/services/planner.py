@@ -0,0 +1,141 @@
+from typing import Dict, Iterable, List, Tuple
+from app.extensions import db
+from app.models import Job, JobMatch, JobShift
+from .hours_ledger import hours_for_week
+from .profiles import compile_student, job_shift_intervals
+from .schedule_filter import exclude_impossible
+from .scheduler import ScheduleAnalyzer, shift_mask, week_mask
+
+# Planner defaults: only reasonable matches, and at most this many of the best ones
+PLANNER_MIN_SCORE = 50
+PLANNER_MAX_CANDIDATES = 300
+
+# Search nodes explored before the planner settles for the best bundle found so far.
+# Keeps a request interactive even for students with hundreds of candidate jobs.
+PLANNER_NODE_LIMIT = 200000
+
+class PlannedJob:
+    """A candidate job reduced to what the search needs: value, minutes and bitmasks."""
+    __slots__ = ('job_id', 'score', 'minutes', 'mask', 'reach')
+
+    def __init__(self, job_id, score, shifts, commute_mins):
+        self.job_id = job_id
+        self.score = score
+        self.minutes = 0
+        self.mask = 0  # Minutes of the week the job's shifts occupy
+        self.reach = 0 # Same, widened by the commute on both sides
+        for day, start, end in shifts:
+            span = shift_mask(day, start, end)
+            if span is None:
+                continue
+            week_start, week_end, mask = span
+            self.minutes += week_end - week_start
+            self.mask |= mask
+            self.reach |= week_mask(week_start - commute_mins, week_end + commute_mins)
+
+def build_candidates(timetable, jobs: Iterable[Tuple[int, float, Tuple]],
+                     analyzer: ScheduleAnalyzer = None) -> List[PlannedJob]:
+    """
+    PlannedJobs for (job_id, match score, compiled shifts) tuples.
+    Jobs that clash with the timetable or have no fixed shifts (hours unknown) are left out.
+    """
+    analyzer = analyzer or ScheduleAnalyzer()
+    candidates = []
+    for job_id, score, shifts in jobs:
+        if not shifts or not analyzer.conflict_free(timetable, shifts):
+            continue
+        job = PlannedJob(job_id, score, shifts, analyzer.commute_mins)
+        if job.minutes > 0:
+            candidates.append(job)
+    return candidates
+
+def plan_bundle(candidates: List[PlannedJob], limit_minutes: int, node_limit: int = PLANNER_NODE_LIMIT) -> Dict:
+    """
+    Pick the set of jobs with the highest total match score such that no two jobs' shifts
+    come within a commute of each other and total shift time fits in limit_minutes.
+
+    Branch-and-bound over jobs sorted by score per minute: each node is bounded by the
+    fractional-knapsack relaxation of the remaining compatible jobs, and the search stops
+    after node_limit nodes ('optimal' is then False).
+    """
+    jobs = sorted(
+        (job for job in candidates if job.minutes <= limit_minutes),
+        key=lambda job: job.score / job.minutes, reverse=True
+    )
+    best = {'value': 0.0, 'chosen': ()}
+    nodes = 0
+
+    def bound(index, used_reach, minutes_left, value):
+        # Greedy by density, taking a fraction of the first job that doesn't fit
+        for job in jobs[index:]:
+            if job.mask & used_reach:
+                continue
+            if job.minutes <= minutes_left:
+                minutes_left -= job.minutes
+                value += job.score
+            else:
+                return value + job.score * minutes_left / job.minutes
+        return value
+
+    def search(index, used_mask, used_reach, minutes_left, value, chosen):
+        nonlocal nodes
+        nodes += 1
+        if value > best['value']:
+            best['value'], best['chosen'] = value, chosen
+        if index == len(jobs) or nodes > node_limit:
+            return
+        if bound(index, used_reach, minutes_left, value) <= best['value']:
+            return
+
+        job = jobs[index]
+        if job.minutes <= minutes_left and not (job.mask & used_reach) and not (job.reach & used_mask):
+            search(index + 1, used_mask | job.mask, used_reach | job.reach,
+                   minutes_left - job.minutes, value + job.score, chosen + (job,))
+        search(index + 1, used_mask, used_reach, minutes_left, value, chosen)
+
+    search(0, 0, 0, limit_minutes, 0.0, ())
+
+    chosen = sorted(best['chosen'], key=lambda job: job.score, reverse=True)
+    return {
+        'job_ids': [job.job_id for job in chosen],
+        'total_score': round(best['value'], 1),
+        'total_minutes': sum(job.minutes for job in chosen),
+        'optimal': nodes <= node_limit,
+        'nodes': nodes
+    }
+
+def plan_for_student(student, hours: float = None, min_score: float = PLANNER_MIN_SCORE,
+                     max_candidates: int = PLANNER_MAX_CANDIDATES) -> Dict:
+    """
+    Best bundle of the student's stored matches within what's left of their
+    weekly_hours_limit this week (hours already logged come from the hours ledger),
+    or `hours`, if lower. Returns plan_bundle's result plus 'scores' by job id.
+    """
+    logged = hours_for_week(student.id)
+    limit = max(0.0, student.weekly_hours_limit - logged) if student.weekly_hours_limit else None
+    if hours is not None:
+        limit = min(hours, limit) if limit is not None else hours
+
+    matches = db.session.query(JobMatch.job_id, JobMatch.score) \
+        .join(Job, Job.id == JobMatch.job_id) \
+        .filter(JobMatch.student_id == student.id, JobMatch.score >= min_score, Job.is_active == True) \
+        .filter(exclude_impossible(Job, student.id)) \
+        .order_by(JobMatch.score.desc()).limit(max_candidates).all()
+    if not matches or not limit:
+        return {'job_ids': [], 'total_score': 0.0, 'total_minutes': 0, 'optimal': True, 'nodes': 0,
+                'scores': {}, 'limit_minutes': int((limit or 0) * 60), 'logged_hours': logged}
+
+    shifts_by_job = {}
+    for shift in JobShift.query.filter(JobShift.job_id.in_([job_id for job_id, _ in matches])).all():
+        shifts_by_job.setdefault(shift.job_id, []).append(shift)
+
+    timetable = compile_student(student).timetable
+    candidates = build_candidates(timetable, [
+        (job_id, score, job_shift_intervals(shifts_by_job.get(job_id, []))) for job_id, score in matches
+    ])
+
+    plan = plan_bundle(candidates, int(limit * 60))
+    plan['scores'] = dict(matches)
+    plan['limit_minutes'] = int(limit * 60)
+    plan['logged_hours'] = logged
+    return plan
@@ -0,0 +1,213 @@
+from typing import Dict, Iterable, List, Optional
+from .scheduler import WeeklyTimetable, interval_order, pattern_signature, time_to_minutes
+from .geo import commute_radius_miles, has_coordinates
+
+# Assumption: Yearly = 52 weeks * 37.5 hours = ~1950 hours
+HOURS_PER_YEAR = 1950
+
+def _split_csv(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return [v.strip() for v in value if v and v.strip()]
+
+def _hourly(value, salary_type) -> Optional[float]:
+    if not value:
+        return None
+    if salary_type and salary_type.lower() == 'yearly':
+        return value / HOURS_PER_YEAR
+    return value
+
+def parse_city(location_name) -> str:
+    """'Birmingham, West Midlands' -> 'Birmingham'"""
+    return (location_name or '').split(',')[0].strip()
+
+class StudentProfile:
+    """
+    Matching view of a student, compiled once and reused for every job.
+    Build with compile_student() (ORM) or StudentProfile.from_dict() (legacy dicts).
+    """
+    __slots__ = (
+        'student_id', 'skills', 'min_salary', 'roles', 'timetable',
+        'primary_city', 'preferred_cities', 'open_to_other_cities', 'location_signature',
+        'max_commute_time', 'latitude', 'longitude', 'commute_radius'
+    )
+
+    def __init__(self, student_id=None, skills=(), min_salary=None, roles=(), timetable=None,
+                 primary_city=None, preferred_cities=(), open_to_other_cities=False,
+                 max_commute_time=None, latitude=None, longitude=None):
+        self.student_id = student_id
+        # Lower-cased once here; the engine never re-normalizes
+        self.skills = frozenset(s.lower() for s in skills if s)
+        self.min_salary = min_salary
+        self.roles = tuple(r.lower() for r in roles if r)
+        # {day (lower-case): ((start_minute, end_minute), ...)} plus its weekly bitmap
+        self.timetable = timetable if isinstance(timetable, WeeklyTimetable) else WeeklyTimetable(timetable or {})
+
+        preferred = list(preferred_cities)
+        # Fallback: If primary_city is missing but preferred_cities has items, use first one
+        if not primary_city and preferred:
+            primary_city = preferred[0]
+        # Ensure primary is in preferred
+        if primary_city and primary_city not in preferred:
+            preferred.append(primary_city)
+        self.primary_city = primary_city
+        self.preferred_cities = tuple(preferred)
+        self.open_to_other_cities = bool(open_to_other_cities)
+        # Cache key for location_matcher.location_tier
+        self.location_signature = (self.primary_city, self.preferred_cities, self.open_to_other_cities)
+
+        self.max_commute_time = max_commute_time
+        self.latitude = latitude
+        self.longitude = longitude
+        # Miles reachable within max_commute_time; None disables distance scoring
+        self.commute_radius = commute_radius_miles(max_commute_time) if has_coordinates(latitude, longitude) else None
+
+    @classmethod
+    def from_dict(cls, profile: Dict) -> 'StudentProfile':
+        prefs = profile.get('preferences') or {}
+        location = profile.get('location') or {}
+        return cls(
+            skills=profile.get('skills') or (),
+            min_salary=profile.get('min_salary', 0),
+            roles=prefs.get('roles') or (),
+            timetable=compile_intervals(profile.get('timetable') or [], by_day=True),
+            primary_city=prefs.get('primary_city'),
+            preferred_cities=_split_csv(prefs.get('preferred_locations')),
+            open_to_other_cities=prefs.get('open_to_other_cities', False),
+            max_commute_time=prefs.get('max_commute_time'),
+            latitude=location.get('lat'),
+            longitude=location.get('lng')
+        )
+
+class JobFeatures:
+    """
+    Matching view of a job, compiled once per rematch.
+    Build with compile_job() (ORM) or JobFeatures.from_dict() (legacy dicts).
+    """
+    __slots__ = (
+        'job_id', 'title', 'description', 'skills', 'salary_min', 'salary_max',
+        'city', 'is_remote', 'shifts', 'latitude', 'longitude',
+        'description_skills', 'skill_vocabulary', 'shift_pattern'
+    )
+
+    def __init__(self, job_id=None, title=None, description=None, skills=(), salary_min=None,
+                 salary_max=None, salary_type='hourly', location_name=None, is_remote=False,
+                 shifts=(), latitude=None, longitude=None):
+        self.job_id = job_id
+        self.title = (title or '').lower()
+        self.description = (description or '').lower()
+        self.skills = frozenset(s.lower() for s in skills if s)
+        # Hourly-normalized; None means "not given"
+        self.salary_min = _hourly(salary_min, salary_type)
+        self.salary_max = _hourly(salary_max, salary_type)
+        self.city = parse_city(location_name)
+        self.is_remote = bool(is_remote)
+        # ((day (lower-case), start_minute, end_minute), ...)
+        self.shifts = tuple(shifts)
+        # Key for ScheduleAnalyzer's fit cache: jobs with the same shifts share results
+        self.shift_pattern = pattern_signature(self.shifts)
+        self.latitude = latitude
+        self.longitude = longitude
+        # Filled by MatchingEngine.index_skills: skills from skill_vocabulary found in the description
+        self.description_skills = None
+        self.skill_vocabulary = None
+
+    @classmethod
+    def from_dict(cls, job: Dict) -> 'JobFeatures':
+        location = job.get('location') or {}
+        return cls(
+            title=job.get('title'),
+            description=job.get('description'),
+            skills=job.get('skills') or (),
+            salary_min=job.get('salary_min'),
+            salary_max=job.get('salary_max'),
+            salary_type=job.get('salary_type', 'hourly'),
+            location_name=location.get('name'),
+            is_remote=job.get('is_remote', False),
+            shifts=compile_intervals(job.get('shifts') or []),
+            latitude=location.get('lat'),
+            longitude=location.get('lng')
+        )
+
+def compile_intervals(entries: Iterable[Dict], by_day: bool = False):
+    """
+    Convert [{'day', 'start', 'end'}] dicts (strings or time objects) to minute-of-day intervals,
+    in canonical (day, start) order so equal schedules compile identically.
+    by_day=True groups them as {day: ((start, end), ...)} for timetable lookups, in a
+    WeeklyTimetable so the minute bitmap is built once.
+    """
+    intervals = sorted(
+        ((e['day'].lower(), time_to_minutes(e['start']), time_to_minutes(e['end'])) for e in entries),
+        key=interval_order
+    )
+    if not by_day:
+        return tuple(intervals)
+
+    grouped = {}
+    for day, start, end in intervals:
+        grouped.setdefault(day, []).append((start, end))
+    return WeeklyTimetable({day: tuple(slots) for day, slots in grouped.items()})
+
+def compile_student(student, slots=None) -> StudentProfile:
+    """
+    Canonical StudentProfile for a Student row.
+    Pass `slots` (ScheduleSlot rows) when they were already batch-loaded.
+    """
+    prefs = student.preferences
+    if slots is None:
+        slots = student.timetable.slots.all() if student.timetable else []
+
+    return StudentProfile(
+        student_id=student.id,
+        skills=_split_csv(student.skills),
+        min_salary=prefs.min_salary if prefs else None,
+        roles=_split_csv(prefs.preferred_roles) if prefs else (),
+        timetable=compile_intervals(
+            [{"day": s.day_of_week, "start": s.start_time, "end": s.end_time} for s in slots], by_day=True
+        ),
+        primary_city=prefs.primary_city if prefs else None,
+        preferred_cities=_split_csv(prefs.preferred_locations) if prefs else (),
+        open_to_other_cities=prefs.open_to_other_cities if prefs else False,
+        max_commute_time=prefs.max_commute_time if prefs else None,
+        latitude=student.latitude,
+        longitude=student.longitude
+    )
+
+def compile_job(job, shifts=None) -> JobFeatures:
+    """
+    Canonical JobFeatures for a Job row.
+    Pass `shifts` (JobShift rows) when they were already batch-loaded.
+    """
+    if shifts is None:
+        shifts = job.shifts.all()
+
+    return JobFeatures(
+        job_id=job.id,
+        title=job.title,
+        description=job.description,
+        salary_min=job.salary_min,
+        salary_max=job.salary_max,
+        salary_type=job.salary_type,
+        location_name=job.location,
+        is_remote=job.is_remote,
+        shifts=job_shift_intervals(shifts),
+        latitude=job.latitude,
+        longitude=job.longitude
+    )
+
+def job_shift_intervals(shifts):
+    """Minute intervals for JobShift rows or scraper shift dicts (day_of_week/start_time/end_time)."""
+    def field(shift, name):
+        return shift[name] if isinstance(shift, dict) else getattr(shift, name)
+
+    return compile_intervals([
+        {"day": field(s, 'day_of_week'), "start": field(s, 'start_time'), "end": field(s, 'end_time')} for s in shifts
+    ])
+
+def as_student_profile(student) -> StudentProfile:
+    return student if isinstance(student, StudentProfile) else StudentProfile.from_dict(student)
+
+def as_job_features(job) -> JobFeatures:
+    return job if isinstance(job, JobFeatures) else JobFeatures.from_dict(job)
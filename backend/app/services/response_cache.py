@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+from flask import current_app, make_response, request
+from .data_versions import versions
+
+class ResponseCache:
+    """
+    Small thread-safe LRU of encoded JSON: whole response bodies keyed by ETag here,
+    per-job fragments in api/serializers.py. Keys embed data versions, so a rematch,
+    ingest or job edit makes old entries unreachable and they simply age out.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes):
+        with self.lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+_cache = None
+
+def response_cache() -> Optional[ResponseCache]:
+    """The process-wide cache, or None when RESPONSE_CACHE_SIZE is 0."""
+    global _cache
+    size = current_app.config.get('RESPONSE_CACHE_SIZE') or 0
+    if not size:
+        return None
+    if _cache is None or _cache.size != size:
+        _cache = ResponseCache(size)
+    return _cache
+
+def make_etag(endpoint: str, student_id: int, version_keys: Iterable[str]) -> str:
+    """Strong ETag for one student's view of an endpoint at the current data versions."""
+    version_keys = tuple(version_keys)
+    args = sorted(request.args.items(multi=True))
+    payload = repr((endpoint, student_id, version_keys, versions(*version_keys), args))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def conditional(endpoint: str, student_id: int, version_keys: Iterable[str], build: Callable):
+    """
+    Serve a JSON view with an ETag. A matching If-None-Match gets a 304 and a cached
+    body is returned as is, both without calling `build` (the view's real work).
+    Only 200 responses are tagged and cached.
+    """
+    etag = make_etag(endpoint, student_id, version_keys)
+    cache = response_cache()
+
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    elif cache is not None and (body := cache.get(etag)) is not None:
+        response = make_response(body)
+        response.mimetype = 'application/json'
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+        if cache is not None:
+            cache.put(etag, response.get_data())
+
+    response.set_etag(etag)
+    # Browsers keep the body but always revalidate, so a rematch shows up on the next load
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,50 @@
+from sqlalchemy import and_, case, func, or_, select
+from app.models import JobShift, ScheduleSlot, Timetable
+from .scheduler import MINUTES_PER_WEEK, shift_mask
+
+def _overlaps(shift, slot):
+    """
+    Minute-of-week intervals overlap, allowing either one to run past the end of the week
+    (a Sunday night shift vs. a Monday morning class).
+    """
+    s, e = shift.start_minute_of_week, shift.end_minute_of_week
+    cs, ce = slot.start_minute_of_week, slot.end_minute_of_week
+    return or_(
+        and_(s < ce, cs < e),
+        and_(s < ce + MINUTES_PER_WEEK, cs + MINUTES_PER_WEEK < e),
+        and_(s + MINUTES_PER_WEEK < ce, cs < e + MINUTES_PER_WEEK),
+    )
+
+def impossible_jobs(student_id):
+    """
+    SELECT of job ids whose shifts mostly overlap the student's classes.
+    More than half the shifts clashing is what makes ScheduleAnalyzer score a job 0,
+    so these can be dropped before anything is loaded into Python.
+    """
+    clash = select(ScheduleSlot.id).join(Timetable, ScheduleSlot.timetable_id == Timetable.id).where(
+        Timetable.student_id == student_id,
+        _overlaps(JobShift, ScheduleSlot)
+    ).exists()
+
+    return select(JobShift.job_id).group_by(JobShift.job_id).having(
+        func.sum(case((clash, 1), else_=0)) * 2 > func.count(JobShift.id)
+    )
+
+def exclude_impossible(job_model, student_id):
+    """Filter clause for a Job query: skip jobs the student can't work (see impossible_jobs)."""
+    return job_model.id.not_in(impossible_jobs(student_id))
+
+def is_impossible(timetable, shifts) -> bool:
+    """
+    impossible_jobs() in Python, for compiled profiles: more than half of `shifts`
+    ((day, start, end) minute intervals) overlap the WeeklyTimetable's class bitmap.
+    The rematch has every job compiled already, so this costs no query per student.
+    """
+    if not timetable.busy or not shifts:
+        return False
+    clashes = 0
+    for day, start, end in shifts:
+        span = shift_mask(day, start, end)
+        if span is not None and span[2] & timetable.busy:
+            clashes += 1
+    return clashes * 2 > len(shifts)
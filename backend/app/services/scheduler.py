@@ -1,108 +1,286 @@
 from datetime import datetime, time, timedelta
+from functools import lru_cache
+import hashlib
 from typing import List, Dict, Any, Tuple
 
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Distinct (timetable, shift pattern) results kept per ScheduleAnalyzer
+FIT_CACHE_SIZE = 65536
+
+def time_to_minutes(time_input: Any) -> int:
+    """Convert 'HH:MM[:SS]' string or time object to minutes since midnight (0 if unparseable)."""
+    if isinstance(time_input, time):
+        return time_input.hour * 60 + time_input.minute
+    if not time_input:
+        return 0
+
+    time_str = str(time_input)
+    try:
+        parsed = datetime.strptime(time_str, "%H:%M:%S").time()
+    except ValueError:
+        try:
+            parsed = datetime.strptime(time_str, "%H:%M").time()
+        except ValueError:
+            return 0 # Fail safe
+    return parsed.hour * 60 + parsed.minute
+
+def _fmt(minutes: int) -> str:
+    minutes %= MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def _week_span(day_index: int, start: int, end: int) -> Tuple[int, int]:
+    """Minute-of-week (start, end) for a day interval; end <= start runs past midnight."""
+    week_start = day_index * MINUTES_PER_DAY + start
+    length = end - start if end >= start else end + MINUTES_PER_DAY - start
+    return week_start, week_start + length
+
+def week_minutes(day: str, start: Any, end: Any) -> Tuple[Any, Any]:
+    """
+    (start_minute_of_week, end_minute_of_week) for a day name and start/end times, Monday 00:00 = 0.
+    Overnight intervals end past the day (and past the week for Sunday); (None, None) for unknown days.
+    """
+    day_index = DAY_INDEX.get((day or '').lower())
+    if day_index is None:
+        return None, None
+    return _week_span(day_index, time_to_minutes(start), time_to_minutes(end))
+
+def interval_order(interval) -> Tuple:
+    """Sort key for (day, start, end): Monday first, unknown day names last."""
+    day, start, end = interval
+    return DAY_INDEX.get(day, len(DAYS)), day, start, end
+
+def pattern_signature(intervals) -> str:
+    """
+    Canonical hash of ((day, start, end), ...) minute intervals, independent of order.
+    Used as JobFeatures.shift_pattern and WeeklyTimetable.signature, the halves of the fit cache key.
+    """
+    canonical = '|'.join(f'{day}:{start}-{end}' for day, start, end in sorted(intervals, key=interval_order))
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+def week_mask(start: int, end: int) -> int:
+    """
+    Bitmask (one bit per minute of the week) covering [start, end), wrapping Sunday -> Monday.
+    A zero-length interval still marks its start minute.
+    """
+    end = max(end, start + 1)
+    mask = 0
+    for lo in range(start - start % MINUTES_PER_WEEK, end, MINUTES_PER_WEEK):
+        a, b = max(start, lo) - lo, min(end, lo + MINUTES_PER_WEEK) - lo
+        if b > a:
+            mask |= ((1 << (b - a)) - 1) << a
+    return mask
+
+@lru_cache(maxsize=4096)
+def shift_mask(day: str, start: int, end: int):
+    """(week_start, week_end, mask) for a shift, or None if the day isn't a weekday name."""
+    day_index = DAY_INDEX.get(day)
+    if day_index is None:
+        return None
+    week_start, week_end = _week_span(day_index, start, end)
+    return week_start, week_end, week_mask(week_start, week_end)
+
+class WeeklyTimetable(dict):
+    """
+    {day: ((start, end), ...)} timetable that also carries a minute-of-week bitmap.
+    Built once per student (see profiles.compile_intervals); near(gap) is the class
+    bitmap widened by `gap` minutes on each side, so a shift whose mask misses it
+    cannot overlap a class or be within commute distance of one.
+    """
+    __slots__ = ('busy', 'signature', '_near')
+
+    def __init__(self, by_day=()):
+        super().__init__(by_day)
+        self._near = {}
+        self.signature = pattern_signature((day, start, end) for day, slots in self.items() for start, end in slots)
+        self.busy = 0
+        for start, end in self._week_spans():
+            if end > start:
+                self.busy |= week_mask(start, end)
+
+    def _week_spans(self):
+        for day, slots in self.items():
+            day_index = DAY_INDEX.get(day)
+            if day_index is not None:
+                for start, end in slots:
+                    yield _week_span(day_index, start, end)
+
+    def near(self, gap: int) -> int:
+        mask = self._near.get(gap)
+        if mask is None:
+            mask = 0
+            for start, end in self._week_spans():
+                mask |= week_mask(start - gap, end + gap)
+            self._near[gap] = mask
+        return mask
+
 class ScheduleAnalyzer:
     def __init__(self, commute_time_mins: int = 30):
         self.commute_time = timedelta(minutes=commute_time_mins)
         self.min_buffer = timedelta(minutes=15) # Minimum required personal buffer
+        self.commute_mins = commute_time_mins
+        self.min_buffer_mins = 15
+        # (timetable signature, shift pattern, explain) -> result; see analyze_intervals
+        self._fit_cache = {}
 
     def analyze_fit(self, student_timetable: List[Dict], job_shifts: List[Dict]) -> Dict[str, Any]:
         """
         Analyzes the compatibility between a student's timetable and job shifts.
         Returns a dictionary with score, status, and detailed conflict analysis.
         """
+        from .profiles import compile_intervals
+        return self.analyze_intervals(
+            compile_intervals(student_timetable, by_day=True),
+            compile_intervals(job_shifts)
+        )
+
+    def analyze_intervals(self, timetable: Dict[str, Tuple], shifts: Tuple, pattern: str = None) -> Dict[str, Any]:
+        """
+        analyze_fit on pre-compiled minute-of-day intervals:
+        timetable is {day: ((start, end), ...)}, shifts is ((day, start, end), ...).
+        Pass the shifts' `pattern` (pattern_signature, e.g. JobFeatures.shift_pattern) to reuse
+        the result for every job with the same shifts; the returned dict is then shared.
+        """
+        key = self._cache_key(timetable, pattern, True)
+        if key is not None:
+            cached = self._fit_cache.get(key)
+            if cached is None:
+                cached = self._remember(key, self.analyze_intervals(timetable, shifts))
+            return cached
+
         conflicts = []
         warnings = []
-        total_shifts = len(job_shifts)
+        total_shifts = len(shifts)
         if total_shifts == 0:
              return self._result(100, "Perfect Fit", "Flexible schedule - no fixed shifts.")
 
+        conflicting_shifts, tight_shifts = self._check_shifts(timetable, shifts, conflicts, warnings)
+
+        # Calculate Score
+        score = self._calculate_score(total_shifts, conflicting_shifts, tight_shifts)
+        
+        return self._result(score, self._get_status_label(score), conflicts + warnings)
+
+    def score_intervals(self, timetable: Dict[str, Tuple], shifts: Tuple, pattern: str = None) -> int:
+        """
+        Score-only analyze_intervals for batch runs: same number, but no
+        conflict/warning messages or result dict are built. `pattern` as for analyze_intervals.
+        """
+        key = self._cache_key(timetable, pattern, False)
+        if key is not None:
+            cached = self._fit_cache.get(key)
+            if cached is None:
+                cached = self._remember(key, self.score_intervals(timetable, shifts))
+            return cached
+
+        if not shifts:
+            return 100
+        conflicting_shifts, tight_shifts = self._check_shifts(timetable, shifts)
+        return self._calculate_score(len(shifts), conflicting_shifts, tight_shifts)
+
+    def conflict_free(self, timetable: Dict[str, Tuple], shifts: Tuple) -> bool:
+        """True if no shift overlaps a class or leaves less than the commute time around one."""
+        return self._check_shifts(timetable, shifts)[0] == 0
+
+    def _cache_key(self, timetable, pattern, explain):
+        if pattern is None or not isinstance(timetable, WeeklyTimetable):
+            return None
+        return timetable.signature, pattern, explain
+
+    def _remember(self, key, result):
+        if len(self._fit_cache) >= FIT_CACHE_SIZE:
+            self._fit_cache.clear()
+        self._fit_cache[key] = result
+        return result
+
+    def _check_shifts(self, timetable, shifts, conflicts=None, warnings=None) -> Tuple[int, int]:
+        """
+        (conflicting shifts, tight timings) for the shifts against the timetable.
+        Messages are appended to `conflicts`/`warnings` only when lists are passed in.
+        """
+        explain = conflicts is not None
         conflicting_shifts = 0
         tight_shifts = 0
+        commute = self.commute_mins
+        required_gap = self.commute_mins + self.min_buffer_mins
+
+        if not isinstance(timetable, WeeklyTimetable):
+            timetable = WeeklyTimetable(timetable)
+        near = timetable.near(required_gap)
 
-        for shift in job_shifts:
-            shift_day = shift['day'].lower()
-            shift_start = self._to_time(shift['start'])
-            shift_end = self._to_time(shift['end'])
+        for shift_day, shift_start, shift_end in shifts:
+            span = shift_mask(shift_day, shift_start, shift_end)
+            if span is None:
+                # Unknown day name: only classes filed under the same name can clash
+                classes = [(shift_day, cls_start, cls_end) for cls_start, cls_end in timetable.get(shift_day, ())]
+                start, end = shift_start, shift_end
+            else:
+                start, end, mask = span
+                if not mask & near:
+                    continue # Nowhere near a class: fits, nothing to report
+                classes = self._nearby_classes(timetable, shift_day, start)
 
-            # Filter classes for the same day
-            days_classes = [c for c in student_timetable if c['day'].lower() == shift_day]
-            
             has_conflict = False
-            for cls in days_classes:
-                cls_start = self._to_time(cls['start'])
-                cls_end = self._to_time(cls['end'])
+            for cls_day, cls_start, cls_end in classes:
 
                 # 1. Direct Conflict (Overlap)
-                if self._overlaps(shift_start, shift_end, cls_start, cls_end):
-                    conflicts.append(f"❌ Shift on {shift_day} ({shift['start']}-{shift['end']}) overlaps with class ({cls['start']}-{cls['end']})")
+                if max(start, cls_start) < min(end, cls_end):
+                    if explain:
+                        conflicts.append(f"❌ Shift on {shift_day} ({_fmt(start)}-{_fmt(end)}) overlaps with class ({_fmt(cls_start)}-{_fmt(cls_end)})")
                     has_conflict = True
                     break # Stop checking other classes for this shift if one conflict found
 
                 # 2. Insufficient Buffer (Commute check)
                 # Check buffer if shift starts after class
-                if shift_start > cls_end:
-                    gap = self._time_diff(cls_end, shift_start)
-                    required_gap = self.commute_time + self.min_buffer
+                if start > cls_end:
+                    gap = start - cls_end
                     
-                    if gap < self.commute_time:
-                         conflicts.append(f"❌ Impossible commute on {shift_day}: Only {gap.seconds//60}m gap between class end and shift start (need {self.commute_time.seconds//60}m)")
+                    if gap < commute:
+                         if explain:
+                             conflicts.append(f"❌ Impossible commute on {shift_day}: Only {gap}m gap between class end and shift start (need {commute}m)")
                          has_conflict = True
                          break
                     elif gap < required_gap:
-                        warnings.append(f"⚠️ Tight timing on {shift_day}: {gap.seconds//60}m gap (Commute is {self.commute_time.seconds//60}m)")
+                        if explain:
+                            warnings.append(f"⚠️ Tight timing on {shift_day}: {gap}m gap (Commute is {commute}m)")
                         tight_shifts += 1
 
                 # Check buffer if class starts after shift (student needs to get to class)
-                if cls_start > shift_end:
-                    gap = self._time_diff(shift_end, cls_start)
-                    required_gap = self.commute_time + self.min_buffer
+                if cls_start > end:
+                    gap = cls_start - end
                     
-                    if gap < self.commute_time:
-                         conflicts.append(f"❌ Impossible commute on {shift_day}: Shift ends too close to class start.")
+                    if gap < commute:
+                         if explain:
+                             conflicts.append(f"❌ Impossible commute on {cls_day}: Shift ends too close to class start.")
                          has_conflict = True
                          break
                     elif gap < required_gap:
-                         warnings.append(f"⚠️ Tight timing on {shift_day}: rushing from work to class.")
+                         if explain:
+                             warnings.append(f"⚠️ Tight timing on {cls_day}: rushing from work to class.")
                          tight_shifts += 1
 
             if has_conflict:
                 conflicting_shifts += 1
 
-        # Calculate Score
-        score = self._calculate_score(total_shifts, conflicting_shifts, tight_shifts)
-        
-        return self._result(score, self._get_status_label(score), conflicts + warnings)
-
-    def _overlaps(self, start1: time, end1: time, start2: time, end2: time) -> bool:
-        """Check if two time ranges overlap."""
-        return max(start1, start2) < min(end1, end2)
-
-    def _time_diff(self, start: time, end: time) -> timedelta:
-        """Calculate difference between two times."""
-        dummy_date = datetime(2000, 1, 1) # Arbitrary date
-        dt1 = datetime.combine(dummy_date, start)
-        dt2 = datetime.combine(dummy_date, end)
-        if dt2 < dt1:
-            dt2 += timedelta(days=1) # Handle overnight? (Simple version assumes same day)
-        return dt2 - dt1
-
-    def _to_time(self, time_input: Any) -> time:
-        """Convert 'HH:MM' string or time object to time object."""
-        if isinstance(time_input, time):
-            return time_input
-        if not time_input:
-             return time(0, 0) # Fallback? Or raise error?
-
-        time_str = str(time_input)
-        try:
-            return datetime.strptime(time_str, "%H:%M:%S").time()
-        except ValueError:
-            try:
-                return datetime.strptime(time_str, "%H:%M").time()
-            except ValueError:
-                 return time(0,0) # Fail safe
+        return conflicting_shifts, tight_shifts
 
+    def _nearby_classes(self, timetable: WeeklyTimetable, shift_day: str, shift_week_start: int):
+        """
+        Classes on the shift's day (in timetable order), then the next and previous day,
+        as (day, week_start, week_end) on the same unwrapped minute axis as the shift.
+        """
+        day_index = DAY_INDEX[shift_day]
+        base = shift_week_start - shift_week_start % MINUTES_PER_DAY
+        classes = []
+        for offset in (0, 1, -1):
+            day = DAYS[(day_index + offset) % 7]
+            for cls_start, cls_end in timetable.get(day, ()):
+                start, end = _week_span(0, cls_start, cls_end)
+                classes.append((day, base + offset * MINUTES_PER_DAY + start, base + offset * MINUTES_PER_DAY + end))
+        return classes
 
     def _calculate_score(self, total: int, conflicts: int, tight: int) -> int:
         if conflicts > 0:
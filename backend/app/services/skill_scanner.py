@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Iterable, FrozenSet
+
+class SkillScanner:
+    """
+    Aho-Corasick automaton over a fixed set of (lower-case) skills.
+    scan() walks a text once and returns every skill that occurs in it as a substring,
+    which is exactly what `skill in description` checks one skill at a time.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        self.vocabulary: FrozenSet[str] = frozenset(s.lower() for s in skills if s)
+
+        # Trie: goto[node] maps a character to the child node
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+
+        for skill in self.vocabulary:
+            node = 0
+            for ch in skill:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                node = nxt
+            self._out[node] = self._out[node] | {skill}
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                # Inherit matches that end at the failure state (e.g. "excel" inside "microsoft excel")
+                self._out[child] = self._out[child] | self._out[self._fail[child]]
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Skills found in `text`, which is expected to be lower-cased already."""
+        if not text or not self.vocabulary:
+            return frozenset()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+                if len(found) == len(self.vocabulary):
+                    break # Everything matched, no need to read further
+        return frozenset(found)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.models import Student, StudentPreferences
+
+def _columns(obj) -> dict:
+    return {attr.key: getattr(obj, attr.key) for attr in db.inspect(type(obj)).column_attrs}
+
+def _attach(model, values):
+    # Persistent and unmodified in the request's session, without a query
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+class StudentCache:
+    """
+    Short-lived per-process copy of each active student's row and preferences, so routes
+    that need the whole profile don't query students and student_preferences on every call.
+    Entries are plain column values, rebuilt into session objects on each hit. Each is
+    labelled with the student's `student:<id>` data version, read before the row was
+    loaded, and only used while that version is still current; an edit in any process
+    bumps it in the same transaction. Entries also expire after `ttl` seconds, and
+    mark_student_changed drops them in this process.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, student_id: int, version: int) -> Optional[Student]:
+        with self.lock:
+            entry = self.entries.get(student_id)
+        if entry is None:
+            return None
+        expires, entry_version, student_values, prefs_values = entry
+        if expires < time.monotonic() or entry_version != version:
+            return None
+
+        student = _attach(Student, student_values)
+        prefs = _attach(StudentPreferences, prefs_values) if prefs_values is not None else None
+        set_committed_value(student, 'preferences', prefs)
+        return student
+
+    def put(self, student: Student, version: int):
+        """Cache `student` as of data version `version` (read before the student was loaded)."""
+        prefs = student.preferences
+        entry = (time.monotonic() + self.ttl, version, _columns(student), _columns(prefs) if prefs is not None else None)
+        now = time.monotonic()
+        with self.lock:
+            self.entries[student.id] = entry
+            self.entries.move_to_end(student.id)
+            # Same TTL for every entry, so the oldest are the expired ones
+            while self.entries and next(iter(self.entries.values()))[0] < now:
+                self.entries.popitem(last=False)
+
+    def evict(self, student_id: int):
+        with self.lock:
+            self.entries.pop(student_id, None)
+
+def student_cache() -> Optional[StudentCache]:
+    """This app's cache, or None when STUDENT_CACHE_TTL is 0."""
+    ttl = current_app.config.get('STUDENT_CACHE_TTL') or 0
+    if not ttl:
+        return None
+    cache = current_app.extensions.get('student_cache')
+    if cache is None or cache.ttl != ttl:
+        cache = current_app.extensions['student_cache'] = StudentCache(ttl)
+    return cache
+
+def evict(student_id: int):
+    cache = student_cache()
+    if cache is not None:
+        cache.evict(student_id)
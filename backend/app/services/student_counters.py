@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, Optional
+from app.extensions import db
+from app.models import Application, JobMatch, StudentCounters, STRONG_MATCH_SCORE
+from app.models.counters import set_counts
+
+def counts_for(student_id: int) -> Dict[str, int]:
+    """The student's /stats counts (one primary-key lookup; zeros if nothing was ever counted)."""
+    row = db.session.query(
+        StudentCounters.applications, StudentCounters.saved, StudentCounters.strong_matches
+    ).filter(StudentCounters.student_id == student_id).first()
+    applications, saved, strong_matches = row or (0, 0, 0)
+    return {'applications': applications, 'saved': saved, 'strong_matches': strong_matches}
+
+def _match_counts(session, student_ids=None) -> Dict[int, int]:
+    query = session.query(JobMatch.student_id, db.func.count(JobMatch.id)) \
+        .filter(JobMatch.score >= STRONG_MATCH_SCORE).group_by(JobMatch.student_id)
+    if student_ids is not None:
+        query = query.filter(JobMatch.student_id.in_(student_ids))
+    return dict(query.all())
+
+def recount_matches(student_ids: Iterable[int], session=None):
+    """
+    Set strong_matches from job_matches for these students. Used after bulk match writes,
+    which bypass the ORM listeners. Caller commits.
+    """
+    session = session or db.session
+    student_ids = sorted(set(student_ids))
+    if not student_ids:
+        return
+    counts = _match_counts(session, student_ids)
+    set_counts(session.connection(), {
+        student_id: {'strong_matches': counts.get(student_id, 0)} for student_id in student_ids
+    }, columns=('strong_matches',))
+
+def reconcile(student_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute every counter from applications and job_matches and fix the rows that drifted
+    (bulk SQL, failed writes). Returns how many students were corrected.
+    """
+    if student_ids is not None:
+        student_ids = list(student_ids)
+
+    apps = db.session.query(
+        Application.student_id,
+        db.func.count(Application.id),
+        db.func.sum(db.case((Application.status == 'Saved', 1), else_=0))
+    ).group_by(Application.student_id)
+    stored = db.session.query(
+        StudentCounters.student_id, StudentCounters.applications, StudentCounters.saved, StudentCounters.strong_matches
+    )
+    if student_ids is not None:
+        apps = apps.filter(Application.student_id.in_(student_ids))
+        stored = stored.filter(StudentCounters.student_id.in_(student_ids))
+
+    actual = {}
+    for student_id, total, saved in apps.all():
+        actual.setdefault(student_id, {'applications': 0, 'saved': 0, 'strong_matches': 0}).update(
+            applications=total, saved=saved or 0
+        )
+    for student_id, matches in _match_counts(db.session, student_ids).items():
+        actual.setdefault(student_id, {'applications': 0, 'saved': 0, 'strong_matches': 0})['strong_matches'] = matches
+
+    current = {row[0]: {'applications': row[1], 'saved': row[2], 'strong_matches': row[3]} for row in stored.all()}
+    zero = {'applications': 0, 'saved': 0, 'strong_matches': 0}
+    drifted = {
+        student_id: actual.get(student_id, zero)
+        for student_id in set(actual) | set(current)
+        if actual.get(student_id, zero) != current.get(student_id, zero)
+    }
+    set_counts(db.session.connection(), drifted)
+    db.session.commit()
+    return len(drifted)
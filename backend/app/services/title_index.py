@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, List, Set
+from sqlalchemy import and_, distinct, func, or_
+
+from app.extensions import db
+from app.models import JobTitleGram
+
+GRAM_SIZE = 3
+
+def title_grams(text: str) -> Set[str]:
+    """Lower-cased character trigrams. Empty for text shorter than GRAM_SIZE."""
+    text = (text or '').lower()
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+class TitleIndex:
+    """
+    In-process trigram index over a list of lower-cased titles.
+    lookup(role) returns the positions whose title contains `role`, i.e. the same
+    answer as `role in title` for every title, but touching only candidate titles.
+    """
+
+    def __init__(self, titles: List[str]):
+        self.titles = titles
+        self.postings: Dict[str, Set[int]] = {}
+        for i, title in enumerate(titles):
+            for gram in title_grams(title):
+                self.postings.setdefault(gram, set()).add(i)
+
+    def lookup(self, role: str) -> Set[int]:
+        role = role.lower()
+        grams = title_grams(role)
+        if not grams:
+            # Too short to index - plain scan
+            return {i for i, title in enumerate(self.titles) if role in title}
+
+        # Intersect the rarest postings first; any missing gram means no match
+        lists = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        # Grams can match out of order, so confirm the substring
+        return {i for i in candidates if role in self.titles[i]}
+
+def index_job_title(job):
+    """
+    (Re)build the JobTitleGram rows for a job. Caller commits. Inserts and title edits
+    are indexed on flush by the Job listeners; this is for backfilling existing rows.
+    """
+    JobTitleGram.query.filter_by(job_id=job.id).delete(synchronize_session=False)
+    db.session.add_all(JobTitleGram(gram=gram, job_id=job.id) for gram in title_grams(job.title))
+
+def role_filter(job_model, roles: Iterable[str]):
+    """
+    SQL filter for "title contains any of these roles" that resolves candidates
+    through job_title_grams instead of an unindexable ILIKE '%role%' over jobs.
+    """
+    clauses = []
+    for role in roles:
+        grams = title_grams(role)
+        if not grams:
+            clauses.append(job_model.title.ilike(f"%{role}%"))
+            continue
+
+        candidates = (
+            db.session.query(JobTitleGram.job_id)
+            .filter(JobTitleGram.gram.in_(grams))
+            .group_by(JobTitleGram.job_id)
+            .having(func.count(distinct(JobTitleGram.gram)) == len(grams))
+        )
+        # ILIKE only runs on the candidate rows, to confirm gram order
+        clauses.append(and_(job_model.id.in_(candidates), job_model.title.ilike(f"%{role}%")))
+    return or_(*clauses)
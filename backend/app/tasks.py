@@ -2,10 +2,17 @@ from app.extensions import celery, db
 from app.scrapers.reed import ReedScraper
 from app.models import Job, Student, JobMatch, Application, JobShift
 from app.services.matching import MatchingEngine
+from app.services import data_versions, match_tracking, student_counters
+from app.services.match_writer import MatchWriter
+from app.services.schedule_filter import is_impossible
+from app.services.profiles import compile_student, compile_job
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from celery import chord, group
+from flask import current_app
 
 import logging
-import json
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -51,8 +58,8 @@ def scrape_jobs_task(self):
                 # casting set to list for keywords arg
                 scraper.run(keywords=[role], location=loc)
         
-        # 2. Trigger matching update
-        calculate_matches_task.delay()
+        # 2. Trigger matching update (only new jobs / changed students)
+        calculate_dirty_matches_task.delay()
         
         return "Scraping completed and matching triggered."
     except Exception as e:
@@ -62,87 +69,210 @@ def scrape_jobs_task(self):
 @celery.task
 def calculate_matches_task():
     """
-    Recalculate matches for active students against recent/all jobs.
-    Heavy task! In production, optimize to only check new jobs vs all students.
+    Recalculate matches for all students against all active jobs.
+    Heavy task! Regular runs should use calculate_dirty_matches_task instead.
+    Students are split into shards that run in parallel (see _dispatch_shards).
     """
     logger.info("Starting match calculation...")
-    engine = MatchingEngine()
-    
-    students = Student.query.all()
-    # Optimization: Only match against active jobs from last 7 days
-    recent_jobs = Job.query.filter_by(is_active=True).all() 
+    # Everything logged before this point is covered by the full run
+    change_ids, _, _ = match_tracking.pending_changes()
+
+    student_ids = [row.id for row in db.session.query(Student.id).all()]
+    shards = [(chunk, None) for chunk in _chunks(student_ids)]
+    return _dispatch_shards(shards, change_ids)
+
+@celery.task
+def calculate_dirty_matches_task():
+    """
+    Recalculate only the pairs affected by logged changes:
+    changed students x all active jobs, and all other students x changed jobs.
+    """
+    change_ids, student_ids, job_ids = match_tracking.pending_changes()
+    if not student_ids and not job_ids:
+        return "No pending match changes."
+
+    logger.info(f"Incremental match calculation: {len(student_ids)} students, {len(job_ids)} jobs changed.")
+    shards = [(chunk, None) for chunk in _chunks(sorted(student_ids))]
+
+    if job_ids:
+        other_query = db.session.query(Student.id)
+        if student_ids:
+            other_query = other_query.filter(~Student.id.in_(student_ids))
+        other_ids = [row.id for row in other_query.all()]
+        shards += [(chunk, sorted(job_ids)) for chunk in _chunks(other_ids)]
+
+    return _dispatch_shards(shards, change_ids)
+
+@celery.task
+def calculate_matches_shard_task(student_ids, job_ids=None):
+    """
+    Rematch one shard of students against active jobs (all of them, or just job_ids).
+    Runs with its own session and MatchWriter; returns counts for aggregation.
+    """
+    return _rematch_shard(student_ids, job_ids)
+
+@celery.task
+def aggregate_match_results_task(results, change_ids=None):
+    """
+    Chord callback: sum shard results and clear the change log they covered.
+    """
+    return _aggregate(results, change_ids)
+
+def _rematch_shard(student_ids, job_ids=None):
+    students = Student.query.filter(Student.id.in_(student_ids)).all()
+    jobs_query = Job.query.filter_by(is_active=True)
+    if job_ids is not None:
+        jobs_query = jobs_query.filter(Job.id.in_(job_ids))
+
+    return _rematch(MatchingEngine(), students, jobs_query.all(), partial=job_ids is not None)
+
+def _aggregate(results, change_ids):
+    written = sum(r['written'] for r in results)
+    failures = [f for r in results for f in r['failures']]
+
+    match_tracking.consume(change_ids or [])
+    if failures:
+        logger.error(f"{len(failures)} match records failed to write across {len(results)} shards.")
+    logger.info(f"Updated {written} match records.")
+    return f"Updated {written} matches."
+
+def _chunks(ids):
+    size = current_app.config.get('MATCH_SHARD_SIZE', 200)
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+def _dispatch_shards(shards, change_ids):
+    """
+    Run shards as a Celery chord when a broker is available. When tasks run eagerly
+    (local dev) fan out over a local process pool instead, then aggregate in-process.
+    """
+    if not shards:
+        return _aggregate([], change_ids)
+
+    eager = celery.conf.task_always_eager or current_app.config.get('CELERY_TASK_ALWAYS_EAGER')
+    if not eager:
+        header = group(calculate_matches_shard_task.s(student_ids, job_ids) for student_ids, job_ids in shards)
+        chord(header)(aggregate_match_results_task.s(change_ids))
+        return f"Dispatched {len(shards)} match shards."
+
+    workers = min(len(shards), current_app.config.get('MATCH_WORKERS') or os.cpu_count() or 1)
+    # An in-memory SQLite database can't be shared with child processes
+    in_memory = current_app.config.get('SQLALCHEMY_DATABASE_URI') in (None, 'sqlite://', 'sqlite:///:memory:')
+    if workers <= 1 or in_memory:
+        results = [_rematch_shard(student_ids, job_ids) for student_ids, job_ids in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_process,
+                                 initargs=(current_app.config['CONFIG_NAME'],)) as pool:
+            results = list(pool.map(_run_shard_in_process, *zip(*shards)))
+
+    return _aggregate(results, change_ids)
 
-    match_count = 0
+_shard_app = None
+
+def _init_shard_process(config_name):
+    # Each worker process gets its own app, engine and session
+    global _shard_app
+    from app import create_app
+    _shard_app = create_app(config_name)
+
+def _run_shard_in_process(student_ids, job_ids):
+    with _shard_app.app_context():
+        return _rematch_shard(student_ids, job_ids)
+
+def _rematch(engine, students, jobs, partial=False):
+    """
+    Score the given students against the given jobs and bulk-upsert JobMatch rows.
+    With MATCH_TOP_K set, only each student's top K (plus anything >= MATCH_KEEP_THRESHOLD)
+    is kept; `partial` means `jobs` is a subset, so entry is measured against the other stored
+    matches, and a student whose stored top K loses one of these jobs is rescored in full.
+    Returns {'written': count, 'failures': [...]}; failed rows are logged by MatchWriter.
+    """
+    if not students or not jobs:
+        return {'written': 0, 'failures': []}
+
+    # Read ids up front: the writer commits per batch, which expires loaded objects
+    job_ids = [job.id for job in jobs]
+
+    # Every job's own shifts in one query; the job side is compiled once, not per student.
+    # Jobs with equal shifts still share schedule-fit results: JobFeatures.shift_pattern,
+    # computed from these shifts, is the fit cache key
+    shifts_by_job = {}
+    for shift in JobShift.query.filter(JobShift.job_id.in_(job_ids)).all():
+        shifts_by_job.setdefault(shift.job_id, []).append(shift)
+
+    job_columns = engine.build_job_columns([compile_job(job, shifts_by_job.get(job.id, [])) for job in jobs])
+
+    # Scan each description once for every skill any of these students has
+    profiles = [compile_student(student) for student in students]
+    engine.index_skills(job_columns['features'], set().union(*(p.skills for p in profiles)))
+
+    top_k = current_app.config.get('MATCH_TOP_K')
+    threshold = current_app.config.get('MATCH_KEEP_THRESHOLD')
+    writer = MatchWriter()
     
-    for student in students:
-        # Build profile from actual student data
-        # Parse skills (assume comma-separated string)
-        skill_set = set()
-        if student.skills:
-            skill_set = {s.strip() for s in student.skills.split(',')}
-        
-        # Safe Timetable
-        slots = []
-        if student.timetable:
-            slots = [{"day": s.day_of_week, "start": s.start_time, "end": s.end_time} for s in student.timetable.slots]
-
-        student_profile = {
-            "location": {
-                "lat": student.latitude or 51.5074, 
-                "lng": student.longitude or -0.1278
-            }, 
-            "timetable": slots,
-            "min_salary": student.preferences.min_salary if student.preferences else 10.0,
-            "skills": skill_set,
-            "preferences": {
-                "roles": [r.strip() for r in student.preferences.preferred_roles.split(',')] if student.preferences and student.preferences.preferred_roles else [],
-                "locations": [l.strip() for l in student.preferences.preferred_locations.split(',')] if student.preferences and student.preferences.preferred_locations else [],
-                "max_commute_time": student.preferences.max_commute_time if student.preferences else 45
-            }
-        }
-        
-        for job in recent_jobs:
-            try:
-                # Explicitly fetch shifts to avoid DetachedInstanceError with dynamic relationship
-                shifts = JobShift.query.filter_by(job_id=job.id).all()
-                
-                job_data = {
-                    "location": {"lat": job.latitude or 51.5, "lng": job.longitude or -0.1, "name": job.location},
-                    "shifts": [{"day": s.day_of_week, "start": s.start_time, "end": s.end_time} for s in shifts],
-                    "salary_min": job.salary_min,
-                    "salary_max": job.salary_max,
-                    "salary_type": job.salary_type, 
-                    "skills": set(), 
-                    "title": job.title,
-                    "description": job.description 
-                }
-                
-                # Calculate match
-                result = engine.calculate_match(student_profile, job_data)
-                score = result['total_score']
-                
-                # Upsert Match Record
-                match_record = JobMatch.query.filter_by(student_id=student.id, job_id=job.id).first()
-                if not match_record:
-                    match_record = JobMatch(student_id=student.id, job_id=job.id)
-                    db.session.add(match_record)
-                
-                match_record.score = score
-                match_record.breakdown = json.dumps(result['breakdown']) # Ensure breakdown is JSON string
-                match_record.last_calculated = datetime.utcnow()
-                
-                db.session.commit() # Commit per match to avoid rollback issues wiping everything
-                match_count += 1
+    # Job positions by shift pattern, so the schedule prefilter runs once per distinct pattern
+    patterns = {}
+    for i, features in enumerate(job_columns['features']):
+        patterns.setdefault(features.shift_pattern, (features.shifts, []))[1].append(i)
+
+    changed = set(job_ids)
+    rescore = [] # Students whose partial result can't be trusted; see _stored_top_k
+    for profile in profiles:
+        student_id = profile.student_id
+        # Jobs whose shifts mostly clash with classes are ruled out (the rule /jobs applies
+        # in SQL, see schedule_filter), never scored
+        exclude = [i for shifts, indices in patterns.values() if is_impossible(profile.timetable, shifts) for i in indices]
 
-            except Exception as e:
-                db.session.rollback()
-                logger.error(f"Error processing job {job.id}: {e}")
-                print(f"Error processing job {job.id}: {e}")
+        if top_k:
+            floor, old_top = _stored_top_k(student_id, top_k, job_ids) if partial else (None, {})
+            kept = engine.top_matches(
+                profile, job_columns['features'], job_columns, top_k, threshold, floor,
+                candidates_only=True, exclude=exclude, explain=False
+            )
+            # A rescored job that falls out of the stored top k leaves a place another
+            # unstored job may now deserve: only a full rescore can tell
+            new_scores = {job_ids[i]: result['total_score'] for i, result in kept}
+            old_kth = min(old_top.values()) if len(old_top) == top_k else None
+            if old_kth is not None and any(
+                job_id in changed and new_scores.get(job_id, -1) < old_kth for job_id in old_top
+            ):
+                rescore.append(student_id)
                 continue
-            
-    # db.session.commit() # Removed bulk commit
-    logger.info(f"Updated {match_count} match records.")
-    return f"Updated {match_count} matches."
+            for i, result in kept:
+                writer.add(student_id, job_ids[i], result['total_score'], result['breakdown'])
+            kept_ids = {job_ids[i] for i, _ in kept}
+            writer.discard(student_id, [job_id for job_id in job_ids if job_id not in kept_ids])
+            continue
+
+        # Score the student against every job in range in one columnar pass; jobs beyond
+        # their commute radius or ruled out above are skipped and any match they had is dropped
+        batch = engine.score_batch(
+            profile, job_columns['features'], job_columns, candidates_only=True, exclude=exclude, explain=False
+        )
+        for row, i in enumerate(batch['indices']):
+            result = engine.unpack_row(batch, row)
+            writer.add(student_id, job_ids[i], result['total_score'], result['breakdown'])
+        in_range = set(batch['indices'].tolist())
+        writer.discard(student_id, [job_id for i, job_id in enumerate(job_ids) if i not in in_range])
+
+    writer.flush()
+    result = {'written': writer.written, 'failures': writer.failures}
+    if rescore:
+        full = _rematch(engine, Student.query.filter(Student.id.in_(rescore)).all(), Job.query.filter_by(is_active=True).all())
+        result = {'written': result['written'] + full['written'], 'failures': result['failures'] + full['failures']}
+    return result
+
+def _stored_top_k(student_id, k, job_ids):
+    """
+    For a partial rematch of `job_ids`: the score a rescored job must beat to enter the
+    student's top k (the k-th best stored score among the other jobs, or None if there are
+    fewer than k), and the stored top k as {job_id: score}.
+    """
+    rows = db.session.query(JobMatch.job_id, JobMatch.score).filter_by(student_id=student_id) \
+        .order_by(JobMatch.score.desc()).limit(k + len(job_ids)).all()
+    changed = set(job_ids)
+    others = [score for job_id, score in rows if job_id not in changed]
+    floor = others[k - 1] if len(others) >= k else None
+    return floor, dict(rows[:k])
 
 @celery.task
 def cleanup_old_jobs_task():
@@ -154,10 +284,23 @@ def cleanup_old_jobs_task():
     
     for job in old_jobs:
         job.is_active = False
+    if old_jobs:
+        data_versions.bump(data_versions.JOBS)
         
     db.session.commit()
     return f"Archived {len(old_jobs)} old jobs."
 
+@celery.task
+def reconcile_counters_task():
+    """
+    Recount every student's /stats counters from applications and job_matches.
+    The write paths keep them current; this catches drift from bulk SQL or failed writes.
+    """
+    corrected = student_counters.reconcile()
+    if corrected:
+        logger.warning(f"Corrected drifted counters for {corrected} students.")
+    return f"Corrected {corrected} student counters."
+
 @celery.task
 def send_daily_digest(student_id):
     """
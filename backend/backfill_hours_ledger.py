@@ -0,0 +1,11 @@
+from app import create_app
+from app.extensions import db
+from app.services import hours_ledger
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Rebuilding Weekly Hours Ledger ---")
+    db.create_all() # Creates weekly_hours if missing
+    rows = hours_ledger.rebuild()
+    print(f"Backfill Complete. {rows} student-weeks.")
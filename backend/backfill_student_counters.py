@@ -0,0 +1,11 @@
+from app import create_app
+from app.extensions import db
+from app.services import student_counters
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Building Student Counters ---")
+    db.create_all() # Creates student_counters if missing
+    corrected = student_counters.reconcile()
+    print(f"Backfill Complete. {corrected} students.")
@@ -0,0 +1,20 @@
+from app import create_app
+from app.models import Job
+from app.extensions import db
+from app.services.title_index import index_job_title
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Building Job Title Index ---")
+    db.create_all() # Creates job_title_grams if missing
+
+    jobs = Job.query.all()
+    for i, job in enumerate(jobs, 1):
+        index_job_title(job)
+        if i % 500 == 0:
+            db.session.commit()
+            print(f"Indexed {i}/{len(jobs)} jobs...")
+
+    db.session.commit()
+    print(f"Backfill Complete. Indexed {len(jobs)} jobs.")
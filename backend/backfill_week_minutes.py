@@ -0,0 +1,35 @@
+from app import create_app
+from app.models import JobShift, ScheduleSlot
+from app.extensions import db
+from app.services.scheduler import week_minutes
+from sqlalchemy import text
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Adding minute-of-week columns ---")
+    with db.engine.connect() as conn:
+        for table in ('job_shifts', 'schedule_slots'):
+            try:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS start_minute_of_week INTEGER"))
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS end_minute_of_week INTEGER"))
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_start_minute_of_week ON {table} (start_minute_of_week)"))
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_end_minute_of_week ON {table} (end_minute_of_week)"))
+                conn.commit()
+                print(f"Updated '{table}'.")
+            except Exception as e:
+                conn.rollback()
+                print(f"Error updating '{table}': {e}")
+
+    # New rows are filled by the before_insert/before_update listeners on the models
+    for model in (JobShift, ScheduleSlot):
+        rows = model.query.all()
+        for i, row in enumerate(rows, 1):
+            row.start_minute_of_week, row.end_minute_of_week = week_minutes(row.day_of_week, row.start_time, row.end_time)
+            if i % 1000 == 0:
+                db.session.commit()
+                print(f"{model.__tablename__}: {i}/{len(rows)}")
+        db.session.commit()
+        print(f"Backfilled {len(rows)} {model.__tablename__} rows.")
+
+    print("Backfill Complete.")
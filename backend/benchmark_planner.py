@@ -0,0 +1,62 @@
+"""
+Planner latency on synthetic students with hundreds of candidate jobs.
+Run: python benchmark_planner.py [candidates] [students]
+"""
+import random
+import sys
+import time
+
+from app.services.planner import build_candidates, plan_bundle
+from app.services.profiles import compile_intervals
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def random_timetable(rng):
+    slots = []
+    for day in rng.sample(DAYS[:5], 4):
+        start = rng.randint(9, 14)
+        slots.append({"day": day, "start": f"{start:02d}:00", "end": f"{start + 2:02d}:00"})
+    return compile_intervals(slots, by_day=True)
+
+def random_jobs(rng, count):
+    # A few shared patterns (like the scraper's weekend pair) plus random ones
+    common = [
+        [{"day": "Saturday", "start": "10:00", "end": "16:00"}, {"day": "Sunday", "start": "10:00", "end": "16:00"}],
+        [{"day": "Friday", "start": "18:00", "end": "23:00"}],
+    ]
+    jobs = []
+    for job_id in range(count):
+        if rng.random() < 0.3:
+            shifts = rng.choice(common)
+        else:
+            shifts = []
+            for day in rng.sample(DAYS, rng.randint(1, 4)):
+                start = rng.randint(6, 19)
+                shifts.append({"day": day, "start": f"{start:02d}:00", "end": f"{min(start + rng.randint(3, 8), 23):02d}:30"})
+        jobs.append((job_id, round(rng.uniform(50, 100), 1), compile_intervals(shifts)))
+    return jobs
+
+def run(candidate_count=300, students=20):
+    rng = random.Random(42)
+    timings = []
+    for _ in range(students):
+        timetable = random_timetable(rng)
+        jobs = random_jobs(rng, candidate_count)
+        limit = rng.choice([10, 15, 20]) * 60
+
+        started = time.perf_counter()
+        candidates = build_candidates(timetable, jobs)
+        plan = plan_bundle(candidates, limit)
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+
+        print(f"{len(candidates):4d} candidates, limit {limit // 60:2d}h -> {len(plan['job_ids'])} jobs, "
+              f"{plan['total_minutes'] / 60:.1f}h, score {plan['total_score']}, "
+              f"{plan['nodes']} nodes, optimal={plan['optimal']}, {elapsed * 1000:.1f} ms")
+
+    timings.sort()
+    print(f"\nmedian {timings[len(timings) // 2] * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
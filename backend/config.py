@@ -23,8 +23,29 @@ class Config:
             'task': 'app.tasks.cleanup_old_jobs_task',
             'schedule': crontab(hour=0, minute=0), # Midnight
         },
+        'reconcile-counters-daily': {
+            'task': 'app.tasks.reconcile_counters_task',
+            'schedule': crontab(hour=3, minute=30), # After the nightly cleanup
+        },
     }
     
+    # Rematch sharding: students per shard, and local worker processes when running eagerly
+    MATCH_SHARD_SIZE = int(os.environ.get('MATCH_SHARD_SIZE', 200))
+    MATCH_WORKERS = int(os.environ['MATCH_WORKERS']) if os.environ.get('MATCH_WORKERS') else None
+    
+    # Top-K match storage: keep each student's best K jobs plus anything >= the threshold
+    # (80 keeps /stats "matches" exact). Unset = store every student x job pair.
+    MATCH_TOP_K = int(os.environ['MATCH_TOP_K']) if os.environ.get('MATCH_TOP_K') else None
+    MATCH_KEEP_THRESHOLD = float(os.environ.get('MATCH_KEEP_THRESHOLD', 80))
+    
+    # Per-process LRU of /jobs and /stats bodies keyed by ETag (0 disables; ETags/304s work either way)
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 0))
+    # Per-process LRU of encoded job fragments keyed by (projection, job id, updated_at); 0 disables
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 10000))
+    # Seconds a process reuses a student's row and preferences across requests (0 disables).
+    # Edits in the same process apply at once; other processes see them within this window.
+    STUDENT_CACHE_TTL = int(os.environ.get('STUDENT_CACHE_TTL', 30))
+    
     # Scraper Keys
     REED_API_KEY = os.environ.get('REED_API_KEY')
 
@@ -35,8 +56,14 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
 
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://' # In-memory
+    CELERY_TASK_ALWAYS_EAGER = True
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,9 @@
+from app import create_app
+from app.extensions import db
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Creating data_versions ---")
+    db.create_all() # Creates data_versions if missing; counters start at 0 on first bump
+    print("Migration Complete.")
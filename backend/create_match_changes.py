@@ -0,0 +1,9 @@
+from app import create_app
+from app.extensions import db
+
+app = create_app('development')
+
+with app.app_context():
+    print("--- Creating match_changes ---")
+    db.create_all() # Creates match_changes if missing; register and profile/schedule edits log to it
+    print("Migration Complete.")
@@ -1,6 +1,7 @@
 from app import create_app
 from app.models import Student, Job, StudentPreferences
 from app.services.matching import MatchingEngine
+from app.services.profiles import compile_student, compile_job
 
 app = create_app('development')
 
@@ -24,60 +25,41 @@ with app.app_context():
         
     print(f"Job: '{job.title}' @ '{job.location}' (ID: {job.id})")
     
-    # 3. Construct Profile (as force_match does)
-    # BEWARE: force_match HARDCODED this! I will simulate BOTH database and hardcoded.
+    # 3. Construct Profiles
+    # DB Version: the canonical compiled profile used by the rematch and /jobs/<id>
+    profile_db = compile_student(student)
     
-    # DB Version
-    db_roles = [r.strip() for r in (student.preferences.preferred_roles or "").split(',')]
-    profile_db = {
-        "location": {"lat": student.latitude, "lng": student.longitude},
-        "preferences": {
-            "roles": db_roles,
-            "locations": ["birmingham"],
-            "max_commute_time": 45
-        }
-    }
-    
-    # Hardcoded Version (from force_match.py)
+    # Hardcoded Version (legacy dict input is still accepted by the engine)
     profile_force = {
         "location": {"lat": student.latitude or 51.5, "lng": student.longitude or -0.1},
         "preferences": {
             "roles": ['barista', 'cafe'], # Hardcoded
-            "locations": ['birmingham'],
+            "primary_city": "Birmingham",
             "max_commute_time": 45
         }
     }
     
-    job_data = {
-        "location": {"lat": job.latitude, "lng": job.longitude, "name": job.location},
-        "shifts": [],
-        "salary_min": job.salary_min or 0,
-        "salary_max": job.salary_max or 0,
-        "salary_type": job.salary_type,
-        "skills": set(),
-        "title": job.title,
-        "description": job.description
-    }
+    job_features = compile_job(job)
     
     engine = MatchingEngine()
     
     print("\n--- Test 1: Using DB Preferences ---")
-    print(f"Roles: {profile_db['preferences']['roles']}")
-    res_db = engine.calculate_match(profile_db, job_data)
+    print(f"Roles: {profile_db.roles}")
+    res_db = engine.calculate_match(profile_db, job_features)
     print(f"Result: {res_db}")
     
     print("\n--- Test 2: Using Hardcoded Preferences ---")
     print(f"Roles: {profile_force['preferences']['roles']}")
-    res_force = engine.calculate_match(profile_force, job_data)
+    res_force = engine.calculate_match(profile_force, job_features)
     print(f"Result: {res_force}")
     
     print("\n--- Why is Pref Score 0? ---")
     # Manual check
-    roles = profile_db['preferences']['roles']
-    title = job_data['title'].lower()
-    matches = [r.lower() in title for r in roles]
+    roles = profile_db.roles
+    title = job_features.title
+    matches = [r in title for r in roles]
     print(f"Title Lower: '{title}'")
-    print(f"Roles Lower: {[r.lower() for r in roles]}")
+    print(f"Roles Lower: {list(roles)}")
     print(f"Matches: {matches}")
     print(f"Any(Matches): {any(matches)}")
     
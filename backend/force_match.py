@@ -1,9 +1,9 @@
 from app import create_app
-from app.models import Student, StudentPreferences, Job, JobMatch
+from app.models import Student, StudentPreferences, Job
 from app.services.matching import MatchingEngine
+from app.services.match_writer import MatchWriter
+from app.services.profiles import compile_student, compile_job
 from app.extensions import db
-import json
-from datetime import datetime
 
 app = create_app('development')
 
@@ -30,52 +30,22 @@ with app.app_context():
     jobs = Job.query.filter_by(is_active=True).all()
     print(f"Matching against {len(jobs)} active jobs...")
     
-    count = 0
+    # Same compiled profile the rematch task uses (timetable skipped for speed)
+    profile = compile_student(student, slots=[])
+    
+    writer = MatchWriter()
     for job in jobs:
-        # Simplified profile construction
-        student_profile = {
-            "location": {"lat": student.latitude or 51.5, "lng": student.longitude or -0.1},
-            "timetable": [], # Skip for speed
-            "min_salary": student.preferences.min_salary,
-            "skills": set(),
-            "preferences": {
-                "roles": ['barista', 'cafe'],
-                "locations": ['birmingham'],
-                "primary_city": "Birmingham",
-                "preferred_locations": "Birmingham",
-                "open_to_other_cities": True,
-                "max_commute_time": 45
-            }
-        }
-        
-        job_data = {
-            "location": {"lat": job.latitude or 55.0, "lng": job.longitude or -1.0, "name": job.location},
-            "shifts": [],
-            "salary_min": job.salary_min or 0,
-            "salary_max": job.salary_max or 0,
-            "salary_type": job.salary_type,
-            "skills": set(),
-            "title": job.title,
-            "description": job.description
-        }
+        res = engine.calculate_match(profile, compile_job(job, shifts=[]))
         
-        res = engine.calculate_match(student_profile, job_data)
-        
-        location_name = job_data['location'].get('name', '')
-        if 'barista' in job_data['title'].lower() and 'birmingham' in location_name.lower():
-             print(f"TARGET JOB RESULT '{job_data['title']}' @ '{location_name}': {res}")
+        location_name = job.location or ''
+        if 'barista' in (job.title or '').lower() and 'birmingham' in location_name.lower():
+             print(f"TARGET JOB RESULT '{job.title}' @ '{location_name}': {res}")
              
-        # Save
-        match = JobMatch.query.filter_by(student_id=student.id, job_id=job.id).first()
-        if not match:
-            match = JobMatch(student_id=student.id, job_id=job.id)
-            db.session.add(match)
-            
-        match.score = res['total_score']
-        match.breakdown = json.dumps(res['breakdown'])
-        match.last_calculated = datetime.utcnow()
-        count += 1
+        # Save (buffered, upserted in batches)
+        writer.add(student.id, job.id, res['total_score'], res['breakdown'])
         
-    db.session.commit()
-    print(f"Successfully updated {count} match records.")
+    writer.flush()
+    print(f"Successfully updated {writer.written} match records.")
+    if writer.failures:
+        print(f"Failed to write {len(writer.failures)} match records: {writer.failures[:5]}")
     print("--- Done ---")
@@ -0,0 +1,15 @@
+from app.extensions import db
+
+def count_queries(fn):
+    """Run fn() and return (its result, the SQL statements it executed), for the query-count tests."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        db.event.remove(db.engine, 'before_cursor_execute', record)
+    return result, statements
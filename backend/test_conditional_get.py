@@ -0,0 +1,81 @@
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, Job
+from app.services.match_writer import MatchWriter
+from app.services.response_cache import response_cache
+from app.services import data_versions
+from query_counter import count_queries
+
+app = create_app('testing')
+app.config['RESPONSE_CACHE_SIZE'] = 16
+
+def _student_with_job(email):
+    user = User(email=email)
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, first_name='Etag')
+    db.session.add(student)
+    db.session.flush()
+    job = Job(title='Barista', is_active=True)
+    db.session.add(job)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}, student, job
+
+def test_etag_and_304():
+    with app.app_context():
+        db.create_all()
+        headers, student, job = _student_with_job('etag@test.com')
+        client = app.test_client()
+
+        first = client.get('/api/jobs', headers=headers)
+        etag = first.headers['ETag']
+        assert first.status_code == 200 and not etag.startswith('W/')
+
+        # Revalidation never reaches the match join
+        response, statements = count_queries(
+            lambda: client.get('/api/jobs', headers={**headers, 'If-None-Match': etag})
+        )
+        print(f"304 took {len(statements)} queries")
+        assert response.status_code == 304
+        assert not any('job_matches' in s for s in statements)
+
+        # Different parameters are a different representation
+        assert client.get('/api/jobs?sort_by=posted_at', headers=headers).headers['ETag'] != etag
+
+        # A rematch writing this student's matches changes the ETag
+        with MatchWriter() as writer:
+            writer.add(student.id, job.id, 91.0, {})
+        response = client.get('/api/jobs', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json['jobs'][0]['match_score'] == 91.0
+        etag = response.headers['ETag']
+
+        # So does an ingest (job table version)
+        data_versions.bump(data_versions.JOBS)
+        db.session.commit()
+        assert client.get('/api/jobs', headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+        # /stats follows applications and matches
+        stats = client.get('/api/stats', headers=headers)
+        assert stats.json['matches'] == 1
+        assert client.get('/api/stats', headers={**headers, 'If-None-Match': stats.headers['ETag']}).status_code == 304
+        client.post(f'/api/jobs/{job.id}/save', headers=headers)
+        stats = client.get('/api/stats', headers={**headers, 'If-None-Match': stats.headers['ETag']})
+        assert stats.status_code == 200 and stats.json['saved'] == 1
+
+def test_server_side_cache():
+    with app.app_context():
+        db.create_all()
+        headers, _, _ = _student_with_job('cache@test.com')
+        client = app.test_client()
+        response_cache().clear()
+
+        fresh = client.get('/api/jobs', headers=headers)
+        cached, statements = count_queries(lambda: client.get('/api/jobs', headers=headers))
+        assert cached.status_code == 200 and cached.json == fresh.json
+        assert cached.headers['ETag'] == fresh.headers['ETag']
+        assert not any('job_matches' in s for s in statements)
+
+if __name__ == "__main__":
+    test_etag_and_304()
+    test_server_side_cache()
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, Job, JobMatch, Application
+from query_counter import count_queries
+
+app = create_app('testing')
+
+def test_dashboard_matches_separate_endpoints():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='dashboard@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Dash')
+        db.session.add(student)
+        db.session.flush()
+        for i in range(6):
+            job = Job(title=f'Job {i}', company_name='Co', description='Long text', is_active=True)
+            db.session.add(job)
+            db.session.flush()
+            db.session.add(JobMatch(student_id=student.id, job_id=job.id, score=70.0 + i * 5,
+                                    breakdown=json.dumps({'location_data': {'tier': 1}})))
+            if i < 3:
+                db.session.add(Application(student_id=student.id, job_id=job.id, status='Saved' if i else 'Applied',
+                                           applied_at=datetime(2024, 1, 1 + i)))
+        db.session.commit()
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+
+        dashboard, statements = count_queries(lambda: client.get('/api/dashboard', headers=headers))
+        print(f"/dashboard took {len(statements)} queries")
+        assert dashboard.status_code == 200
+        body = dashboard.json
+
+        top = client.get('/api/jobs?sort_by=match_score&per_page=3', headers=headers).json['jobs']
+        assert [job['id'] for job in body['jobs']] == [job['id'] for job in top]
+        assert body['jobs'][0]['match_score'] == 95.0
+        assert body['jobs'][0]['match_breakdown'] == {'location_data': {'tier': 1}}
+        assert 'description' not in body['jobs'][0]
+
+        assert body['stats'] == client.get('/api/stats', headers=headers).json
+        assert body['stats']['matches'] == 4 and body['stats']['applications'] == 3 and body['stats']['saved'] == 2
+
+        apps = client.get('/api/applications', headers=headers).json
+        assert [a['id'] for a in body['applications']] == [a['id'] for a in apps]
+        assert body['applications'][0]['job_title'] == 'Job 2'
+
+        # Conditional like /jobs
+        etag = dashboard.headers['ETag']
+        assert client.get('/api/dashboard', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+if __name__ == "__main__":
+    test_dashboard_matches_separate_endpoints()
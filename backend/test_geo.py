@@ -0,0 +1,57 @@
+import numpy as np
+from app.services.geo import GridIndex, haversine_miles, commute_radius_miles
+from app.services.matching import MatchingEngine
+
+LONDON = (51.5074, -0.1278)
+
+def test_grid_index_radius_lookup():
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(50.0, 56.0, 500)
+    lngs = rng.uniform(-4.0, 1.0, 500)
+    lats[3] = np.nan # Not geocoded
+
+    index = GridIndex(lats, lngs)
+    for miles in (5, 20, 80):
+        found, distances = index.query_radius(*LONDON, miles)
+        brute = haversine_miles(LONDON[0], LONDON[1], lats, lngs)
+        expected = set(np.flatnonzero(brute <= miles))
+        print(f"{miles} miles: {len(found)} jobs")
+        assert set(found.tolist()) == expected
+        assert np.allclose(distances, brute[found])
+
+def test_distance_aware_location_score():
+    engine = MatchingEngine()
+    # 45 minutes commute -> ~11 miles
+    assert commute_radius_miles(45) == 11.25
+
+    student = {
+        "location": {"lat": LONDON[0], "lng": LONDON[1]},
+        "preferences": {"primary_city": "Brighton", "max_commute_time": 45},
+    }
+    jobs = [
+        {"title": "Close", "location": {"name": "Camden", "lat": 51.539, "lng": -0.1426}},
+        {"title": "Primary city", "location": {"name": "Brighton", "lat": 50.8225, "lng": -0.1372}},
+        {"title": "Far", "location": {"name": "Leeds", "lat": 53.8008, "lng": -1.5491}},
+        {"title": "No coordinates", "location": {"name": "Croydon"}},
+        {"title": "Remote", "location": {"name": "Leeds", "lat": 53.8008, "lng": -1.5491}, "is_remote": True},
+    ]
+
+    batch = engine.score_batch(student, jobs)
+    for i, job in enumerate(jobs):
+        single = engine.calculate_match(student, job)
+        print(f"{job['title']}: {single['breakdown']['location_data']['reason']}")
+        assert engine.unpack_row(batch, i) == single
+
+    location = list(batch['breakdown']['location'])
+    assert location[0] >= 90 # Within the commute radius
+    assert location[1] == 100 # Primary city is kept even though it's out of range
+    assert location[2] == 0 and location[3] == 0
+    assert location[4] == 100
+
+    # Only the job known to be out of range is skipped
+    candidates = engine.score_batch(student, jobs, candidates_only=True)
+    assert list(candidates['indices']) == [0, 1, 3, 4]
+
+if __name__ == "__main__":
+    test_grid_index_radius_lookup()
+    test_distance_aware_location_score()
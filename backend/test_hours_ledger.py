@@ -0,0 +1,63 @@
+from datetime import date
+from app import create_app, db
+from app.models import User, Student, Job, WorkLog, WeeklyHours
+from app.services import hours_ledger
+
+app = create_app('testing')
+
+def test_ledger_follows_work_logs():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='ledger@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Ledger', weekly_hours_limit=20)
+        job = Job(title='Barista')
+        db.session.add_all([student, job])
+        db.session.commit()
+
+        monday = date(2026, 10, 12)
+        next_monday = date(2026, 10, 19)
+
+        logs = [
+            WorkLog(student_id=student.id, job_id=job.id, week_start_date=monday, hours_worked=12),
+            WorkLog(student_id=student.id, job_id=job.id, week_start_date=monday, hours_worked=6),
+            WorkLog(student_id=student.id, job_id=job.id, week_start_date=next_monday, hours_worked=5),
+        ]
+        db.session.add_all(logs)
+        db.session.commit()
+
+        # Any day of the week finds the same row
+        assert hours_ledger.hours_for_week(student.id, date(2026, 10, 15)) == 18
+        assert hours_ledger.remaining_hours(student, monday) == 2
+        assert not hours_ledger.is_over_limit(student, monday)
+
+        # Update in place
+        logs[1].hours_worked = 9
+        db.session.commit()
+        assert hours_ledger.hours_for_week(student.id, monday) == 21
+        assert hours_ledger.is_over_limit(student, monday)
+
+        # Move a log to another week
+        logs[0].week_start_date = next_monday
+        db.session.commit()
+        assert hours_ledger.hours_for_week(student.id, monday) == 9
+        assert hours_ledger.hours_for_week(student.id, next_monday) == 17
+
+        # Delete
+        db.session.delete(logs[2])
+        db.session.commit()
+        assert hours_ledger.hours_for_week(student.id, next_monday) == 12
+        assert hours_ledger.rolling_hours(student.id, next_monday, weeks=2) == 21
+        assert hours_ledger.hours_by_student([student.id], monday) == {student.id: 9}
+        print(f"Ledger: {WeeklyHours.query.all()}")
+
+        # A rebuild from work_logs agrees with the incrementally maintained totals
+        before = {(r.student_id, r.week_start_date): r.total_hours for r in WeeklyHours.query.all() if r.total_hours}
+        hours_ledger.rebuild()
+        after = {(r.student_id, r.week_start_date): r.total_hours for r in WeeklyHours.query.all()}
+        assert before == after
+
+if __name__ == "__main__":
+    test_ledger_follows_work_logs()
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, time
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, Job, JobShift, JobMatch
+from app.api.schemas import JobSchema
+from app.api.serializers import DESCRIPTION_PREVIEW
+from query_counter import count_queries
+
+app = create_app('testing')
+
+def test_listing_matches_schema_and_projects():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='serializer@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Serializer')
+        db.session.add(student)
+        db.session.flush()
+        job = Job(title='Barista', company_name='Beans', description='x' * 500, salary_min=11.5, location='Leeds',
+                  latitude=53.8, longitude=-1.55, posted_at=datetime(2024, 3, 1, 9, 30, 15, 250), is_active=True)
+        other = Job(title='Waiter', description='Short', is_active=True)
+        db.session.add_all([job, other])
+        db.session.flush()
+        db.session.add(JobShift(job_id=job.id, day_of_week='Saturday', start_time=time(9), end_time=time(17, 30)))
+        db.session.add(JobMatch(student_id=student.id, job_id=job.id, score=87.5,
+                                breakdown=json.dumps({'location_data': {'tier': 1, 'badge': 'LOCAL'}})))
+        db.session.commit()
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+
+        # Default output is what JobSchema produced
+        jobs = client.get('/api/jobs', headers=headers).json['jobs']
+        expected = json.loads(json.dumps(JobSchema().dump(job)))
+        expected['match_score'] = 87.5
+        assert jobs[0] == expected
+        assert 'match_score' not in jobs[1]
+
+        # Projection and truncated descriptions
+        jobs = client.get('/api/jobs?fields=title,description,match_score,match_breakdown&description=truncated',
+                          headers=headers).json['jobs']
+        print(jobs[0])
+        assert set(jobs[0]) == {'id', 'title', 'description', 'match_score', 'match_breakdown'}
+        assert jobs[0]['description'] == 'x' * DESCRIPTION_PREVIEW + '…'
+        assert jobs[0]['match_breakdown']['location_data']['badge'] == 'LOCAL'
+        assert jobs[1]['description'] == 'Short'
+
+        jobs = client.get('/api/jobs?description=none', headers=headers).json['jobs']
+        assert 'description' not in jobs[0] and jobs[0]['shifts']
+
+        assert client.get('/api/jobs?fields=title,password', headers=headers).status_code == 400
+        assert client.get('/api/jobs?description=short', headers=headers).status_code == 400
+
+def response_titles(response):
+    return {job['id']: job['title'] for job in response.json['jobs']}
+
+def test_fragments_cached_until_job_changes():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='fragments@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Fragments')
+        db.session.add(student)
+        job = Job(title='Cashier', description='Tills', is_active=True)
+        db.session.add(job)
+        db.session.commit()
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+        url = '/api/jobs?fields=title,description,shifts'
+
+        client.get(url, headers=headers)
+        response, statements = count_queries(lambda: client.get(url, headers=headers))
+        # Warm: the listing query only, no job columns or shifts re-read
+        assert not any('job_shifts.is_flexible' in s or 'jobs.description' in s for s in statements)
+        assert response_titles(response)[job.id] == 'Cashier'
+
+        # An edit bumps updated_at, so the old fragment is never served again
+        job = db.session.get(Job, job.id)
+        job.title = 'Senior Cashier'
+        db.session.commit()
+        assert response_titles(client.get(url, headers=headers))[job.id] == 'Senior Cashier'
+
+        # The detail view shares the cache and still carries the analysis
+        detail = client.get(f'/api/jobs/{job.id}', headers=headers).json
+        assert detail['title'] == 'Senior Cashier' and 'match_analysis' in detail
+        assert detail == {**json.loads(json.dumps(JobSchema().dump(job))), 'match_analysis': detail['match_analysis']}
+
+if __name__ == "__main__":
+    test_listing_matches_schema_and_projects()
+    test_fragments_cached_until_job_changes()
@@ -0,0 +1,58 @@
+from datetime import time
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, Job, JobShift, JobMatch
+from query_counter import count_queries
+
+app = create_app('testing')
+# Both requests load the student from the DB, so only per-job queries could differ
+app.config['STUDENT_CACHE_TTL'] = 0
+
+def _add_jobs(student, count):
+    for i in range(count):
+        job = Job(title=f'Job {i}', is_active=True)
+        db.session.add(job)
+        db.session.flush()
+        db.session.add_all([
+            JobShift(job_id=job.id, day_of_week='Tuesday', start_time=time(9), end_time=time(13)),
+            JobShift(job_id=job.id, day_of_week='Saturday', start_time=time(10), end_time=time(16)),
+        ])
+        if i % 2 == 0:
+            db.session.add(JobMatch(student_id=student.id, job_id=job.id, score=50 + i, breakdown='{}'))
+    db.session.commit()
+
+def _count_queries(client, headers, per_page):
+    response, statements = count_queries(lambda: client.get(f'/api/jobs?per_page={per_page}', headers=headers))
+    assert response.status_code == 200
+    return response.json, len(statements)
+
+def test_jobs_page_query_count_is_constant():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='count@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Count')
+        db.session.add(student)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+
+        _add_jobs(student, 5)
+        small, small_queries = _count_queries(client, headers, 100)
+        _add_jobs(student, 45)
+        large, large_queries = _count_queries(client, headers, 100)
+
+        print(f"{len(small['jobs'])} jobs: {small_queries} queries, {len(large['jobs'])} jobs: {large_queries} queries")
+        assert len(small['jobs']) == 5 and len(large['jobs']) == 50
+        assert small_queries == large_queries
+
+        # Scores and shifts still come through, best match first
+        first = large['jobs'][0]
+        assert first['match_score'] == max(job['match_score'] for job in large['jobs'] if 'match_score' in job)
+        assert [shift['day_of_week'] for shift in first['shifts']] == ['Tuesday', 'Saturday']
+        assert sum('match_score' in job for job in large['jobs']) == 3 + 23
+
+if __name__ == "__main__":
+    test_jobs_page_query_count_is_constant()
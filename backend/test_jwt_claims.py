@@ -0,0 +1,100 @@
+from flask_jwt_extended import create_access_token, decode_token
+from app import create_app, db
+from app.models import User, Student, StudentPreferences
+from app.services import data_versions
+from query_counter import count_queries
+
+app = create_app('testing')
+
+def test_tokens_carry_student_claims():
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        response = client.post('/api/auth/register', json={'email': 'claims@test.com', 'password': 'pw', 'firstName': 'Claire'})
+        assert response.status_code == 201
+        student = Student.query.join(User).filter(User.email == 'claims@test.com').one()
+        claims = decode_token(response.json['access_token'])
+        assert claims['student_id'] == student.id
+
+        response = client.post('/api/auth/login', json={'email': 'claims@test.com', 'password': 'pw'})
+        assert decode_token(response.json['access_token'])['student_id'] == student.id
+
+def test_claims_skip_identity_queries():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='fastpath@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Fast', university='UCL')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(StudentPreferences(student_id=student.id, min_salary=11.5))
+        db.session.commit()
+
+        client = app.test_client()
+        legacy = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(user.id), additional_claims={'student_id': student.id})}
+
+        # Only the id is needed: just the user existence check, no students query with the claim
+        legacy_apps, legacy_queries = count_queries(lambda: client.get('/api/applications', headers=legacy))
+        apps, queries = count_queries(lambda: client.get('/api/applications', headers=headers))
+        print(f"/applications: {len(legacy_queries)} queries with an old token, {len(queries)} with claims")
+        assert apps.json == legacy_apps.json
+        assert len(queries) == 2 and len(legacy_queries) == 3
+        assert not any('FROM students' in s for s in queries)
+
+        # Whole profile: loaded once, then served from the student cache while its version holds
+        first, cold = count_queries(lambda: client.get('/api/preferences', headers=headers))
+        second, warm = count_queries(lambda: client.get('/api/preferences', headers=headers))
+        print(f"/preferences: {len(cold)} queries cold, {len(warm)} warm")
+        assert first.json == second.json and second.json['min_salary'] == 11.5
+        assert len(warm) == len(cold) - 1
+        assert not any('FROM students' in s or 'FROM student_preferences' in s for s in warm)
+
+        # An edit in this process drops the cached copy
+        assert client.put('/api/profile', json={'university': 'KCL'}, headers=headers).status_code == 200
+        assert client.get('/api/profile', headers=headers).json['university'] == 'KCL'
+        _, warm = count_queries(lambda: client.get('/api/profile', headers=headers))
+        assert not any('FROM students' in s for s in warm)
+
+        # An edit in another process (row and version bump, no eviction here) is seen at once
+        cache = app.extensions['student_cache']
+        expires, version, values, prefs = cache.entries[student.id]
+        cache.entries[student.id] = (expires, version, {**values, 'university': 'Stale'}, prefs)
+        assert client.get('/api/profile', headers=headers).json['university'] == 'Stale'
+        db.session.execute(db.update(Student).where(Student.id == student.id).values(university='LSE'))
+        data_versions.bump(data_versions.student_key(student.id))
+        db.session.commit()
+        assert client.get('/api/profile', headers=headers).json['university'] == 'LSE'
+
+        # Old tokens still work
+        assert client.get('/api/profile', headers=legacy).json['university'] == 'LSE'
+
+def test_deleted_user_is_rejected():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='deleted@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Gone')
+        db.session.add(student)
+        db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=str(user.id), additional_claims={'student_id': student.id})}
+        assert client.get('/api/stats', headers=headers).status_code == 200
+
+        db.session.execute(db.delete(User).where(User.id == user.id))
+        db.session.commit()
+        for url in ('/api/stats', '/api/jobs', '/api/applications', '/api/dashboard', '/api/profile', '/api/auth/me'):
+            assert client.get(url, headers=headers).status_code == 401, url
+
+if __name__ == "__main__":
+    test_tokens_carry_student_claims()
+    test_claims_skip_identity_queries()
+    test_deleted_user_is_rejected()
@@ -0,0 +1,63 @@
+import json
+from datetime import time
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, StudentPreferences, Job, JobShift, JobMatch
+from app.services import match_tracking
+from app.services.matching import MatchingEngine
+from app.services.profiles import compile_student, compile_job
+
+app = create_app('testing')
+
+def _stored(student, job):
+    db.session.expire_all()
+    return JobMatch.query.filter_by(student_id=student.id, job_id=job.id).first()
+
+def test_detail_serves_stored_analysis():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='detail@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Detail', skills='coffee,customer service')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(StudentPreferences(student_id=student.id, preferred_roles='barista', min_salary=10))
+        job = Job(title='Barista', description='Coffee shop', location='Leeds', salary_min=11, is_active=True)
+        db.session.add(job)
+        db.session.flush()
+        db.session.add(JobShift(job_id=job.id, day_of_week='Saturday', start_time=time(9), end_time=time(17)))
+        db.session.add(JobMatch(student_id=student.id, job_id=job.id, score=1.0, breakdown='{}'))
+        db.session.commit()
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+        expected = MatchingEngine().calculate_match(compile_student(student), compile_job(job), explain=True)
+
+        first = client.get(f'/api/jobs/{job.id}', headers=headers).json['match_analysis']
+        calculated = _stored(student, job).analysis_calculated
+        second = client.get(f'/api/jobs/{job.id}', headers=headers).json['match_analysis']
+        assert first == second == json.loads(json.dumps(expected))
+        # Second view was served from the stored row
+        assert _stored(student, job).analysis_calculated == calculated
+
+        # The stale stored score was corrected on the way
+        assert _stored(student, job).score == expected['total_score']
+
+        # A profile change makes the stored analysis stale
+        match_tracking.mark_student_changed(student.id)
+        db.session.commit()
+        client.get(f'/api/jobs/{job.id}', headers=headers)
+        recalculated = _stored(student, job).analysis_calculated
+        assert recalculated > calculated
+
+        # So does a job edit
+        job = db.session.get(Job, job.id)
+        job.salary_min = 12
+        db.session.commit()
+        client.get(f'/api/jobs/{job.id}', headers=headers)
+        assert _stored(student, job).analysis_calculated > recalculated
+
+if __name__ == "__main__":
+    test_detail_serves_stored_analysis()
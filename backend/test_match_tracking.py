@@ -0,0 +1,71 @@
+from app import create_app, db
+from app.models import User, Student, Job, JobMatch, MatchChange
+from app.services import match_tracking
+from app.tasks import calculate_dirty_matches_task
+
+app = create_app('testing')
+app.config['MATCH_TOP_K'] = None
+
+def _student(email, skills='python'):
+    user = User(email=email)
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, first_name='Track', skills=skills)
+    db.session.add(student)
+    db.session.flush()
+    return student
+
+def test_consume_keeps_late_commits():
+    with app.app_context():
+        db.create_all()
+        MatchChange.query.delete()
+
+        db.session.add_all([MatchChange(id=10, entity_type='student', entity_id=1),
+                            MatchChange(id=12, entity_type='job', entity_id=7)])
+        db.session.commit()
+        change_ids, student_ids, job_ids = match_tracking.pending_changes()
+        assert sorted(change_ids) == [10, 12] and student_ids == {1} and job_ids == {7}
+
+        # A transaction that got id 11 commits while the rematch runs
+        db.session.add(MatchChange(id=11, entity_type='student', entity_id=2))
+        db.session.commit()
+
+        match_tracking.consume(change_ids)
+        assert [c.id for c in MatchChange.query.all()] == [11]
+        assert match_tracking.pending_changes()[1] == {2}
+
+        match_tracking.consume([11])
+        assert match_tracking.pending_changes() == ([], set(), set())
+
+def test_dirty_rematch_covers_logged_changes():
+    with app.app_context():
+        db.create_all()
+        MatchChange.query.delete()
+
+        changed = _student('dirty-changed@test.com')
+        other = _student('dirty-other@test.com')
+        jobs = [Job(title=f'Dirty {i}', description='python', is_active=True, salary_min=10) for i in range(3)]
+        db.session.add_all(jobs)
+        db.session.commit()
+        changed_id, other_id, job_ids = changed.id, other.id, [job.id for job in jobs]
+
+        # A changed student is matched against every active job, nobody else is touched
+        match_tracking.mark_student_changed(changed_id)
+        db.session.commit()
+        print(calculate_dirty_matches_task())
+        assert {m.job_id for m in JobMatch.query.filter_by(student_id=changed_id)} >= set(job_ids)
+        assert JobMatch.query.filter_by(student_id=other_id).count() == 0
+        assert MatchChange.query.count() == 0
+
+        # A changed job is matched against the other students
+        match_tracking.mark_job_changed(job_ids[0])
+        db.session.commit()
+        calculate_dirty_matches_task()
+        assert {m.job_id for m in JobMatch.query.filter_by(student_id=other_id)} == {job_ids[0]}
+        assert MatchChange.query.count() == 0
+
+        assert calculate_dirty_matches_task() == "No pending match changes."
+
+if __name__ == "__main__":
+    test_consume_keeps_late_commits()
+    test_dirty_rematch_covers_logged_changes()
@@ -0,0 +1,59 @@
+from app import create_app, db
+from app.models import User, Student, Job, JobMatch
+from app.services.match_writer import MatchWriter
+
+app = create_app('testing')
+
+def test_match_writer_upsert():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='writer@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Writer')
+        jobs = [Job(title=f'Job {i}') for i in range(5)]
+        db.session.add(student)
+        db.session.add_all(jobs)
+        db.session.commit()
+        job_ids = [job.id for job in jobs]
+
+        # First pass inserts, batch size forces several flushes
+        with MatchWriter(batch_size=2) as writer:
+            for job_id in job_ids:
+                writer.add(student.id, job_id, 50.0, {"schedule": 100})
+        print(f"Written: {writer.written} in {writer.batches} batches")
+        assert writer.written == 5
+        assert JobMatch.query.count() == 5
+
+        # Second pass updates in place through uq_student_job_match
+        with MatchWriter() as writer:
+            for job_id in job_ids:
+                writer.add(student.id, job_id, 75.0, {"schedule": 80})
+        assert JobMatch.query.count() == 5
+        assert {m.score for m in JobMatch.query.all()} == {75.0}
+
+        # A bad row (NULL score) fails alone, the rest of the batch still lands
+        with MatchWriter() as writer:
+            writer.add(student.id, job_ids[0], None, {})
+            writer.add(student.id, job_ids[1], 90.0, {})
+        print(f"Failures: {writer.failures}")
+        assert len(writer.failures) == 1
+        assert JobMatch.query.filter_by(job_id=job_ids[1]).one().score == 90.0
+
+        # A writer with its own session (as the rematch shards use) does all its work there
+        student_id = student.id
+        session = db.session.session_factory()
+        db.session.commit()
+        try:
+            with MatchWriter(session=session) as writer:
+                writer.discard(student_id, job_ids[:2])
+            assert not db.session().in_transaction()
+        finally:
+            session.close()
+        assert sorted(m.job_id for m in JobMatch.query.all()) == job_ids[2:]
+
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_match_writer_upsert()
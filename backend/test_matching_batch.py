@@ -0,0 +1,135 @@
+from app.services.matching import MatchingEngine
+
+def test_score_batch_matches_single():
+    engine = MatchingEngine()
+
+    student = {
+        "skills": {"python", "communication", "retail"},
+        "min_salary": 12.00,
+        "preferences": {"roles": ["Barista", "Assistant"], "primary_city": "London", "open_to_other_cities": True},
+        "timetable": [
+             {"day": "Monday", "start": "09:00", "end": "12:00"}
+        ]
+    }
+
+    jobs = [
+        {"title": "Barista Assistant", "location": {"name": "London"}, "skills": {"communication", "retail"},
+         "salary_min": 13.00, "salary_max": 15.00, "shifts": [{"day": "Tuesday", "start": "09:00", "end": "17:00"}],
+         "description": "Great job for students"},
+        {"title": "Senior Developer", "location": {"name": "Birmingham"}, "skills": {"java"},
+         "salary_min": 10.00, "shifts": [{"day": "Monday", "start": "10:00", "end": "11:00"}],
+         "description": "Hard work"},
+        {"title": "Retail Assistant", "location": {"name": "Reading, Berkshire"}, "salary_min": 24000,
+         "salary_max": 30000, "salary_type": "yearly", "description": "Retail and communication skills"},
+        {"title": "Cafe Barista", "location": {"name": "Glasgow"}, "salary_min": None, "description": None},
+        {"title": "Barista", "location": {"name": "London"}, "is_remote": True, "salary_min": 11.00,
+         "salary_max": 11.50, "shifts": [{"day": "Monday", "start": "12:15", "end": "15:00"}], "description": "python"},
+    ]
+
+    batch = engine.score_batch(student, jobs)
+    print(f"Batch totals: {batch['total_score']}")
+
+    for i, job in enumerate(jobs):
+        single = engine.calculate_match(student, job)
+        row = engine.unpack_row(batch, i)
+        print(f"{job['title']}: single={single['total_score']} batch={row['total_score']}")
+        assert row == single
+
+    matrix = engine.score_matrix([student, {"preferences": {}}], jobs)
+    assert matrix['total_score'].shape == (2, len(jobs))
+    assert list(matrix['total_score'][0]) == list(batch['total_score'])
+
+def test_top_matches_agrees_with_full_scoring():
+    engine = MatchingEngine()
+
+    student = {
+        "skills": {"python", "retail"},
+        "min_salary": 11.00,
+        "preferences": {"roles": ["Barista"], "primary_city": "London", "open_to_other_cities": True},
+        "timetable": [{"day": "Monday", "start": "09:00", "end": "12:00"}]
+    }
+    cities = ["London", "Leeds", "Glasgow"]
+    titles = ["Barista", "Cafe Barista", "Cleaner", "Retail Assistant"]
+    jobs = [
+        {"title": titles[i % 4], "location": {"name": cities[i % 3]}, "salary_min": 9 + i % 5,
+         "shifts": [{"day": "Monday", "start": f"{8 + i % 6:02d}:00", "end": f"{10 + i % 6:02d}:00"}],
+         "description": "python" if i % 2 else "retail"}
+        for i in range(40)
+    ]
+
+    totals = engine.score_batch(student, jobs)['total_score']
+    ranked = sorted(range(len(jobs)), key=lambda i: -totals[i])
+
+    for k, threshold in [(5, None), (5, 60), (1, None), (50, None)]:
+        kept = engine.top_matches(student, jobs, k=k, threshold=threshold)
+        kept_totals = sorted((row['total_score'] for _, row in kept), reverse=True)
+        expected = sorted(totals[ranked[:k]], reverse=True)
+        if threshold is not None:
+            expected = sorted(set(ranked[:k]) | {i for i in range(len(jobs)) if totals[i] >= threshold},
+                              key=lambda i: -totals[i])
+            expected = [totals[i] for i in expected]
+        print(f"k={k} threshold={threshold}: kept {len(kept)}")
+        assert kept_totals == list(expected)
+        for index, row in kept:
+            assert row == engine.calculate_match(student, jobs[index])
+
+def test_score_only_mode():
+    engine = MatchingEngine()
+
+    student = {
+        "skills": {"python", "retail"},
+        "location": {"lat": 51.5074, "lng": -0.1278},
+        "preferences": {"roles": ["Barista"], "primary_city": "London", "max_commute_time": 60},
+        "timetable": [{"day": "Monday", "start": "09:00", "end": "12:00"}]
+    }
+    jobs = [
+        {"title": "Barista", "location": {"name": "Camden", "lat": 51.539, "lng": -0.1426},
+         "shifts": [{"day": "Monday", "start": "12:15", "end": "15:00"}], "description": "retail"},
+        {"title": "Barista", "location": {"name": "Reading"}, "shifts": [{"day": "Monday", "start": "10:00", "end": "11:00"}]},
+        {"title": "Cleaner", "location": {"name": "London"}, "is_remote": True},
+    ]
+
+    batch = engine.score_batch(student, jobs, explain=False)
+    assert batch['schedule_analysis'] is None
+    for i, job in enumerate(jobs):
+        full = engine.calculate_match(student, job)
+        fast = engine.calculate_match(student, job, explain=False)
+        print(f"{job['location']['name']}: {fast}")
+        assert 'schedule_analysis' not in fast
+        assert fast['total_score'] == full['total_score']
+        assert 'reason' not in fast['breakdown']['location_data']
+        for key in ('schedule', 'location', 'skills', 'salary', 'preferences'):
+            assert fast['breakdown'][key] == full['breakdown'][key]
+        assert engine.unpack_row(batch, i) == fast
+
+    kept = engine.top_matches(student, jobs, k=2, explain=False)
+    assert all(row == engine.calculate_match(student, jobs[i], explain=False) for i, row in kept)
+
+def test_halves_round_the_same_everywhere():
+    engine = MatchingEngine()
+    timetable = [{"day": "Monday", "start": "09:00", "end": "12:00"}]
+    shifts = [{"day": "Monday", "start": "10:00", "end": "11:00"}]
+
+    # Raw totals of 33.45 and 0.05, where Python's round() and np.round() used to disagree
+    cases = [
+        ({"skills": {"communication"}, "min_salary": 10.0, "timetable": timetable,
+          "preferences": {"roles": ["Developer", "Assistant"], "primary_city": "Glasgow", "open_to_other_cities": True}},
+         {"title": "Retail Assistant", "location": {"name": "Birmingham"}, "skills": {"communication", "java", "python"},
+          "salary_min": 11.0, "shifts": shifts, "description": "nothing"}),
+        ({"skills": set(), "min_salary": 12.0, "timetable": timetable,
+          "preferences": {"roles": ["Developer", "Assistant"], "primary_city": "Reading, Berkshire", "open_to_other_cities": False}},
+         {"title": "Cleaner", "location": {"name": "Reading, Berkshire"}, "skills": {"retail", "java", "python"},
+          "salary_min": 16.0, "shifts": shifts, "description": "nothing"}),
+    ]
+    for student, job in cases:
+        single = engine.calculate_match(student, job)['total_score']
+        batch = engine.unpack_row(engine.score_batch(student, [job]), 0)['total_score']
+        (_, top), = engine.top_matches(student, [job], k=1)
+        print(f"{job['title']}: single={single} batch={batch} top={top['total_score']}")
+        assert single == batch == top['total_score']
+
+if __name__ == "__main__":
+    test_score_batch_matches_single()
+    test_top_matches_agrees_with_full_scoring()
+    test_score_only_mode()
+    test_halves_round_the_same_everywhere()
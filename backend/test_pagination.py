@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student, Job, JobMatch
+from app.services.pagination import encode_cursor, decode_cursor
+
+app = create_app('testing')
+
+def _walk(client, headers, sort_by, per_page):
+    ids, cursor, pages = [], None, 0
+    while True:
+        url = f'/api/jobs?sort_by={sort_by}&per_page={per_page}'
+        if cursor:
+            url += f'&cursor={cursor}'
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        ids += [job['id'] for job in response.json['jobs']]
+        pages += 1
+        cursor = response.json['next_cursor']
+        if not cursor:
+            return ids, pages
+
+def test_cursor_roundtrip():
+    posted = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor('posted_at', posted, 7), 'posted_at') == (posted, 7)
+    assert decode_cursor(encode_cursor('match_score', None, 3), 'match_score') == (None, 3)
+
+def test_keyset_pages_cover_every_job_once():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='pages@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Pages')
+        db.session.add(student)
+        db.session.flush()
+
+        # Lots of tied scores and posted_at values, and jobs without a match (NULL score)
+        start = datetime(2024, 1, 1)
+        for i in range(23):
+            job = Job(title=f'Job {i}', is_active=True, posted_at=start + timedelta(days=i % 4))
+            db.session.add(job)
+            db.session.flush()
+            if i % 3:
+                db.session.add(JobMatch(student_id=student.id, job_id=job.id, score=float(60 + i % 5), breakdown='{}'))
+        db.session.commit()
+
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        client = app.test_client()
+        scores = {m.job_id: m.score for m in JobMatch.query.filter_by(student_id=student.id)}
+        jobs = Job.query.all()
+
+        expected = {
+            'match_score': [j.id for j in sorted(jobs, key=lambda j: (j.id not in scores, -scores.get(j.id, 0), -j.id))],
+            'posted_at': [j.id for j in sorted(jobs, key=lambda j: (-j.posted_at.timestamp(), -j.id))],
+        }
+        for sort_by, order in expected.items():
+            ids, pages = _walk(client, headers, sort_by, 5)
+            print(f"{sort_by}: {pages} pages")
+            assert ids == order
+            assert pages == 5
+
+        # Total only on request; the legacy page parameter still works
+        response = client.get('/api/jobs?per_page=5&include_total=true', headers=headers)
+        assert response.json['total'] == 23
+        response = client.get('/api/jobs?page=2&per_page=5', headers=headers)
+        assert [job['id'] for job in response.json['jobs']] == expected['match_score'][5:10]
+        assert response.json['pages'] == 5
+
+        # A cursor from one ordering is rejected by the other
+        cursor = client.get('/api/jobs?sort_by=posted_at&per_page=5', headers=headers).json['next_cursor']
+        assert client.get(f'/api/jobs?cursor={cursor}', headers=headers).status_code == 400
+        assert client.get('/api/jobs?cursor=not-a-cursor', headers=headers).status_code == 400
+
+if __name__ == "__main__":
+    test_cursor_roundtrip()
+    test_keyset_pages_cover_every_job_once()
@@ -0,0 +1,93 @@
+import random
+from itertools import combinations
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student
+from app.services.planner import build_candidates, plan_bundle
+from app.services.profiles import compile_intervals
+
+app = create_app('testing')
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _random_jobs(rng, count):
+    jobs = []
+    for job_id in range(count):
+        shifts = []
+        for day in rng.sample(DAYS, rng.randint(1, 3)):
+            start = rng.randint(6, 18)
+            shifts.append({"day": day, "start": f"{start:02d}:00", "end": f"{start + rng.randint(3, 8):02d}:00"})
+        jobs.append((job_id, float(rng.randint(50, 100)), compile_intervals(shifts)))
+    return jobs
+
+def _brute_force(candidates, limit_minutes):
+    best = 0.0
+    for size in range(1, len(candidates) + 1):
+        for combo in combinations(candidates, size):
+            if sum(job.minutes for job in combo) > limit_minutes:
+                continue
+            if any(a.mask & b.reach for a, b in combinations(combo, 2)):
+                continue
+            best = max(best, sum(job.score for job in combo))
+    return best
+
+def test_plan_matches_brute_force():
+    rng = random.Random(3)
+    timetable = compile_intervals([{"day": "Monday", "start": "09:00", "end": "12:00"}], by_day=True)
+
+    for _ in range(5):
+        candidates = build_candidates(timetable, _random_jobs(rng, 12))
+        plan = plan_bundle(candidates, 20 * 60)
+        print(f"{len(candidates)} candidates -> {plan}")
+        assert plan['optimal']
+        assert plan['total_minutes'] <= 20 * 60
+        assert plan['total_score'] == round(_brute_force(candidates, 20 * 60), 1)
+
+def test_plan_respects_timetable_and_hours():
+    timetable = compile_intervals([{"day": "Monday", "start": "09:00", "end": "12:00"}], by_day=True)
+    jobs = [
+        (1, 95.0, compile_intervals([{"day": "Monday", "start": "10:00", "end": "14:00"}])), # Clashes with class
+        (2, 90.0, compile_intervals([{"day": "Tuesday", "start": "09:00", "end": "17:00"}])),
+        (3, 85.0, compile_intervals([{"day": "Tuesday", "start": "17:15", "end": "20:00"}])), # Too close to job 2
+        (4, 80.0, compile_intervals([{"day": "Saturday", "start": "10:00", "end": "16:00"}])),
+        (5, 99.0, ()), # No fixed shifts, hours unknown
+    ]
+    candidates = build_candidates(timetable, jobs)
+    assert [job.job_id for job in candidates] == [2, 3, 4]
+
+    plan = plan_bundle(candidates, 15 * 60)
+    assert plan['job_ids'] == [2, 4]
+    assert plan['total_minutes'] == 14 * 60
+
+    # A tight limit only leaves room for the short evening shift plus Saturday
+    plan = plan_bundle(candidates, 9 * 60)
+    assert plan['job_ids'] == [3, 4]
+
+def test_plan_route_needs_an_hours_cap():
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        headers = {}
+        for name, limit in (('uncapped', 0), ('capped', 20)):
+            user = User(email=f'{name}@plan.test')
+            db.session.add(user)
+            db.session.flush()
+            student = Student(user_id=user.id, first_name=name, weekly_hours_limit=limit)
+            db.session.add(student)
+            db.session.flush()
+            headers[name] = {'Authorization': 'Bearer ' + create_access_token(
+                identity=str(user.id), additional_claims={'student_id': student.id})}
+        db.session.commit()
+
+        # No limit and no hours: nothing to plan against
+        response = client.get('/api/jobs/plan', headers=headers['uncapped'])
+        assert response.status_code == 400 and 'hours' in response.json['error']
+
+        assert client.get('/api/jobs/plan?hours=10', headers=headers['uncapped']).status_code == 200
+        assert client.get('/api/jobs/plan', headers=headers['capped']).status_code == 200
+
+if __name__ == "__main__":
+    test_plan_matches_brute_force()
+    test_plan_respects_timetable_and_hours()
+    test_plan_route_needs_an_hours_cap()
@@ -0,0 +1,78 @@
+from datetime import time
+from app import create_app, db
+from app.models import User, Student, Timetable, ScheduleSlot, Job, JobShift, JobMatch, StudentPreferences
+from app.tasks import _rematch_shard
+
+app = create_app('testing')
+app.config['MATCH_TOP_K'] = None
+
+def test_rematch_scores_each_jobs_own_shifts():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='rematch@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Rematch', skills='python')
+        db.session.add(student)
+        db.session.flush()
+        timetable = Timetable(student_id=student.id)
+        db.session.add(timetable)
+        db.session.flush()
+        db.session.add(ScheduleSlot(timetable_id=timetable.id, day_of_week='Monday', start_time=time(9), end_time=time(17)))
+
+        free = [{'day_of_week': 'Tuesday', 'start_time': time(10), 'end_time': time(14)}]
+        clash = [{'day_of_week': 'Monday', 'start_time': time(10), 'end_time': time(14)}]
+        jobs = {}
+        for name, shifts in (('free', free), ('clash', clash)):
+            job = Job(title=name, description='python', is_active=True, salary_min=12)
+            db.session.add(job)
+            db.session.flush()
+            db.session.add_all(JobShift(job_id=job.id, **shift) for shift in shifts)
+            jobs[name] = job.id
+        db.session.commit()
+
+        assert _rematch_shard([student.id]) == {'written': 1, 'failures': []}
+        matched = {m.job_id for m in JobMatch.query.filter_by(student_id=student.id)}
+        assert jobs['free'] in matched
+        # Ruled out on its own Monday shift rather than sharing the free job's fit
+        assert jobs['clash'] not in matched
+
+def test_partial_rematch_refills_top_k():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='topk@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Topk', skills='python')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(StudentPreferences(student_id=student.id, preferred_roles='Top', min_salary=17))
+        student_id = student.id
+        Job.query.update({'is_active': False}) # Only this test's jobs
+        # Salary scores 100, 85 and 60 against the student's minimum
+        jobs = [Job(title=f'Top {low}', description='python', is_active=True, is_remote=True, salary_min=low, salary_max=high)
+                for low, high in ((20, None), (12, 20), (16, None))]
+        db.session.add_all(jobs)
+        db.session.commit()
+        best, second, third = (job.id for job in jobs)
+
+        saved = {key: app.config[key] for key in ('MATCH_TOP_K', 'MATCH_KEEP_THRESHOLD')}
+        app.config.update(MATCH_TOP_K=2, MATCH_KEEP_THRESHOLD=None)
+        try:
+            _rematch_shard([student_id])
+            assert {m.job_id for m in JobMatch.query.filter_by(student_id=student_id)} == {best, second}
+
+            # The best job gets worse: the third, never stored, now belongs in the top 2
+            db.session.get(Job, best).salary_min = 5
+            db.session.commit()
+            result = _rematch_shard([student_id], [best])
+            assert result['failures'] == []
+            assert {m.job_id for m in JobMatch.query.filter_by(student_id=student_id)} == {second, third}
+        finally:
+            app.config.update(saved)
+
+if __name__ == "__main__":
+    test_rematch_scores_each_jobs_own_shifts()
+    test_partial_rematch_refills_top_k()
@@ -0,0 +1,71 @@
+from datetime import time
+from app import create_app, db
+from app.models import User, Student, Timetable, ScheduleSlot, Job, JobShift
+from app.services.schedule_filter import exclude_impossible, is_impossible
+from app.services.scheduler import ScheduleAnalyzer
+from app.services.profiles import compile_student, compile_job
+
+app = create_app('testing')
+
+def test_impossible_jobs_in_sql():
+    with app.app_context():
+        db.create_all()
+
+        user = User(email='filter@test.com')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, first_name='Filter')
+        db.session.add(student)
+        db.session.flush()
+        timetable = Timetable(student_id=student.id)
+        db.session.add(timetable)
+        db.session.flush()
+        db.session.add_all([
+            ScheduleSlot(timetable_id=timetable.id, day_of_week='Monday', start_time=time(9), end_time=time(12)),
+            ScheduleSlot(timetable_id=timetable.id, day_of_week='Monday', start_time=time(7), end_time=time(8)),
+        ])
+
+        shifts = {
+            'clash': [('Monday', time(10), time(14))],
+            'one_of_two': [('Monday', time(10), time(14)), ('Friday', time(10), time(14))],
+            'two_of_three': [('Monday', time(10), time(11)), ('Monday', time(11), time(13)), ('Friday', time(9), time(17))],
+            'free': [('Tuesday', time(9), time(17))],
+            'overnight': [('Sunday', time(22), time(7, 30))],
+            'no_shifts': [],
+        }
+        jobs = {}
+        for name, rows in shifts.items():
+            job = Job(title=name)
+            db.session.add(job)
+            db.session.flush()
+            for day, start, end in rows:
+                db.session.add(JobShift(job_id=job.id, day_of_week=day, start_time=start, end_time=end))
+            jobs[name] = job
+        db.session.commit()
+
+        shift = JobShift.query.filter_by(job_id=jobs['overnight'].id).first()
+        print(f"Overnight shift minutes: {shift.start_minute_of_week}-{shift.end_minute_of_week}")
+        assert (shift.start_minute_of_week, shift.end_minute_of_week) == (6 * 1440 + 22 * 60, 7 * 1440 + 7 * 60 + 30)
+
+        visible = {job.id for job in Job.query.filter(exclude_impossible(Job, student.id))}
+        names = {name for name, job in jobs.items() if job.id not in visible}
+        print(f"Impossible: {sorted(names)}")
+        assert names == {'clash', 'two_of_three', 'overnight'}
+
+        # Everything SQL drops is a job the analyzer scores 0 on schedule
+        analyzer = ScheduleAnalyzer()
+        profile = compile_student(student)
+        for name in names:
+            assert analyzer.analyze_intervals(profile.timetable, compile_job(jobs[name]).shifts)['score'] == 0
+
+        # The rematch's in-Python check agrees with SQL
+        assert {name for name, job in jobs.items() if is_impossible(profile.timetable, compile_job(job).shifts)} == names
+
+        # Updating a shift keeps the columns in sync
+        shift.day_of_week = 'Wednesday'
+        db.session.commit()
+        assert shift.start_minute_of_week == 2 * 1440 + 22 * 60
+        assert Job.query.filter(exclude_impossible(Job, student.id), Job.id == jobs['overnight'].id).count() == 1
+
+if __name__ == "__main__":
+    test_impossible_jobs_in_sql()
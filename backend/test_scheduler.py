@@ -1,4 +1,5 @@
 from app.services.scheduler import ScheduleAnalyzer
+from app.services.profiles import compile_intervals, JobFeatures
 
 def test_scheduler():
     analyzer = ScheduleAnalyzer(commute_time_mins=30)
@@ -32,5 +33,54 @@ def test_scheduler():
     print("\n--- Job D (Monday - Evening Good) ---")
     print(analyzer.analyze_fit(timetable, job_d))
 
+def test_overnight_shifts():
+    analyzer = ScheduleAnalyzer(commute_time_mins=30)
+
+    # Night shift runs into a Tuesday 07:00 class (previously never compared)
+    timetable = [{"day": "Tuesday", "start": "07:00", "end": "09:00"}]
+    result = analyzer.analyze_fit(timetable, [{"day": "Monday", "start": "22:00", "end": "07:30"}])
+    print(result)
+    assert result['score'] == 0
+
+    # Ends with only a tight gap before the class
+    result = analyzer.analyze_fit(timetable, [{"day": "Monday", "start": "22:00", "end": "06:30"}])
+    print(result)
+    assert result['score'] == 90
+
+    # Sunday night into Monday morning wraps around the week
+    result = analyzer.analyze_fit(
+        [{"day": "Monday", "start": "08:00", "end": "09:00"}],
+        [{"day": "Sunday", "start": "23:00", "end": "07:50"}]
+    )
+    assert result['score'] == 0
+
+    # Far from any class: no analysis at all
+    result = analyzer.analyze_fit(timetable, [{"day": "Friday", "start": "22:00", "end": "06:00"}])
+    assert result['score'] == 100 and result['analysis'] == []
+
+def test_fit_cache_by_pattern():
+    analyzer = ScheduleAnalyzer(commute_time_mins=30)
+    timetable = compile_intervals([{"day": "Saturday", "start": "09:00", "end": "10:30"}], by_day=True)
+
+    weekend = [{"day": "Saturday", "start": "10:00", "end": "16:00"}, {"day": "Sunday", "start": "10:00", "end": "16:00"}]
+    jobs = [
+        JobFeatures.from_dict({"shifts": weekend}),
+        JobFeatures.from_dict({"shifts": list(reversed(weekend))}), # Same pattern, other order
+        JobFeatures.from_dict({"shifts": []}),
+        JobFeatures.from_dict({}),
+    ]
+    assert jobs[0].shift_pattern == jobs[1].shift_pattern
+    assert jobs[2].shift_pattern == jobs[3].shift_pattern
+
+    for job in jobs:
+        cached = analyzer.analyze_intervals(timetable, job.shifts, job.shift_pattern)
+        assert cached == analyzer.analyze_intervals(timetable, job.shifts)
+        assert analyzer.score_intervals(timetable, job.shifts, job.shift_pattern) == cached['score']
+
+    print(f"Cache entries: {len(analyzer._fit_cache)}")
+    assert len(analyzer._fit_cache) == 4 # 2 patterns x (explain, score-only)
+
 if __name__ == "__main__":
     test_scheduler()
+    test_overnight_shifts()
+    test_fit_cache_by_pattern()
@@ -0,0 +1,37 @@
+from app.services.skill_scanner import SkillScanner
+from app.services.matching import MatchingEngine
+from app.services.profiles import JobFeatures, StudentProfile
+
+def test_skill_scanner():
+    skills = {"excel", "microsoft excel", "python", "customer service", "service", "he", "she", "hers"}
+    scanner = SkillScanner(skills)
+
+    text = "ushers wanted. microsoft excel and great customer service required."
+    found = scanner.scan(text)
+    print(f"Found: {sorted(found)}")
+    # Same answer as checking each skill with a substring search
+    assert found == {s for s in skills if s in text}
+    assert scanner.scan("") == frozenset()
+
+def test_indexed_skills_score():
+    engine = MatchingEngine()
+    student = StudentProfile(skills=["Python", "Retail", "Excel"])
+    other = StudentProfile(skills=["Barista"])
+    jobs = [
+        JobFeatures(title="Shop Assistant", description="Retail role, some Excel"),
+        JobFeatures(title="Developer", description="Python python PYTHON"),
+        JobFeatures(title="Cleaner", description=None),
+    ]
+    expected = [engine.calculate_match(student, job)['breakdown']['skills'] for job in jobs]
+
+    # Vocabulary built from a different student: falls back to the substring scan
+    engine.index_skills(jobs, other.skills)
+    assert [engine.calculate_match(student, job)['breakdown']['skills'] for job in jobs] == expected
+
+    engine.index_skills(jobs, student.skills | other.skills)
+    print(f"Description skills: {[sorted(job.description_skills) for job in jobs]}")
+    assert [engine.calculate_match(student, job)['breakdown']['skills'] for job in jobs] == expected
+
+if __name__ == "__main__":
+    test_skill_scanner()
+    test_indexed_skills_score()
@@ -0,0 +1,90 @@
+from app import create_app, db
+from app.models import User, Student, Job, JobMatch, Application, StudentCounters
+from app.services import student_counters
+from app.services.match_writer import MatchWriter
+
+app = create_app('testing')
+
+def _expected(student_id):
+    apps = Application.query.filter_by(student_id=student_id)
+    return {
+        'applications': apps.count(),
+        'saved': apps.filter_by(status='Saved').count(),
+        'strong_matches': JobMatch.query.filter_by(student_id=student_id).filter(JobMatch.score >= 80).count(),
+    }
+
+def _student_and_jobs(email, count):
+    user = User(email=email)
+    db.session.add(user)
+    db.session.flush()
+    student = Student(user_id=user.id, first_name='Counters')
+    db.session.add(student)
+    db.session.flush()
+    jobs = [Job(title=f'Job {i}', is_active=True) for i in range(count)]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return student, [job.id for job in jobs]
+
+def test_counters_follow_writes():
+    with app.app_context():
+        db.create_all()
+        student, job_ids = _student_and_jobs('counters@test.com', 4)
+
+        assert student_counters.counts_for(student.id) == {'applications': 0, 'saved': 0, 'strong_matches': 0}
+
+        # Application inserts, status changes and deletes
+        db.session.add_all([
+            Application(student_id=student.id, job_id=job_ids[0], status='Saved'),
+            Application(student_id=student.id, job_id=job_ids[1]),
+            Application(student_id=student.id, job_id=job_ids[2], status='Saved'),
+        ])
+        db.session.commit()
+        saved = Application.query.filter_by(student_id=student.id, job_id=job_ids[0]).first()
+        saved.status = 'Applied'
+        db.session.commit()
+        db.session.delete(Application.query.filter_by(student_id=student.id, job_id=job_ids[2]).first())
+        db.session.commit()
+        print(student_counters.counts_for(student.id))
+        assert student_counters.counts_for(student.id) == _expected(student.id)
+
+        # Bulk rematch writes: upserts crossing the threshold both ways, and discards
+        with MatchWriter() as writer:
+            for i, job_id in enumerate(job_ids):
+                writer.add(student.id, job_id, 70.0 + i * 5, {})
+        assert student_counters.counts_for(student.id)['strong_matches'] == 2
+        with MatchWriter() as writer:
+            writer.add(student.id, job_ids[0], 95.0, {})
+            writer.discard(student.id, [job_ids[3]])
+        assert student_counters.counts_for(student.id) == _expected(student.id)
+
+        # ORM edits to a match (e.g. the detail view correcting a score)
+        match = JobMatch.query.filter_by(student_id=student.id, job_id=job_ids[2]).first()
+        match.score = 10.0
+        db.session.commit()
+        assert student_counters.counts_for(student.id) == _expected(student.id)
+
+def test_reconcile_fixes_drift():
+    with app.app_context():
+        db.create_all()
+        student, job_ids = _student_and_jobs('drift@test.com', 2)
+        db.session.add_all([Application(student_id=student.id, job_id=job_id) for job_id in job_ids])
+        db.session.add(JobMatch(student_id=student.id, job_id=job_ids[0], score=90.0, breakdown='{}'))
+        db.session.commit()
+        expected = _expected(student.id)
+        assert student_counters.counts_for(student.id) == expected
+
+        # Bulk SQL skips the listeners
+        Application.query.filter_by(student_id=student.id).delete()
+        row = db.session.get(StudentCounters, student.id)
+        row.strong_matches = 42
+        db.session.commit()
+        assert student_counters.counts_for(student.id) != _expected(student.id)
+
+        assert student_counters.reconcile() == 1
+        assert student_counters.counts_for(student.id) == _expected(student.id)
+        assert _expected(student.id)['applications'] == 0 and expected['applications'] == 2
+        assert student_counters.reconcile() == 0
+
+if __name__ == "__main__":
+    test_counters_follow_writes()
+    test_reconcile_fixes_drift()
@@ -0,0 +1,48 @@
+from app import create_app, db
+from app.models import Job, JobTitleGram
+from app.services.title_index import TitleIndex, role_filter
+
+app = create_app('testing')
+
+TITLES = ['Barista', 'Head Barista', 'Bar Staff', 'Retail Assistant', 'Kitchen Porter', 'Sales Assistant (Retail)', 'IT']
+
+def test_lookup_matches_substring_scan():
+    titles = [t.lower() for t in TITLES]
+    index = TitleIndex(titles)
+    for role in ('barista', 'Bar', 'assistant', 'retail', 'it', 'ist', 'tsirab', 'porter', 'x'):
+        expected = {i for i, title in enumerate(titles) if role.lower() in title}
+        print(f"{role}: {sorted(expected)}")
+        assert index.lookup(role) == expected
+
+def _matching(roles):
+    return {job.title for job in Job.query.filter(role_filter(Job, roles)).all()}
+
+def test_role_filter_indexes_every_job():
+    with app.app_context():
+        db.create_all()
+
+        # Plain ORM inserts, as seed.py and tests do: no scraper involved
+        jobs = [Job(title=title, is_active=True) for title in TITLES]
+        db.session.add_all(jobs)
+        db.session.commit()
+        assert JobTitleGram.query.filter_by(job_id=jobs[0].id).count() == 5 # bar, ari, ris, ist, sta
+
+        assert _matching(['Barista']) == {'Barista', 'Head Barista'}
+        assert _matching(['retail', 'porter']) == {'Retail Assistant', 'Sales Assistant (Retail)', 'Kitchen Porter'}
+        assert _matching(['IT']) == {'IT', 'Kitchen Porter'} # Too short for a trigram: ILIKE
+        assert _matching(['tsirab']) == set()
+
+        # Title edits move the job between roles
+        jobs[0].title = 'Waiter'
+        db.session.commit()
+        assert _matching(['Barista']) == {'Head Barista'}
+        assert _matching(['waiter']) == {'Waiter'}
+
+        # Other edits leave the index alone
+        jobs[1].salary_min = 12.0
+        db.session.commit()
+        assert _matching(['Barista']) == {'Head Barista'}
+
+if __name__ == "__main__":
+    test_lookup_matches_substring_scan()
+    test_role_filter_indexes_every_job()
@@ -4,6 +4,9 @@ import { MapPin, Clock, Calendar, CheckCircle, AlertTriangle, XCircle, Heart, Ey
 import Button from './ui/Button';
 import Card from './ui/Card';
 
+// Everything the card reads, for /jobs?fields= (the listing can skip descriptions and shifts)
+export const JOB_CARD_FIELDS = 'title,company_name,location,salary_min,salary_max,salary_type,posted_at,match_score,match_breakdown';
+
 const JobCard = ({ job, onApply, onSave, onDismiss, onClick }) => {
     const {
         title,
@@ -15,14 +15,11 @@ const Dashboard = () => {
     useEffect(() => {
         const loadDashboard = async () => {
             try {
-                const [jobsRes, appsRes, statsRes] = await Promise.all([
-                    api.get('/jobs?sort_by=match_score&per_page=3'), // Top 3 matches
-                    api.get('/applications'),
-                    api.get('/stats')
-                ]);
-                setJobs(jobsRes.data.jobs);
-                setApplications(appsRes.data);
-                setStats(statsRes.data);
+                // Top 3 matches, recent applications and stats in one round trip
+                const { data } = await api.get('/dashboard?limit=3');
+                setJobs(data.jobs);
+                setApplications(data.applications);
+                setStats(data.stats);
             } catch (err) {
                 console.error("Dashboard load failed", err);
             } finally {
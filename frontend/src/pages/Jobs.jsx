@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../services/api';
-import JobCard from '../components/JobCard';
+import JobCard, { JOB_CARD_FIELDS } from '../components/JobCard';
 import { Search, Filter } from 'lucide-react';
 
 const Jobs = () => {
@@ -29,8 +29,8 @@ const Jobs = () => {
     useEffect(() => {
         const fetchJobs = async () => {
             try {
-                // Fetch all jobs (increased limit for better visibility)
-                const response = await api.get('/jobs?per_page=100');
+                // Fetch all jobs (increased limit for better visibility), only the fields JobCard shows
+                const response = await api.get(`/jobs?per_page=100&fields=${JOB_CARD_FIELDS}&description=none`);
                 setJobs(response.data.jobs);
             } catch (err) {
                 console.error("Failed to load jobs", err);